@@ -86,7 +86,8 @@ doctype_js = {
 # ------------
 
 # before_install = "temp_credit_control.install.before_install"
-# after_install = "temp_credit_control.install.after_install"
+after_install = "temp_credit_control.install.after_install"
+after_migrate = "temp_credit_control.install.after_migrate"
 
 # Uninstallation
 # ------------
@@ -142,9 +143,60 @@ doctype_js = {
 
 doc_events = {
     "Sales Invoice": {
+        "validate": [
+            "temp_credit_control.services.temp_credit_validator.apply_temp_credit_rules",
+            "temp_credit_control.services.temp_credit_stamping.stamp_sales_invoice",
+        ],
+        "before_submit": "temp_credit_control.services.temp_credit_validator.apply_temp_credit_rules",
+        "on_submit": [
+            "temp_credit_control.services.temp_credit_validator.invalidate_exposure",
+            "temp_credit_control.services.temp_credit_warehouse_exposure.on_invoice_submit",
+        ],
+        "on_cancel": [
+            "temp_credit_control.services.temp_credit_validator.invalidate_exposure",
+            "temp_credit_control.services.temp_credit_warehouse_exposure.on_invoice_cancel",
+        ],
+    },
+    "POS Invoice": {
         "validate": "temp_credit_control.services.temp_credit_validator.apply_temp_credit_rules",
         "before_submit": "temp_credit_control.services.temp_credit_validator.apply_temp_credit_rules",
-    }
+        "on_submit": [
+            "temp_credit_control.services.temp_credit_validator.record_pos_invoice",
+            "temp_credit_control.services.temp_credit_warehouse_exposure.on_invoice_submit",
+        ],
+        "on_cancel": [
+            "temp_credit_control.services.temp_credit_validator.record_pos_invoice",
+            "temp_credit_control.services.temp_credit_warehouse_exposure.on_invoice_cancel",
+        ],
+    },
+    # outstanding / Temp Credit membership changes -> invalidate cached exposure
+    "Payment Entry": {
+        "on_submit": [
+            "temp_credit_control.services.temp_credit_validator.invalidate_exposure",
+            "temp_credit_control.services.temp_credit_warehouse_exposure.on_payment_change",
+        ],
+        "on_cancel": [
+            "temp_credit_control.services.temp_credit_validator.invalidate_exposure",
+            "temp_credit_control.services.temp_credit_warehouse_exposure.on_payment_change",
+        ],
+    },
+    "Journal Entry": {
+        "on_submit": [
+            "temp_credit_control.services.temp_credit_validator.invalidate_exposure",
+            "temp_credit_control.services.temp_credit_warehouse_exposure.on_payment_change",
+        ],
+        "on_cancel": [
+            "temp_credit_control.services.temp_credit_validator.invalidate_exposure",
+            "temp_credit_control.services.temp_credit_warehouse_exposure.on_payment_change",
+        ],
+    },
+    "Customer": {
+        "on_update": [
+            "temp_credit_control.services.temp_credit_validator.invalidate_customer_exposure",
+            "temp_credit_control.services.temp_credit_warehouse_exposure.on_customer_update",
+            "temp_credit_control.services.temp_credit_stamping.restamp_customer",
+        ],
+    },
 }
 
 # doc_events = {
@@ -176,6 +228,18 @@ doc_events = {
 # 	],
 # }
 
+scheduler_events = {
+	"cron": {
+		"*/5 * * * *": [
+			"temp_credit_control.services.temp_credit_dashboard.refresh_dashboard_aggregates",
+		],
+	},
+	"daily_long": [
+		"temp_credit_control.services.temp_credit_reconcile.reconcile_exposure",
+		"temp_credit_control.services.temp_credit_snapshot.take_daily_snapshot",
+	],
+}
+
 # Testing
 # -------
 
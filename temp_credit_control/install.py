@@ -0,0 +1,58 @@
+import frappe
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+
+def after_install():
+    make_custom_fields()
+
+
+def after_migrate():
+    # migrate clears the redis cache: refill it before the first invoices hit the validator
+    from temp_credit_control.services.temp_credit_warmup import enqueue_warm_up
+
+    enqueue_warm_up()
+
+
+def make_custom_fields():
+    """Denormalized Temp Credit columns on Sales Invoice (stamped on validate / submit)."""
+    create_custom_fields(
+        {
+            "Sales Invoice": [
+                {
+                    "fieldname": "temp_credit_customer",
+                    "label": "Temp Credit Customer",
+                    "fieldtype": "Check",
+                    "insert_after": "customer",
+                    "read_only": 1,
+                    "hidden": 1,
+                    "no_copy": 1,
+                    "print_hide": 1,
+                    "search_index": 1,
+                },
+                {
+                    "fieldname": "temp_credit_salesman",
+                    "label": "Temp Credit Salesman",
+                    "fieldtype": "Link",
+                    "options": "User",
+                    "insert_after": "temp_credit_customer",
+                    "read_only": 1,
+                    "hidden": 1,
+                    "no_copy": 1,
+                    "print_hide": 1,
+                    "search_index": 1,
+                },
+            ]
+        },
+        update=True,
+    )
+
+    # report / pool queries: company + TC flag + salesman
+    frappe.db.add_index("Sales Invoice", ["temp_credit_salesman", "temp_credit_customer", "outstanding_amount"])
+    frappe.db.add_index("Sales Invoice", ["company", "temp_credit_customer", "posting_date"])
+
+    add_status_report_index()
+
+
+def add_status_report_index():
+    # keyset pagination of Temp Credit Status: (posting_date, modified, name) DESC
+    frappe.db.add_index("Sales Invoice", ["company", "posting_date", "modified"])
@@ -0,0 +1,5 @@
+from temp_credit_control.install import add_status_report_index
+
+
+def execute():
+    add_status_report_index()
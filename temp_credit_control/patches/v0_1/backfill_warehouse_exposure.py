@@ -0,0 +1,26 @@
+import frappe
+
+from temp_credit_control.services.temp_credit_validator import TEMP_CREDIT_DOCTYPES, _get_settings, _unpaid_filters
+from temp_credit_control.services.temp_credit_warehouse_exposure import build_rows
+
+
+def execute():
+    """Apportion every unpaid Temp Credit invoice into Temp Credit Warehouse Exposure."""
+    settings = _get_settings()
+    tc_customers = frappe.get_all(
+        "Customer",
+        filters={settings["customer_tc_fieldname"]: settings["temp_credit_value"]},
+        pluck="name",
+    )
+    if not tc_customers:
+        return
+
+    for invoice_type in TEMP_CREDIT_DOCTYPES:
+        invoices = frappe.get_all(
+            invoice_type,
+            filters=_unpaid_filters(invoice_type, {"customer": ["in", tc_customers]}),
+            fields=["name", "customer", "outstanding_amount", "set_warehouse"],
+            limit_page_length=0,
+        )
+        for start in range(0, len(invoices), 1000):
+            build_rows(invoice_type, invoices[start : start + 1000])
@@ -0,0 +1,7 @@
+from temp_credit_control.install import make_custom_fields
+from temp_credit_control.services.temp_credit_stamping import backfill_sales_invoices
+
+
+def execute():
+    make_custom_fields()
+    backfill_sales_invoices()
@@ -171,6 +171,24 @@
     }
   }
 
+  function warmUpExposure(frm) {
+    // Fire-and-forget: server enqueues a job that fills the exposure cache,
+    // so validate / before_submit on Save hit warm cache.
+    if (!frm.doc.customer || frm.doc.docstatus !== 0) return;
+
+    const items = frm.doc.items || [];
+    frappe.call({
+      method: 'temp_credit_control.services.temp_credit_validator.warm_up_exposure',
+      args: {
+        customer: frm.doc.customer,
+        warehouse: frm.doc.set_warehouse || (items.length ? items[0].warehouse : null),
+        user: frm.doc.custom_salesman_user || frm.doc.owner || frappe.session.user
+      },
+      freeze: false,
+      error: () => {}
+    });
+  }
+
   frappe.ui.form.on(DOCTYPE, {
     refresh(frm) {
       // run once on refresh
@@ -178,6 +196,7 @@
     },
 
     customer(frm) {
+      warmUpExposure(frm);
       showTempCreditInfo(frm);
     },
 
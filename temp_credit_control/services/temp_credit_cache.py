@@ -0,0 +1,208 @@
+import hashlib
+import json
+import time
+
+import frappe
+from frappe.utils import nowdate
+
+
+EXPOSURE_VERSION_KEY = "temp_credit_exposure_version"
+DATA_VERSION_KEY = "temp_credit_data_version"
+EXPOSURE_CACHE_TTL = 15 * 60  # seconds
+REPORT_CACHE_TTL = 60 * 60  # seconds
+DASHBOARD_CACHE_TTL = 5 * 60  # seconds; the scheduler refreshes the tiles at this interval
+DASHBOARD_LOCK_TTL = 30  # seconds a cold-cache computation may hold the lock
+DASHBOARD_LOCK_WAIT = 10  # seconds other requests wait for it
+
+# exposure kinds invalidated per entity by invoice / payment changes
+ENTITY_KINDS = ("customer", "warehouse", "salesman")
+
+
+def get_exposure_version():
+    """
+    Global version: settings, policies and Temp Credit membership. Every cached
+    value is keyed by it, so bumping it invalidates all of them at once.
+    """
+    version = frappe.cache().get_value(EXPOSURE_VERSION_KEY)
+    if not version:
+        version = _new_version()
+    return version
+
+
+def get_entity_version(kind, key):
+    """Version of one customer / warehouse / salesman; bumped when its invoices or payments change."""
+    version = frappe.cache().get_value(_entity_version_key(kind, key))
+    if not version:
+        version = _new_entity_version(kind, key)
+    return version
+
+
+def get_data_version():
+    """Version for aggregates over all entities (reports): changes with any of them."""
+    data_version = frappe.cache().get_value(DATA_VERSION_KEY)
+    if not data_version:
+        data_version = _new_data_version()
+    return f"{get_exposure_version()}:{data_version}"
+
+
+def bump_exposure_version(doc=None, method=None):
+    """
+    Settings / policies / Temp Credit membership changed: drop everything.
+    Bumped now (same request sees fresh values) and again after commit
+    (so nothing computed from pre-commit data survives).
+    """
+    _new_version()
+    frappe.db.after_commit.add(_new_version)
+
+
+def bump_entity_exposure(entities):
+    """
+    Invoice / payment changes: drop only the cached exposure of the given
+    (kind, key) entities, plus the report caches. Same now + after commit
+    rule as bump_exposure_version, so unrelated warm cache survives.
+    """
+    entities = {(kind, key) for kind, key in entities if key}
+
+    def bump():
+        for kind, key in entities:
+            _new_entity_version(kind, key)
+        _new_data_version()
+
+    bump()
+    frappe.db.after_commit.add(bump)
+
+
+def get_cached_exposure(kind, key, generator):
+    """
+    Read-through cache for exposure values.
+    kind: "customer" / "warehouse" / "salesman" / ...
+    generator: callable computing the value on a miss
+    """
+    # key (and so the versions) taken before computing: a bump meanwhile orphans the value
+    cache_key = _exposure_key(kind, key)
+
+    value = frappe.cache().get_value(cache_key)
+    if value is None:
+        value = generator()
+        frappe.cache().set_value(cache_key, value, expires_in_sec=EXPOSURE_CACHE_TTL)
+
+    return value
+
+
+def get_exposure_cache_keys(kind, keys):
+    """
+    {key: cache key} for bulk loaders (warm-up). Take them before computing:
+    an entity bumped while its value is computed then misses instead of
+    being served the pre-change value.
+    """
+    return {key: _exposure_key(kind, key) for key in keys}
+
+
+def set_cached_exposure(cache_key, value):
+    """Write-through for bulk loaders, with a key from get_exposure_cache_keys."""
+    frappe.cache().set_value(cache_key, value, expires_in_sec=EXPOSURE_CACHE_TTL)
+
+
+def get_cached_report(report_name, filters, generator):
+    """
+    Read-through cache for report results, keyed by the normalized filters and
+    the data version. Invoice submit / cancel, payments, customer and
+    policy / settings changes bump it, so a hit is never stale.
+    """
+    # nowdate: durations ("Today", "Last 30 Days") are relative to today
+    cache_key = (
+        f"temp_credit_report:{get_data_version()}:{nowdate()}:"
+        f"{report_name}:{normalize_filters_hash(filters)}"
+    )
+
+    result = frappe.cache().get_value(cache_key)
+    if result is None:
+        result = generator()
+        frappe.cache().set_value(cache_key, result, expires_in_sec=REPORT_CACHE_TTL)
+
+    return result
+
+
+def get_cached_dashboard(key, generator):
+    """
+    Workspace tiles. Filled by the scheduler (set_cached_dashboard) every
+    DASHBOARD_CACHE_TTL, so requests normally only read. On a cold cache
+    one request computes it under a short lock; the others wait for its value.
+    """
+    cache_key = _dashboard_key(key)
+
+    value = frappe.cache().get_value(cache_key)
+    if value is not None:
+        return value
+
+    lock_key = f"{cache_key}:lock"
+    if not frappe.cache().set(frappe.cache().make_key(lock_key), 1, ex=DASHBOARD_LOCK_TTL, nx=True):
+        deadline = time.monotonic() + DASHBOARD_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.2)
+            value = frappe.cache().get_value(cache_key)
+            if value is not None:
+                return value
+        # lock holder too slow or gone: compute it here, once more
+        return set_cached_dashboard(key, generator)
+
+    try:
+        return set_cached_dashboard(key, generator)
+    finally:
+        frappe.cache().delete_value(lock_key)
+
+
+def set_cached_dashboard(key, generator):
+    """Compute and store a tile value (scheduler refresh, cold cache)."""
+    value = generator()
+    # outlives one refresh interval: a late or skipped job never leaves the tiles cold
+    frappe.cache().set_value(_dashboard_key(key), value, expires_in_sec=2 * DASHBOARD_CACHE_TTL)
+    return value
+
+
+def normalize_filters_hash(filters):
+    """Same hash for filters that differ only by whitespace, key order or empty values."""
+    normalized = {}
+    for key, value in (filters or {}).items():
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, "", 0, "0"):
+            continue
+        normalized[key] = value
+
+    payload = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.md5(payload.encode()).hexdigest()
+
+
+def _new_version():
+    version = frappe.generate_hash(length=12)
+    frappe.cache().set_value(EXPOSURE_VERSION_KEY, version)
+    return version
+
+
+def _exposure_key(kind, key):
+    cache_key = f"temp_credit_exposure:{get_exposure_version()}:{kind}:{key}"
+    if kind in ENTITY_KINDS:
+        cache_key += f":{get_entity_version(kind, key)}"
+    return cache_key
+
+
+def _entity_version_key(kind, key):
+    return f"{EXPOSURE_VERSION_KEY}:{kind}:{key}"
+
+
+def _new_entity_version(kind, key):
+    # outlives the values keyed by it; an expired version only means a cache miss
+    version = frappe.generate_hash(length=12)
+    frappe.cache().set_value(_entity_version_key(kind, key), version, expires_in_sec=2 * EXPOSURE_CACHE_TTL)
+    return version
+
+
+def _dashboard_key(key):
+    return f"temp_credit_dashboard:{key}"
+
+
+def _new_data_version():
+    version = frappe.generate_hash(length=12)
+    frappe.cache().set_value(DATA_VERSION_KEY, version)
+    return version
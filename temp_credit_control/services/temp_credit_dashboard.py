@@ -0,0 +1,107 @@
+import frappe
+from frappe.utils import flt
+
+from temp_credit_control.services.temp_credit_cache import get_cached_dashboard, set_cached_dashboard
+from temp_credit_control.services.temp_credit_replica import replica_read_only
+from temp_credit_control.services.temp_credit_snapshot import _customer_rows, _salesman_rows, _warehouse_rows
+from temp_credit_control.services.temp_credit_validator import _get_settings
+
+
+WAREHOUSE_NEAR_LIMIT_RATIO = 0.9  # pooled exposure / limit from which a warehouse is "near" its limit
+CHART_TOP_N = 10
+
+
+def get_dashboard_aggregates():
+    """
+    Everything the workspace tiles show, shared by all tiles. Computed with
+    the grouped snapshot queries by the scheduler, not by tile requests.
+    """
+    return get_cached_dashboard("aggregates", _compute_aggregates)
+
+
+# ---------------- Scheduler ----------------
+
+def refresh_dashboard_aggregates():
+    """Every DASHBOARD_CACHE_TTL: recompute the tiles before the cached value expires."""
+    set_cached_dashboard("aggregates", _compute_aggregates)
+
+
+def _compute_aggregates():
+    settings = _get_settings()
+    customers = _customer_rows(settings)
+    warehouses = _warehouse_rows(settings)
+    salesmen = _salesman_rows(settings)
+
+    # rows: (entity_type, entity, exposure, limit, invoice_count)
+    def over(rows, ratio=1.0):
+        return [r for r in rows if flt(r[3]) > 0 and flt(r[2]) > flt(r[3]) * ratio]
+
+    def top(rows, key):
+        return [list(r[1:4]) for r in sorted(rows, key=key, reverse=True)[:CHART_TOP_N]]
+
+    return {
+        "total_exposure": sum(flt(r[2]) for r in customers),
+        "customers_over_limit": len(over(customers)),
+        "warehouses_near_limit": len(over(warehouses, WAREHOUSE_NEAR_LIMIT_RATIO)),
+        "blocked_salesmen": frappe.db.count("Temp Credit Salesman Policy", {"enabled": 1, "is_blocked": 1}),
+        "salesmen_over_limit": len(over(salesmen)),
+        "top_customers": top(customers, key=lambda r: flt(r[2])),
+        "top_warehouses": top(warehouses, key=lambda r: flt(r[2]) / flt(r[3]) if flt(r[3]) > 0 else 0),
+    }
+
+
+def check_dashboard_permission():
+    if not frappe.has_permission("Temp Credit Exposure Snapshot", "read"):
+        frappe.throw("Not permitted", frappe.PermissionError)
+
+
+# ---------------- Number Cards ----------------
+
+@frappe.whitelist()
+@replica_read_only
+def get_total_exposure(filters=None):
+    check_dashboard_permission()
+    return {"value": get_dashboard_aggregates()["total_exposure"], "fieldtype": "Currency"}
+
+
+@frappe.whitelist()
+@replica_read_only
+def get_customers_over_limit(filters=None):
+    check_dashboard_permission()
+    return {"value": get_dashboard_aggregates()["customers_over_limit"], "fieldtype": "Int"}
+
+
+@frappe.whitelist()
+@replica_read_only
+def get_warehouses_near_limit(filters=None):
+    check_dashboard_permission()
+    return {"value": get_dashboard_aggregates()["warehouses_near_limit"], "fieldtype": "Int"}
+
+
+@frappe.whitelist()
+@replica_read_only
+def get_blocked_salesmen(filters=None):
+    check_dashboard_permission()
+    return {"value": get_dashboard_aggregates()["blocked_salesmen"], "fieldtype": "Int"}
+
+
+# ---------------- Dashboard Chart Sources ----------------
+
+def get_top_customers_chart():
+    top = get_dashboard_aggregates()["top_customers"]
+    return _exposure_chart(top)
+
+
+def get_warehouse_utilization_chart():
+    top = get_dashboard_aggregates()["top_warehouses"]
+    return _exposure_chart(top)
+
+
+def _exposure_chart(top):
+    return {
+        "labels": [entity for entity, _exposure, _limit in top],
+        "datasets": [
+            {"name": "Exposure (SAR)", "values": [round(flt(exposure), 2) for _entity, exposure, _limit in top]},
+            {"name": "Limit (SAR)", "values": [round(flt(limit), 2) for _entity, _exposure, limit in top]},
+        ],
+    }
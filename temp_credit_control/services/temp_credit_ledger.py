@@ -0,0 +1,68 @@
+import frappe
+from frappe.utils import flt
+
+
+def get_outstanding_by_invoice(parties, as_of=None, salesman=None):
+    """
+    Outstanding per Sales Invoice from Payment Ledger Entry:
+    SUM(amount_in_account_currency) grouped by party / against_voucher_no, for
+    the given customers. Never reads or locks `tabSales Invoice` unless a
+    salesman filter is requested.
+
+    as_of: only ledger rows posted on or before this date count
+    Returns {invoice: outstanding} for invoices with outstanding > 0.
+    Credit notes posted against an invoice reduce it; standalone credit notes
+    (negative balance against themselves) are left out, like is_return = 0.
+    """
+    return {r.invoice: flt(r.outstanding) for r in _ledger_rows(parties, as_of, salesman)}
+
+
+def get_outstanding_by_party(parties, as_of=None, salesman=None):
+    """{customer: (unpaid invoice count, total outstanding)} from Payment Ledger Entry."""
+    out = {}
+    for r in _ledger_rows(parties, as_of, salesman):
+        count, total = out.get(r.party, (0, 0.0))
+        out[r.party] = (count + 1, total + flt(r.outstanding))
+    return out
+
+
+def _ledger_rows(parties, as_of=None, salesman=None):
+    if isinstance(parties, str):
+        parties = [parties]
+    if not parties:
+        return []
+
+    params = {"parties": tuple(parties)}
+    cond = ""
+    if as_of:
+        cond = "AND ple.posting_date <= %(as_of)s"
+        params["as_of"] = as_of
+
+    salesman_join = ""
+    if salesman:
+        salesman_join = "INNER JOIN `tabSales Invoice` si ON si.name = x.invoice AND si.temp_credit_salesman = %(salesman)s"
+        params["salesman"] = salesman
+
+    return frappe.db.sql(
+        f"""
+        SELECT x.party, x.invoice, x.outstanding
+        FROM (
+            SELECT
+                ple.party,
+                ple.against_voucher_no AS invoice,
+                SUM(ple.amount_in_account_currency) AS outstanding
+            FROM `tabPayment Ledger Entry` ple
+            WHERE
+                ple.party_type = 'Customer'
+                AND ple.party IN %(parties)s
+                AND ple.against_voucher_type = 'Sales Invoice'
+                AND ple.delinked = 0
+                {cond}
+            GROUP BY ple.party, ple.against_voucher_no
+            HAVING outstanding > 0
+        ) x
+        {salesman_join}
+        """,
+        params,
+        as_dict=True,
+    )
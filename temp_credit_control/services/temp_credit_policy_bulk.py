@@ -0,0 +1,182 @@
+import json
+
+import frappe
+from frappe.utils import cint, flt, now
+
+from temp_credit_control.services.temp_credit_cache import bump_exposure_version
+
+
+BULK_POLICY_BATCH_SIZE = 1000  # rows per multi-row statement
+BULK_POLICY_MAX_ROWS = 50000  # rows per call
+BULK_POLICY_MAX_ERRORS = 50  # validation errors reported back
+
+# doctype -> (key field / docname, linked doctype, {field: (fieldtype, default on insert)})
+POLICY_SPECS = {
+    "Temp Credit Customer Policy": (
+        "customer",
+        "Customer",
+        {
+            "enabled": ("Check", 1),
+            "credit_limit_override": ("Currency", 0),
+            "max_unpaid_invoices_override": ("Int", 0),
+            "is_blacklisted": ("Check", 0),
+            "blacklist_reason": ("Small Text", None),
+        },
+    ),
+    "Temp Credit Salesman Policy": (
+        "user",
+        "User",
+        {
+            "enabled": ("Check", 1),
+            "max_outstanding_limit": ("Currency", 0),
+            "is_blocked": ("Check", 0),
+            "block_reason": ("Small Text", None),
+        },
+    ),
+}
+
+
+# ---------------- Endpoints ----------------
+
+@frappe.whitelist(methods=["POST"])
+def bulk_upsert_customer_policies(policies):
+    """policies: [{"customer": ..., <any policy fields>}, ...]; see bulk_upsert_policies."""
+    return bulk_upsert_policies("Temp Credit Customer Policy", policies)
+
+
+@frappe.whitelist(methods=["POST"])
+def bulk_upsert_salesman_policies(policies):
+    """policies: [{"user": ..., <any policy fields>}, ...]; see bulk_upsert_policies."""
+    return bulk_upsert_policies("Temp Credit Salesman Policy", policies)
+
+
+def bulk_upsert_policies(doctype, policies):
+    """
+    Insert or update many policies without a document save per row.
+    All rows are validated first; any error rejects the whole call.
+    Writes are multi-row INSERT ... ON DUPLICATE KEY UPDATE in the request
+    transaction; an existing policy only gets the fields given for it.
+    The exposure version is bumped once for the call, not per row.
+    """
+    for ptype in ("create", "write"):
+        if not frappe.has_permission(doctype, ptype):
+            frappe.throw(f"Not permitted to {ptype} {doctype}", frappe.PermissionError)
+
+    if isinstance(policies, str):
+        policies = json.loads(policies or "[]")
+    policies = policies or []
+    if len(policies) > BULK_POLICY_MAX_ROWS:
+        frappe.throw(f"At most {BULK_POLICY_MAX_ROWS} policies per call, got {len(policies)}.")
+
+    rows = _validate(doctype, policies)
+    if not rows:
+        return {"inserted": 0, "updated": 0}
+
+    key_field = POLICY_SPECS[doctype][0]
+    existing = set()
+    keys = [r[key_field] for r in rows]
+    for i in range(0, len(keys), BULK_POLICY_BATCH_SIZE):
+        existing.update(frappe.get_all(doctype, filters={"name": ["in", keys[i : i + BULK_POLICY_BATCH_SIZE]]}, pluck="name"))
+
+    # one statement per set of given fields, so updates never reset omitted fields
+    by_fields = {}
+    for row in rows:
+        by_fields.setdefault(tuple(sorted(f for f in row if f != key_field)), []).append(row)
+
+    for fields, group in by_fields.items():
+        for i in range(0, len(group), BULK_POLICY_BATCH_SIZE):
+            _upsert(doctype, fields, group[i : i + BULK_POLICY_BATCH_SIZE])
+
+    bump_exposure_version()
+
+    inserted = sum(1 for k in keys if k not in existing)
+    return {"inserted": inserted, "updated": len(keys) - inserted}
+
+
+# ---------------- Validation ----------------
+
+def _validate(doctype, policies):
+    """Normalized rows, or throw with the offending rows (1-based)."""
+    key_field, link_doctype, fields = POLICY_SPECS[doctype]
+    errors = []
+    rows = []
+    seen = set()
+
+    for idx, policy in enumerate(policies, start=1):
+        if not isinstance(policy, dict):
+            errors.append(f"Row {idx}: expected an object")
+            continue
+
+        key = (policy.get(key_field) or "").strip()
+        if not key:
+            errors.append(f"Row {idx}: {key_field} is required")
+            continue
+        if key in seen:
+            errors.append(f"Row {idx}: duplicate {key_field} {key}")
+            continue
+        seen.add(key)
+
+        unknown = set(policy) - set(fields) - {key_field}
+        if unknown:
+            errors.append(f"Row {idx}: unknown fields {', '.join(sorted(unknown))}")
+            continue
+
+        row = {key_field: key}
+        for fieldname, value in policy.items():
+            if fieldname == key_field:
+                continue
+            fieldtype = fields[fieldname][0]
+            if fieldtype == "Small Text":
+                row[fieldname] = (value or "").strip() or None
+                continue
+            try:
+                number = float(value or 0)
+            except (TypeError, ValueError):
+                errors.append(f"Row {idx}: {fieldname} must be a number")
+                continue
+            if number < 0 or (fieldtype == "Check" and number not in (0, 1)):
+                errors.append(f"Row {idx}: invalid {fieldname} {value}")
+                continue
+            row[fieldname] = flt(number) if fieldtype == "Currency" else cint(number)
+        rows.append(row)
+
+    # one existence query per batch instead of a link validation per document
+    found = set()
+    keys = [r[key_field] for r in rows]
+    for i in range(0, len(keys), BULK_POLICY_BATCH_SIZE):
+        found.update(frappe.get_all(link_doctype, filters={"name": ["in", keys[i : i + BULK_POLICY_BATCH_SIZE]]}, pluck="name"))
+    errors += [f"{link_doctype} {k} not found" for k in keys if k not in found]
+
+    if errors:
+        more = f"\n... and {len(errors) - BULK_POLICY_MAX_ERRORS} more" if len(errors) > BULK_POLICY_MAX_ERRORS else ""
+        frappe.throw("\n".join(errors[:BULK_POLICY_MAX_ERRORS]) + more, title=f"Invalid {doctype} rows")
+
+    return rows
+
+
+# ---------------- Write ----------------
+
+def _upsert(doctype, given, rows):
+    """Rows share the same given fields; omitted fields get their default on insert only."""
+    key_field, _, fields = POLICY_SPECS[doctype]
+    columns = ["name", "creation", "modified", "owner", "modified_by", key_field, *fields]
+
+    timestamp = now()
+    user = frappe.session.user
+
+    placeholders = []
+    params = []
+    for row in rows:
+        placeholders.append("(" + ", ".join(["%s"] * len(columns)) + ")")
+        params += [row[key_field], timestamp, timestamp, user, user, row[key_field]]
+        params += [row[f] if f in row else default for f, (_, default) in fields.items()]
+
+    updates = ", ".join(f"`{f}` = VALUES(`{f}`)" for f in ("modified", "modified_by", *given))
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tab{doctype}` ({", ".join(f"`{c}`" for c in columns)})
+        VALUES {", ".join(placeholders)}
+        ON DUPLICATE KEY UPDATE {updates}
+        """,
+        tuple(params),
+    )
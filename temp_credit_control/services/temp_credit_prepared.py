@@ -0,0 +1,80 @@
+import json
+import zlib
+
+import frappe
+from frappe.utils import now_datetime, time_diff_in_seconds
+
+from temp_credit_control.services.temp_credit_cache import normalize_filters_hash
+
+
+PREPARED_RESULT_TTL = 6 * 60 * 60  # seconds a prepared result is kept
+PREPARED_REUSE_AGE = 30 * 60  # seconds a completed result is reused for matching filters
+PREPARED_EVENT = "temp_credit_prepared_report"
+
+
+def get_prepared_key(report_name, filters):
+    return f"temp_credit_prepared:{report_name}:{normalize_filters_hash(filters)}"
+
+
+def get_prepared_meta(key):
+    return frappe.cache().get_value(f"{key}:meta")
+
+
+def set_prepared_meta(key, meta):
+    frappe.cache().set_value(f"{key}:meta", meta, expires_in_sec=PREPARED_RESULT_TTL)
+
+
+def store_chunk(key, idx, rows):
+    """Rows are stored as zlib-compressed compact JSON, one cache entry per chunk."""
+    payload = json.dumps(rows, default=str, separators=(",", ":")).encode()
+    frappe.cache().set_value(f"{key}:chunk:{idx}", zlib.compress(payload), expires_in_sec=PREPARED_RESULT_TTL)
+
+
+def get_chunk(key, idx):
+    blob = frappe.cache().get_value(f"{key}:chunk:{idx}")
+    if not blob:
+        return []
+    return json.loads(zlib.decompress(blob))
+
+
+def enqueue_prepared(report_name, filters, method):
+    """
+    Reuse a running or recent completed result for the same filters,
+    otherwise enqueue `method(key=..., filters=...)` on the long queue.
+    Returns the meta dict.
+    """
+    key = get_prepared_key(report_name, filters)
+    meta = get_prepared_meta(key)
+
+    if meta and meta.get("status") in ("Queued", "Running"):
+        return meta
+    if meta and meta.get("status") == "Completed":
+        if time_diff_in_seconds(now_datetime(), meta["created"]) <= PREPARED_REUSE_AGE:
+            return meta
+
+    meta = {"key": key, "status": "Queued", "progress": 0, "created": now_datetime(), "user": frappe.session.user}
+    set_prepared_meta(key, meta)
+
+    frappe.enqueue(
+        method,
+        queue="long",
+        timeout=3600,
+        job_id=key,
+        deduplicate=True,
+        key=key,
+        filters=filters,
+    )
+    return meta
+
+
+def publish_progress(meta, progress, status=None):
+    meta["progress"] = progress
+    if status:
+        meta["status"] = status
+    set_prepared_meta(meta["key"], meta)
+
+    frappe.publish_realtime(
+        PREPARED_EVENT,
+        {"key": meta["key"], "progress": progress, "status": meta["status"]},
+        user=meta.get("user"),
+    )
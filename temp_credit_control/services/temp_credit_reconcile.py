@@ -0,0 +1,251 @@
+import frappe
+from frappe.utils import flt, now
+
+from temp_credit_control.services.temp_credit_cache import bump_exposure_version
+from temp_credit_control.services.temp_credit_validator import (
+    TEMP_CREDIT_DOCTYPES,
+    _get_settings,
+    _salesman_expr,
+    _unpaid_filters,
+    get_warehouse_shares,
+)
+from temp_credit_control.services.temp_credit_warehouse_exposure import EXPOSURE_DOCTYPE, build_rows
+
+
+RECONCILE_CHUNK_SIZE = 500  # customers per background job
+RECONCILE_TTL = 24 * 60 * 60  # seconds run progress is kept (resume window)
+RECONCILE_RUN_KEY = "temp_credit_reconcile:current"
+RECONCILE_SUMMARY_KEY = "temp_credit_reconcile:last_summary"
+DRIFT_TOLERANCE = 0.01  # SAR
+
+DRIFT_COUNTERS = ("stamps_fixed", "exposure_missing", "exposure_mismatch", "exposure_stale", "exposure_zero_rows")
+
+
+# ---------------- Entry points ----------------
+
+def reconcile_exposure():
+    """
+    Scheduler / on demand: recompute stamps and warehouse exposure from the
+    invoices, in customer chunks spread over the long-queue workers.
+    An unfinished run is resumed (only its missing chunks are enqueued).
+    """
+    run = frappe.cache().get_value(RECONCILE_RUN_KEY)
+    if not run or run.get("finished"):
+        customers = frappe.get_all("Customer", pluck="name", order_by="name asc")
+        chunks = [customers[i : i + RECONCILE_CHUNK_SIZE] for i in range(0, len(customers), RECONCILE_CHUNK_SIZE)]
+        run = {"run_id": frappe.generate_hash(length=10), "started": now(), "chunks": len(chunks), "finished": 0}
+        _set(RECONCILE_RUN_KEY, run)
+        for idx, chunk in enumerate(chunks):
+            _set(_chunk_key(run["run_id"], idx, "customers"), chunk)
+
+    for idx in range(run["chunks"]):
+        if frappe.cache().get_value(_chunk_key(run["run_id"], idx, "drift")) is None:
+            frappe.enqueue(
+                "temp_credit_control.services.temp_credit_reconcile.reconcile_chunk",
+                queue="long",
+                job_id=f"temp_credit_reconcile::{run['run_id']}::{idx}",
+                deduplicate=True,
+                run_id=run["run_id"],
+                idx=idx,
+            )
+
+    return run
+
+
+@frappe.whitelist()
+def run_reconciliation():
+    frappe.only_for("System Manager")
+    return reconcile_exposure()
+
+
+@frappe.whitelist()
+def get_reconciliation_status():
+    frappe.only_for(("System Manager", "Accounts Manager"))
+    run = frappe.cache().get_value(RECONCILE_RUN_KEY) or {}
+    done = 0
+    if run:
+        done = sum(
+            1
+            for idx in range(run["chunks"])
+            if frappe.cache().get_value(_chunk_key(run["run_id"], idx, "drift")) is not None
+        )
+    return {"run": run, "chunks_done": done, "last_summary": frappe.cache().get_value(RECONCILE_SUMMARY_KEY)}
+
+
+# ---------------- Chunk job ----------------
+
+def reconcile_chunk(run_id, idx):
+    """
+    One chunk of customers. Idempotent: everything is recomputed from the
+    invoices, so a retried or duplicated chunk finds nothing left to fix.
+    Its drift counts are stored under the run; the last chunk to finish
+    writes the summary.
+    """
+    customers = frappe.cache().get_value(_chunk_key(run_id, idx, "customers"))
+    if customers is None:
+        return  # run expired
+
+    drift = dict.fromkeys(DRIFT_COUNTERS, 0)
+    if customers:
+        settings = _get_settings()
+        drift["stamps_fixed"] = _reconcile_stamps(customers, settings)
+        drift.update(_reconcile_warehouse_exposure(customers, settings))
+
+    frappe.db.commit()
+    _set(_chunk_key(run_id, idx, "drift"), drift)
+    _finish_if_complete(run_id)
+
+
+def _reconcile_stamps(customers, settings):
+    """Re-stamp temp_credit_customer / temp_credit_salesman where they differ; returns rows fixed."""
+    salesman_expr = _salesman_expr("Sales Invoice", "si")
+    tc_expr = f"IF(TRIM(IFNULL(c.`{settings['customer_tc_fieldname']}`, '')) = %(tc_value)s, 1, 0)"
+
+    frappe.db.sql(
+        f"""
+        UPDATE `tabSales Invoice` si
+        INNER JOIN `tabCustomer` c ON c.name = si.customer
+        SET
+            si.temp_credit_customer = {tc_expr},
+            si.temp_credit_salesman = {salesman_expr}
+        WHERE
+            si.customer IN %(customers)s
+            AND (
+                IFNULL(si.temp_credit_customer, 0) != {tc_expr}
+                OR IFNULL(si.temp_credit_salesman, '') != {salesman_expr}
+            )
+        """,
+        {"customers": tuple(customers), "tc_value": settings["temp_credit_value"]},
+    )
+    return frappe.db.sql("SELECT ROW_COUNT()")[0][0]
+
+
+def _reconcile_warehouse_exposure(customers, settings):
+    """
+    Compare stored exposure rows with the unpaid TC invoices of the chunk:
+      missing  -> unpaid TC invoice without rows
+      mismatch -> SUM(rows) != invoice outstanding
+      stale    -> rows with outstanding left on an invoice that is paid / cancelled / no longer TC
+      zero     -> rows of such an invoice already scaled to 0 (left behind by older versions)
+    Drifted invoices are rebuilt, stale and zero rows deleted.
+    """
+    drift = {"exposure_missing": 0, "exposure_mismatch": 0, "exposure_stale": 0, "exposure_zero_rows": 0}
+
+    tc_customers = frappe.get_all(
+        "Customer",
+        filters={"name": ["in", customers], settings["customer_tc_fieldname"]: settings["temp_credit_value"]},
+        pluck="name",
+    )
+
+    stored = {}
+    for r in frappe.db.sql(
+        f"""
+        SELECT invoice_type, invoice, SUM(outstanding_amount) AS outstanding
+        FROM `tab{EXPOSURE_DOCTYPE}`
+        WHERE customer IN %(customers)s
+        GROUP BY invoice_type, invoice
+        """,
+        {"customers": tuple(customers)},
+        as_dict=True,
+    ):
+        stored[(r.invoice_type, r.invoice)] = flt(r.outstanding)
+
+    expected = set()
+    for invoice_type in TEMP_CREDIT_DOCTYPES:
+        if not tc_customers:
+            break
+
+        invoices = frappe.get_all(
+            invoice_type,
+            filters=_unpaid_filters(invoice_type, {"customer": ["in", tc_customers]}),
+            fields=["name", "customer", "outstanding_amount", "set_warehouse"],
+            limit_page_length=0,
+        )
+
+        # invoices without any warehouse (services only) legitimately have no rows
+        unstored = [inv for inv in invoices if (invoice_type, inv.name) not in stored]
+        with_shares = _invoices_with_warehouse_shares(invoice_type, unstored)
+
+        to_rebuild = []
+        for inv in invoices:
+            key = (invoice_type, inv.name)
+            expected.add(key)
+            if key not in stored:
+                if inv.name not in with_shares:
+                    continue
+                drift["exposure_missing"] += 1
+                to_rebuild.append(inv)
+            elif abs(stored[key] - flt(inv.outstanding_amount)) > DRIFT_TOLERANCE:
+                drift["exposure_mismatch"] += 1
+                to_rebuild.append(inv)
+
+        build_rows(invoice_type, to_rebuild)
+
+    stale = {}
+    for (invoice_type, invoice), outstanding in stored.items():
+        if (invoice_type, invoice) in expected:
+            continue
+        stale.setdefault(invoice_type, []).append(invoice)
+        if outstanding > DRIFT_TOLERANCE:
+            drift["exposure_stale"] += 1
+        else:
+            drift["exposure_zero_rows"] += 1
+
+    for invoice_type, invoices in stale.items():
+        frappe.db.delete(EXPOSURE_DOCTYPE, {"invoice_type": invoice_type, "invoice": ["in", invoices]})
+
+    return drift
+
+
+def _invoices_with_warehouse_shares(invoice_type, invoices):
+    """Names of the invoices get_warehouse_shares gives at least one warehouse (header or items)."""
+    names = {inv.name for inv in invoices if inv.set_warehouse}
+    rest = [inv.name for inv in invoices if not inv.set_warehouse]
+    if rest:
+        items_by_invoice = {}
+        for r in frappe.get_all(
+            f"{invoice_type} Item",
+            filters={"parent": ["in", rest], "parenttype": invoice_type},
+            fields=["parent", "warehouse", "base_net_amount"],
+            limit_page_length=0,
+        ):
+            items_by_invoice.setdefault(r.parent, []).append(r)
+
+        names.update(name for name in rest if get_warehouse_shares(items_by_invoice.get(name)))
+
+    return names
+
+
+# ---------------- Run bookkeeping ----------------
+
+def _finish_if_complete(run_id):
+    run = frappe.cache().get_value(RECONCILE_RUN_KEY)
+    if not run or run["run_id"] != run_id or run.get("finished"):
+        return
+
+    summary = dict.fromkeys(DRIFT_COUNTERS, 0)
+    for idx in range(run["chunks"]):
+        drift = frappe.cache().get_value(_chunk_key(run_id, idx, "drift"))
+        if drift is None:
+            return  # other chunks still running
+        for k in DRIFT_COUNTERS:
+            summary[k] += drift.get(k, 0)
+
+    run.update({"finished": 1, "finished_at": now()})
+    _set(RECONCILE_RUN_KEY, run)
+
+    summary.update({"run_id": run_id, "started": run["started"], "finished": run["finished_at"], "chunks": run["chunks"]})
+    _set(RECONCILE_SUMMARY_KEY, summary)
+    frappe.logger("temp_credit").info(f"Temp Credit reconciliation: {summary}")
+
+    # repaired rows / stamps feed the cached exposure: drop it once per run (zero rows never counted)
+    if any(summary[k] for k in DRIFT_COUNTERS if k != "exposure_zero_rows"):
+        bump_exposure_version()
+
+
+def _chunk_key(run_id, idx, part):
+    return f"temp_credit_reconcile:{run_id}:{idx}:{part}"
+
+
+def _set(key, value):
+    frappe.cache().set_value(key, value, expires_in_sec=RECONCILE_TTL)
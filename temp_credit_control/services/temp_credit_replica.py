@@ -0,0 +1,71 @@
+import functools
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import cint
+
+
+REPLICA_LAG_KEY = "temp_credit_replica_lag"
+REPLICA_LAG_CHECK_TTL = 30  # seconds a measured lag is trusted
+DEFAULT_MAX_REPLICA_LAG = 10  # seconds; override with temp_credit_max_replica_lag in site_config
+
+
+def replica_read_only(fn):
+    """
+    frappe.read_only() with a lag guard, for reports and read-only endpoints.
+    With read_from_replica / replica_host in site_config the call reads from
+    the replica while it is at most temp_credit_max_replica_lag seconds behind,
+    otherwise (or when the lag cannot be measured) from the primary.
+    Never use it on anything that writes: the validator stays on the primary.
+    """
+
+    @frappe.read_only()
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with primary_if_replica_lagging():
+            # frappe.call drops request args the function does not take (cmd, ...)
+            return frappe.call(fn, *args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def primary_if_replica_lagging():
+    """Inside frappe.read_only(): point frappe.db back at the primary while the replica lags."""
+    primary = getattr(frappe.local, "primary_db", None)
+    if primary is None or replica_is_fresh(frappe.local.db):
+        yield
+        return
+
+    replica = frappe.local.db
+    frappe.local.db = primary
+    try:
+        yield
+    finally:
+        frappe.local.db = replica
+
+
+def replica_is_fresh(replica_db):
+    lag = frappe.cache().get_value(REPLICA_LAG_KEY)
+    if lag is None:
+        lag = _measure_replica_lag(replica_db)
+        frappe.cache().set_value(REPLICA_LAG_KEY, lag, expires_in_sec=REPLICA_LAG_CHECK_TTL)
+
+    return 0 <= lag <= get_max_replica_lag()
+
+
+def get_max_replica_lag():
+    """Seconds a replica read may be behind the primary."""
+    return cint(frappe.conf.get("temp_credit_max_replica_lag") or DEFAULT_MAX_REPLICA_LAG)
+
+
+def _measure_replica_lag(replica_db):
+    """Seconds_Behind_Master of the replica; -1 if unknown (replication stopped, no privilege)."""
+    try:
+        status = replica_db.sql("SHOW SLAVE STATUS", as_dict=True)
+    except Exception:
+        return -1
+
+    if not status or status[0].get("Seconds_Behind_Master") is None:
+        return -1
+    return cint(status[0]["Seconds_Behind_Master"])
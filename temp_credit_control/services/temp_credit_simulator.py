@@ -0,0 +1,218 @@
+import json
+
+import frappe
+from frappe.utils import cint, flt
+
+from temp_credit_control.services.temp_credit_cache import get_cached_report
+from temp_credit_control.services.temp_credit_replica import replica_read_only
+from temp_credit_control.services.temp_credit_snapshot import _warehouse_rows
+from temp_credit_control.services.temp_credit_validator import (
+    _get_settings,
+    _get_tc_customers,
+    _salesman_expr,
+    bulk_customer_outstanding,
+    bulk_salesman_outstanding,
+    get_limit_settings,
+)
+
+
+SIMULATED_SETTINGS = (
+    "default_customer_limit",
+    "default_max_unpaid_invoices",
+    "default_warehouse_limit",
+    "default_salesman_limit",
+)
+SIMULATOR_BATCH_SIZE = 1000  # customers per grouped exposure query
+SIMULATOR_MAX_CANDIDATES = 50
+SIMULATOR_MAX_ENTITIES = 200  # affected entities returned per kind and candidate (worst first)
+
+
+# ---------------- Endpoint ----------------
+
+@frappe.whitelist()
+@replica_read_only
+def simulate_limits(candidates=None):
+    """
+    Customers / warehouses / salesmen over limit for each candidate set of
+    default limits. Keys missing from a candidate keep the current setting.
+    Exposure and policies are loaded once (cached per data version),
+    every candidate is then a handful of vectorized comparisons.
+    """
+    frappe.only_for(("System Manager", "Accounts Manager"))
+
+    if isinstance(candidates, str):
+        candidates = json.loads(candidates or "[]")
+    candidates = (candidates or [{}])[:SIMULATOR_MAX_CANDIDATES]
+
+    settings = _get_settings()
+    arrays = _load_arrays(settings)
+
+    results = []
+    for candidate in candidates:
+        # same normalization as the saved settings; missing keys keep the current value
+        limits = get_limit_settings(lambda k, _default, c=candidate: settings[k] if c.get(k) in (None, "") else c[k])
+        results.append({"settings": limits, **_evaluate(arrays, limits)})
+
+    return {
+        "current": {k: settings[k] for k in SIMULATED_SETTINGS},
+        "enable_warehouse_limit": settings["enable_warehouse_limit"],
+        "enable_salesman_limit": settings["enable_salesman_limit"],
+        "population": {kind: len(arrays[kind]["entity"]) for kind in ("customers", "warehouses", "salesmen")},
+        "results": results,
+    }
+
+
+# ---------------- Vectorized evaluation ----------------
+
+def _evaluate(arrays, limits):
+    """
+    Same rules as the validator on current exposure:
+      customer  -> override if > 0 else default (_effective_flt / _effective_int);
+                   over when invoices > max or outstanding > limit
+      warehouse -> pooled exposure > default_warehouse_limit
+      salesman  -> enabled policy limit, else default; only checked when limit > 0
+    Disabled / blacklisted customers and blocked salesmen are exempt (blocked anyway).
+    """
+    import numpy as np
+
+    c = arrays["customers"]
+    max_credit = np.where(c["credit_override"] > 0, c["credit_override"], limits["default_customer_limit"])
+    max_invoices = np.where(c["invoices_override"] > 0, c["invoices_override"], limits["default_max_unpaid_invoices"])
+    customers_over = c["checked"] & ((c["count"] > max_invoices) | (c["outstanding"] > max_credit))
+
+    w = arrays["warehouses"]
+    warehouse_limit = limits["default_warehouse_limit"]
+    warehouses_over = w["outstanding"] > warehouse_limit
+
+    s = arrays["salesmen"]
+    salesman_limit = np.where(s["has_policy"], s["policy_limit"], limits["default_salesman_limit"])
+    salesmen_over = s["checked"] & (salesman_limit > 0) & (s["outstanding"] > salesman_limit)
+
+    return {
+        "customers": _affected(c, customers_over, c["outstanding"] - max_credit, max_credit),
+        "warehouses": _affected(w, warehouses_over, w["outstanding"] - warehouse_limit, np.full(len(w["entity"]), warehouse_limit)),
+        "salesmen": _affected(s, salesmen_over, s["outstanding"] - salesman_limit, salesman_limit),
+    }
+
+
+def _affected(columns, mask, excess, limit):
+    import numpy as np
+
+    idx = np.flatnonzero(mask)
+    idx = idx[np.argsort(-excess[idx], kind="stable")][:SIMULATOR_MAX_ENTITIES]
+    return {
+        "count": int(mask.sum()),
+        "exposure": float(columns["outstanding"][mask].sum()),
+        "entities": [
+            {"entity": columns["entity"][i], "outstanding": float(columns["outstanding"][i]), "limit": float(limit[i])}
+            for i in idx
+        ],
+    }
+
+
+# ---------------- Columnar load ----------------
+
+def _load_arrays(settings):
+    # keyed by the data version: any invoice / payment change reloads it
+    return _to_arrays(get_cached_report("Temp Credit Policy Simulator", {}, lambda: _load_columns(settings)))
+
+
+def _to_arrays(data):
+    import numpy as np
+
+    c, w, s = data["customers"], data["warehouses"], data["salesmen"]
+    return {
+        "customers": {
+            "entity": c["entity"],
+            "count": np.array(c["count"], dtype=np.int64),
+            "outstanding": np.array(c["outstanding"], dtype=np.float64),
+            "credit_override": np.array(c["credit_override"], dtype=np.float64),
+            "invoices_override": np.array(c["invoices_override"], dtype=np.int64),
+            "checked": np.array(c["checked"], dtype=bool),
+        },
+        "warehouses": {
+            "entity": w["entity"],
+            "outstanding": np.array(w["outstanding"], dtype=np.float64),
+        },
+        "salesmen": {
+            "entity": s["entity"],
+            "outstanding": np.array(s["outstanding"], dtype=np.float64),
+            "has_policy": np.array(s["has_policy"], dtype=bool),
+            "policy_limit": np.array(s["policy_limit"], dtype=np.float64),
+            "checked": np.array(s["checked"], dtype=bool),
+        },
+    }
+
+
+def _load_columns(settings):
+    """Plain column lists (picklable for the cache); only entities with unpaid TC exposure."""
+    customers = {k: [] for k in ("entity", "count", "outstanding", "credit_override", "invoices_override", "checked")}
+    policies = {
+        p.customer: p
+        for p in frappe.get_all(
+            "Temp Credit Customer Policy",
+            fields=["customer", "enabled", "credit_limit_override", "max_unpaid_invoices_override", "is_blacklisted"],
+            limit_page_length=0,
+        )
+    }
+    tc_customers = _get_tc_customers(settings["customer_tc_fieldname"], settings["temp_credit_value"])
+    for i in range(0, len(tc_customers), SIMULATOR_BATCH_SIZE):
+        batch = tc_customers[i : i + SIMULATOR_BATCH_SIZE]
+        for customer, (count, outstanding) in bulk_customer_outstanding(batch, settings).items():
+            if not count and not outstanding:
+                continue
+            pol = policies.get(customer) or {}
+            customers["entity"].append(customer)
+            customers["count"].append(int(count))
+            customers["outstanding"].append(flt(outstanding))
+            customers["credit_override"].append(flt(pol.get("credit_limit_override")))
+            customers["invoices_override"].append(cint(pol.get("max_unpaid_invoices_override")))
+            customers["checked"].append(flt(pol.get("enabled", 1)) == 1 and flt(pol.get("is_blacklisted", 0)) == 0)
+
+    warehouse_rows = _warehouse_rows(settings)
+    warehouses = {
+        "entity": [r[1] for r in warehouse_rows],
+        "outstanding": [flt(r[2]) for r in warehouse_rows],
+    }
+
+    salesmen = {k: [] for k in ("entity", "outstanding", "has_policy", "policy_limit", "checked")}
+    salesman_policies = {
+        p.user: p
+        for p in frappe.get_all(
+            "Temp Credit Salesman Policy",
+            fields=["user", "enabled", "max_outstanding_limit", "is_blocked"],
+            limit_page_length=0,
+        )
+    }
+    for user, outstanding in bulk_salesman_outstanding(_exposed_salesmen(settings), settings).items():
+        if not outstanding:
+            continue
+        pol = salesman_policies.get(user)
+        enabled = bool(pol) and flt(pol.enabled) == 1
+        salesmen["entity"].append(user)
+        salesmen["outstanding"].append(flt(outstanding))
+        salesmen["has_policy"].append(enabled)
+        salesmen["policy_limit"].append(flt(pol.max_outstanding_limit) if enabled else 0.0)
+        salesmen["checked"].append(not (enabled and flt(pol.is_blocked) == 1))
+
+    return {"customers": customers, "warehouses": warehouses, "salesmen": salesmen}
+
+
+def _exposed_salesmen(settings):
+    return frappe.db.sql_list(
+        f"""
+        SELECT DISTINCT temp_credit_salesman
+        FROM `tabSales Invoice`
+        WHERE
+            temp_credit_customer = 1 AND docstatus = 1 AND is_return = 0 AND outstanding_amount > 0
+            AND IFNULL(temp_credit_salesman, '') != ''
+        UNION
+        SELECT DISTINCT {_salesman_expr("POS Invoice", "pi")}
+        FROM `tabPOS Invoice` pi
+        INNER JOIN `tabCustomer` c ON c.name = pi.customer AND c.`{settings["customer_tc_fieldname"]}` = %(tc_value)s
+        WHERE
+            pi.docstatus = 1 AND pi.is_return = 0 AND pi.outstanding_amount > 0
+            AND IFNULL(pi.consolidated_invoice, '') = ''
+        """,
+        {"tc_value": settings["temp_credit_value"]},
+    )
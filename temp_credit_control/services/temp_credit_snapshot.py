@@ -0,0 +1,207 @@
+import frappe
+from frappe.utils import add_days, flt, now, nowdate
+
+from temp_credit_control.services.temp_credit_validator import _effective_flt, _get_settings, _salesman_expr
+
+
+SNAPSHOT_DOCTYPE = "Temp Credit Exposure Snapshot"
+SNAPSHOT_BATCH_SIZE = 1000  # rows per multi-row upsert
+
+
+# ---------------- Scheduler ----------------
+
+def take_daily_snapshot(snapshot_date=None):
+    """
+    Daily job: exposure, limit and unpaid invoice count per Temp Credit
+    customer, warehouse and salesman, one row per entity per day.
+    The day's rows are replaced in one transaction, so re-running on the
+    same day never keeps values of entities paid down since.
+    """
+    settings = _get_settings()
+    if not settings["enabled"]:
+        return
+
+    snapshot_date = snapshot_date or nowdate()
+
+    rows = []
+    rows += _customer_rows(settings)
+    rows += _warehouse_rows(settings)
+    rows += _salesman_rows(settings)
+    rows += _paid_down_rows(snapshot_date, rows)
+
+    frappe.db.delete(SNAPSHOT_DOCTYPE, {"snapshot_date": snapshot_date})
+    for i in range(0, len(rows), SNAPSHOT_BATCH_SIZE):
+        _upsert(snapshot_date, rows[i : i + SNAPSHOT_BATCH_SIZE])
+
+
+# ---------------- Exposure per entity ----------------
+
+def _customer_rows(settings):
+    params = {"tc_value": settings["temp_credit_value"]}
+    tc_field = settings["customer_tc_fieldname"]
+
+    totals = {}
+    for customer, count, outstanding in frappe.db.sql(
+        f"""
+        SELECT customer, COUNT(name), SUM(outstanding_amount)
+        FROM `tabSales Invoice`
+        WHERE temp_credit_customer = 1 AND docstatus = 1 AND is_return = 0 AND outstanding_amount > 0
+        GROUP BY customer
+        UNION ALL
+        SELECT pi.customer, COUNT(pi.name), SUM(pi.outstanding_amount)
+        FROM `tabPOS Invoice` pi
+        INNER JOIN `tabCustomer` c ON c.name = pi.customer AND c.`{tc_field}` = %(tc_value)s
+        WHERE
+            pi.docstatus = 1 AND pi.is_return = 0 AND pi.outstanding_amount > 0
+            AND IFNULL(pi.consolidated_invoice, '') = ''
+        GROUP BY pi.customer
+        """,
+        params,
+    ):
+        c, o = totals.get(customer, (0, 0.0))
+        totals[customer] = (c + int(count or 0), o + flt(outstanding))
+
+    policies = {
+        p.customer: p
+        for p in frappe.get_all(
+            "Temp Credit Customer Policy",
+            fields=["customer", "enabled", "credit_limit_override"],
+            limit_page_length=0,
+        )
+    }
+
+    out = []
+    for customer, (count, outstanding) in totals.items():
+        pol = policies.get(customer) or {}
+        override = pol.get("credit_limit_override") if flt(pol.get("enabled", 1)) == 1 else None
+        out.append(("Customer", customer, outstanding, _effective_flt(override, settings["default_customer_limit"]), count))
+
+    return out
+
+
+def _warehouse_rows(settings):
+    rows = frappe.db.sql(
+        """
+        SELECT warehouse, COUNT(DISTINCT invoice), SUM(outstanding_amount)
+        FROM `tabTemp Credit Warehouse Exposure`
+        WHERE outstanding_amount > 0
+        GROUP BY warehouse
+        """
+    )
+    limit = settings["default_warehouse_limit"]
+    return [("Warehouse", warehouse, flt(outstanding), limit, int(count or 0)) for warehouse, count, outstanding in rows]
+
+
+def _salesman_rows(settings):
+    params = {"tc_value": settings["temp_credit_value"]}
+    tc_field = settings["customer_tc_fieldname"]
+
+    totals = {}
+    for user, count, outstanding in frappe.db.sql(
+        f"""
+        SELECT temp_credit_salesman, COUNT(name), SUM(outstanding_amount)
+        FROM `tabSales Invoice`
+        WHERE
+            temp_credit_customer = 1 AND docstatus = 1 AND is_return = 0 AND outstanding_amount > 0
+            AND IFNULL(temp_credit_salesman, '') != ''
+        GROUP BY temp_credit_salesman
+        UNION ALL
+        SELECT {_salesman_expr("POS Invoice", "pi")} AS salesman, COUNT(pi.name), SUM(pi.outstanding_amount)
+        FROM `tabPOS Invoice` pi
+        INNER JOIN `tabCustomer` c ON c.name = pi.customer AND c.`{tc_field}` = %(tc_value)s
+        WHERE
+            pi.docstatus = 1 AND pi.is_return = 0 AND pi.outstanding_amount > 0
+            AND IFNULL(pi.consolidated_invoice, '') = ''
+        GROUP BY salesman
+        """,
+        params,
+    ):
+        c, o = totals.get(user, (0, 0.0))
+        totals[user] = (c + int(count or 0), o + flt(outstanding))
+
+    policies = {
+        p.user: p
+        for p in frappe.get_all(
+            "Temp Credit Salesman Policy",
+            fields=["user", "enabled", "max_outstanding_limit"],
+            limit_page_length=0,
+        )
+    }
+
+    out = []
+    for user, (count, outstanding) in totals.items():
+        # same resolution as the validator: enabled policy wins, else settings default
+        pol = policies.get(user)
+        if pol and flt(pol.enabled) == 1:
+            limit = flt(pol.max_outstanding_limit)
+        else:
+            limit = settings["default_salesman_limit"]
+        out.append(("Salesman", user, outstanding, limit, count))
+
+    return out
+
+
+def _paid_down_rows(snapshot_date, rows):
+    """
+    Explicit 0 rows for entities with exposure the day before (or in an
+    earlier run of the same day) and none now, so the trend drops to 0
+    instead of showing a gap.
+    """
+    current = {(r[0], r[1]) for r in rows}
+    previous = frappe.get_all(
+        SNAPSHOT_DOCTYPE,
+        filters={"snapshot_date": ["in", [add_days(snapshot_date, -1), snapshot_date]], "exposure": [">", 0]},
+        fields=["entity_type", "entity", "credit_limit"],
+        limit_page_length=0,
+    )
+
+    out = {}
+    for p in previous:
+        if (p.entity_type, p.entity) not in current:
+            out[(p.entity_type, p.entity)] = (p.entity_type, p.entity, 0.0, flt(p.credit_limit), 0)
+    return list(out.values())
+
+
+# ---------------- Write ----------------
+
+def _upsert(snapshot_date, rows):
+    if not rows:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+
+    placeholders = []
+    params = []
+    for entity_type, entity, exposure, limit, count in rows:
+        placeholders.append("(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)")
+        params += [
+            frappe.generate_hash(length=10),
+            timestamp,
+            timestamp,
+            user,
+            user,
+            snapshot_date,
+            entity_type,
+            entity,
+            flt(exposure),
+            flt(limit),
+            int(count),
+            flt(exposure) * 100 / flt(limit) if flt(limit) > 0 else 0,
+        ]
+
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tab{SNAPSHOT_DOCTYPE}`
+            (name, creation, modified, owner, modified_by,
+             snapshot_date, entity_type, entity, exposure, credit_limit, invoice_count, utilization)
+        VALUES {", ".join(placeholders)}
+        ON DUPLICATE KEY UPDATE
+            modified = VALUES(modified),
+            exposure = VALUES(exposure),
+            credit_limit = VALUES(credit_limit),
+            invoice_count = VALUES(invoice_count),
+            utilization = VALUES(utilization)
+        """,
+        tuple(params),
+    )
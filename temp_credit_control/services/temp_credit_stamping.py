@@ -0,0 +1,77 @@
+import frappe
+
+from temp_credit_control.services.temp_credit_cache import bump_exposure_version
+from temp_credit_control.services.temp_credit_validator import (
+    SALESMAN_FIELD,
+    _get_settings,
+    _is_temp_credit_customer,
+    _salesman_expr,
+)
+
+
+def stamp_sales_invoice(doc, method=None):
+    """
+    Sales Invoice validate: stamp the Temp Credit flag and the resolved salesman
+    (custom_salesman_user, else owner), so reports filter / group on plain
+    indexed columns instead of IN lists and IFNULL expressions.
+    """
+    settings = _get_settings()
+
+    is_tc = bool(doc.customer) and _is_temp_credit_customer(
+        doc.customer, settings["customer_tc_fieldname"], settings["temp_credit_value"]
+    )
+    doc.temp_credit_customer = 1 if is_tc else 0
+    doc.temp_credit_salesman = (doc.get(SALESMAN_FIELD) or "").strip() or doc.owner or frappe.session.user
+
+
+def restamp_customer(doc, method=None):
+    """Customer on_update: payment type changed -> re-stamp all of the customer's invoices."""
+    settings = _get_settings()
+    tc_fieldname = settings["customer_tc_fieldname"]
+    if not doc.has_value_changed(tc_fieldname):
+        return
+
+    is_tc = (doc.get(tc_fieldname) or "").strip() == settings["temp_credit_value"]
+    frappe.db.sql(
+        """
+        UPDATE `tabSales Invoice`
+        SET temp_credit_customer = %s
+        WHERE customer = %s
+        """,
+        (1 if is_tc else 0, doc.name),
+    )
+
+
+def backfill_sales_invoices():
+    """Stamp every existing Sales Invoice (set-based, one UPDATE per column)."""
+    settings = _get_settings()
+    tc_fieldname = settings["customer_tc_fieldname"]
+
+    frappe.db.sql(
+        f"""
+        UPDATE `tabSales Invoice` si
+        INNER JOIN `tabCustomer` c ON c.name = si.customer
+        SET si.temp_credit_customer = IF(TRIM(IFNULL(c.`{tc_fieldname}`, '')) = %s, 1, 0)
+        """,
+        settings["temp_credit_value"],
+    )
+
+    frappe.db.sql(f"UPDATE `tabSales Invoice` si SET si.temp_credit_salesman = {_salesman_expr('Sales Invoice', 'si')}")
+
+
+def enqueue_restamp():
+    """Temp Credit Settings changed the TC field / value: reclassify all invoices in the background."""
+    frappe.enqueue(
+        "temp_credit_control.services.temp_credit_stamping.restamp_all",
+        queue="long",
+        job_id="temp_credit_restamp_all",
+        deduplicate=True,
+        enqueue_after_commit=True,
+    )
+
+
+def restamp_all():
+    backfill_sales_invoices()
+    frappe.db.commit()
+    # reports read the stamped columns: drop what was cached with the old classification
+    bump_exposure_version()
@@ -1,12 +1,31 @@
 import frappe
 from frappe.utils import flt
 
+from temp_credit_control.services.temp_credit_cache import (
+    bump_entity_exposure,
+    bump_exposure_version,
+    get_cached_exposure,
+)
+from temp_credit_control.services.temp_credit_ledger import get_outstanding_by_invoice, get_outstanding_by_party
+
+
+TEMP_CREDIT_DOCTYPES = ("Sales Invoice", "POS Invoice")
+SALESMAN_FIELD = "custom_salesman_user"  # optional custom field on Sales / POS Invoice
+
 
 def apply_temp_credit_rules(doc, method=None):
-    # Only on Sales Invoice
-    if doc.doctype != "Sales Invoice":
+    # Only on Sales Invoice / POS Invoice
+    if doc.doctype not in TEMP_CREDIT_DOCTYPES:
+        return
+
+    # Skip Sales Invoices merged from POS Invoices (already checked per receipt)
+    if flt(getattr(doc, "is_consolidated", 0)) == 1:
         return
 
+    # POS sync pushes many receipts in one request: keep running balances
+    if doc.doctype == "POS Invoice":
+        _start_running_balances()
+
     # Skip cancelled
     if flt(getattr(doc, "docstatus", 0)) == 2:
         return
@@ -15,6 +34,10 @@ def apply_temp_credit_rules(doc, method=None):
     if flt(getattr(doc, "is_return", 0)) == 1:
         return
 
+    # Paid POS receipts (cash / card) are not credit
+    if doc.doctype == "POS Invoice" and flt(getattr(doc, "outstanding_amount", 0)) <= 0:
+        return
+
     # Must have customer
     customer = getattr(doc, "customer", None)
     if not customer:
@@ -28,12 +51,11 @@ def apply_temp_credit_rules(doc, method=None):
     tc_fieldname = settings["customer_tc_fieldname"] or "custom_payment_type"
     tc_value = settings["temp_credit_value"] or "Temp Credit"
 
-    custom_payment_type = frappe.db.get_value("Customer", customer, tc_fieldname)
-    if (custom_payment_type or "").strip() != (tc_value or "").strip():
+    if not _is_temp_credit_customer(customer, tc_fieldname, tc_value):
         return
 
     # Customer policy (override + blacklist)
-    policy = _get_customer_policy(customer)
+    policy = get_cached_exposure("customer_policy", customer, lambda: _get_customer_policy(customer) or {})
 
     if policy and flt(policy.get("enabled", 1)) == 0:
         return
@@ -54,9 +76,15 @@ def apply_temp_credit_rules(doc, method=None):
     )
 
     # -------- 1) CUSTOMER LEVEL --------
-    invoice_count, total_outstanding = _customer_outstanding(customer)
+    invoice_count, total_outstanding = _get_exposure(
+        "customer", customer, lambda: _customer_outstanding(customer)
+    )
 
-    current_amount = flt(getattr(doc, "outstanding_amount", 0)) or flt(getattr(doc, "grand_total", 0))
+    # POS: only the unpaid part is credit; Sales Invoice drafts may not have outstanding set yet
+    if doc.doctype == "POS Invoice":
+        current_amount = flt(getattr(doc, "outstanding_amount", 0))
+    else:
+        current_amount = flt(getattr(doc, "outstanding_amount", 0)) or flt(getattr(doc, "grand_total", 0))
 
     # Include current invoice in calculation while draft/editing
     # (Avoid double-counting if doc is already submitted)
@@ -79,34 +107,29 @@ def apply_temp_credit_rules(doc, method=None):
         f"- Remaining Invoices: {max(int(remaining_invoices), 0)}"
     )
 
-    # -------- 2) WAREHOUSE LEVEL (accurate: header + items) --------
+    # -------- 2) WAREHOUSE LEVEL (every warehouse of the invoice, by its share) --------
     warehouse_message = ""
-    warehouse_outstanding = 0.0
     warehouse_limit_exceeded = False
-    warehouse = None
 
     if settings["enable_warehouse_limit"]:
-        warehouse = doc.get("set_warehouse")
-
-        # If no header warehouse, try first item warehouse
-        items = doc.get("items") or []
-        if not warehouse and items:
-            warehouse = items[0].get("warehouse")
+        wh_limit = settings["default_warehouse_limit"]
 
-        if warehouse:
-            wh_limit = settings["default_warehouse_limit"]
-
-            warehouse_outstanding = _warehouse_tc_outstanding(warehouse, tc_fieldname, tc_value)
+        # same apportioning as the stored exposure rows (item warehouse wins over header)
+        for warehouse, share in get_warehouse_shares(doc.get("items"), doc.get("set_warehouse")).items():
+            warehouse_outstanding = _get_exposure(
+                "warehouse", warehouse, lambda wh=warehouse: _warehouse_tc_outstanding(wh)
+            )
 
-            # Include current invoice in warehouse pool while draft
+            # Include current invoice's share of this warehouse while draft
             if flt(getattr(doc, "docstatus", 0)) == 0:
-                warehouse_outstanding += current_amount
+                warehouse_outstanding += current_amount * share
 
             wh_remaining = wh_limit - warehouse_outstanding
-            warehouse_limit_exceeded = warehouse_outstanding > wh_limit
+            if warehouse_outstanding > wh_limit:
+                warehouse_limit_exceeded = True
 
-            warehouse_message = (
-                f"\n\n🏬 Warehouse Temp Credit Info ({warehouse}):\n"
+            warehouse_message += (
+                f"\n\n🏬 Warehouse Temp Credit Info ({warehouse}, {share * 100:.0f}% of this invoice):\n"
                 f"- Warehouse Limit: {wh_limit:.2f} SAR\n"
                 f"- Total Outstanding Temp Credit (incl. this): {warehouse_outstanding:.2f} SAR\n"
                 f"- Remaining Warehouse Temp Credit: {max(wh_remaining, 0):.2f} SAR"
@@ -117,8 +140,8 @@ def apply_temp_credit_rules(doc, method=None):
     salesman_limit_exceeded = False
 
     if settings["enable_salesman_limit"]:
-        user = getattr(doc, "owner", None) or frappe.session.user
-        sp = _get_salesman_policy(user)
+        user = _resolve_salesman(doc)
+        sp = get_cached_exposure("salesman_policy", user, lambda: _get_salesman_policy(user) or {})
 
         if sp and flt(sp.get("enabled", 1)) == 1:
             if flt(sp.get("is_blocked", 0)) == 1:
@@ -130,7 +153,9 @@ def apply_temp_credit_rules(doc, method=None):
             salesman_limit = settings["default_salesman_limit"]
 
         if salesman_limit > 0:
-            used = _salesman_tc_outstanding(user, tc_fieldname, tc_value)
+            used = _get_exposure(
+                "salesman", user, lambda: _salesman_tc_outstanding(user, tc_fieldname, tc_value)
+            )
 
             if flt(getattr(doc, "docstatus", 0)) == 0:
                 used += current_amount
@@ -164,25 +189,420 @@ def apply_temp_credit_rules(doc, method=None):
         frappe.msgprint(message + warehouse_message + salesman_message)
 
 
+def get_warehouse_shares(items, set_warehouse=None):
+    """
+    {warehouse: share} of an invoice, apportioned by item net amount.
+    Item warehouse wins, header warehouse is the fallback.
+    Lines without any warehouse (services) are left out, so the shares of
+    the remaining warehouses always add up to 1.
+    """
+    amounts = {}
+    for item in items or []:
+        warehouse = item.get("warehouse") or set_warehouse
+        if not warehouse:
+            continue
+        amount = abs(flt(item.get("base_net_amount") or item.get("net_amount") or item.get("amount")))
+        amounts[warehouse] = amounts.get(warehouse, 0.0) + amount
+
+    if not amounts:
+        return {set_warehouse: 1.0} if set_warehouse else {}
+
+    total = sum(amounts.values())
+    if total <= 0:
+        return {wh: 1.0 / len(amounts) for wh in amounts}
+
+    return {wh: amount / total for wh, amount in amounts.items()}
+
+
+def _resolve_salesman(doc):
+    # Same resolution as the stamped Sales Invoice.temp_credit_salesman
+    return (doc.get(SALESMAN_FIELD) or "").strip() or getattr(doc, "owner", None) or frappe.session.user
+
+
+def _salesman_expr(doctype, alias=""):
+    """
+    SQL for the resolved salesman (custom_salesman_user, else owner): the
+    stamping rule, for queries on invoices that are not stamped (POS Invoice).
+    """
+    prefix = f"{alias}." if alias else ""
+    if frappe.db.has_column(doctype, SALESMAN_FIELD):
+        return f"IFNULL(NULLIF(TRIM({prefix}`{SALESMAN_FIELD}`), ''), {prefix}owner)"
+    return f"{prefix}owner"
+
+
+# ---------------- POS running balances ----------------
+
+def record_pos_invoice(doc, method=None):
+    """
+    POS Invoice on_submit / on_cancel.
+    Moves the receipt into the running balances of this request, so the next
+    receipt of the same sync burst does not rescan exposure.
+    """
+    running = frappe.flags.temp_credit_running
+    outstanding = flt(getattr(doc, "outstanding_amount", 0))
+    # paid receipts never entered the balances (the validator skips them)
+    if running and not flt(getattr(doc, "is_return", 0)) and outstanding > 0:
+        sign = -1 if method == "on_cancel" else 1
+        amount = sign * outstanding
+
+        key = ("customer", doc.customer)
+        if key in running:
+            count, total = running[key]
+            running[key] = (count + sign, total + amount)
+
+        for warehouse, ratio in get_warehouse_shares(doc.get("items"), doc.get("set_warehouse")).items():
+            key = ("warehouse", warehouse)
+            if key in running:
+                running[key] = running[key] + amount * ratio
+
+        key = ("salesman", _resolve_salesman(doc))
+        if key in running:
+            running[key] = running[key] + amount
+
+    invalidate_exposure(doc, method)
+
+
+@frappe.whitelist()
+def submit_pos_invoice_batch(invoices):
+    """
+    Offline POS sync: insert + submit a batch of POS Invoices in one request.
+    Exposure for every customer / warehouse / salesman in the batch is loaded
+    with grouped queries once, then each receipt is checked against running
+    balances that include the receipts submitted before it.
+    A blocked receipt is rolled back on its own; the rest of the batch continues.
+    """
+    frappe.has_permission("POS Invoice", "create", throw=True)
+
+    invoices = frappe.parse_json(invoices) or []
+    _start_running_balances()
+    _preload_pos_batch(invoices)
+
+    results = []
+    for idx, data in enumerate(invoices):
+        data = frappe._dict(data)
+        data.doctype = "POS Invoice"
+
+        frappe.db.savepoint("temp_credit_pos_batch")
+        running = frappe.flags.temp_credit_running
+        balances = dict(running)  # values are immutable tuples / floats
+        try:
+            doc = frappe.get_doc(data)
+            doc.insert()
+            doc.submit()
+            results.append({"idx": idx, "name": doc.name, "status": "Submitted"})
+        except Exception as e:
+            frappe.db.rollback(save_point="temp_credit_pos_batch")
+            # on_submit may already have moved the receipt into the running balances
+            running.clear()
+            running.update(balances)
+            frappe.clear_last_message()
+            results.append({"idx": idx, "name": data.get("name"), "status": "Failed", "error": str(e)})
+
+    return results
+
+
+def _start_running_balances():
+    if frappe.flags.temp_credit_running is None:
+        frappe.flags.temp_credit_running = {}
+
+
+def _get_exposure(kind, key, generator):
+    running = frappe.flags.temp_credit_running
+    if running is None:
+        return get_cached_exposure(kind, key, generator)
+
+    if (kind, key) not in running:
+        running[(kind, key)] = get_cached_exposure(kind, key, generator)
+
+    return running[(kind, key)]
+
+
+def _preload_pos_batch(invoices):
+    """Grouped exposure queries for all customers / salesmen in a sync batch."""
+    settings = _get_settings()
+    if not settings["enabled"]:
+        return
+
+    running = frappe.flags.temp_credit_running
+    tc_fieldname = settings["customer_tc_fieldname"] or "custom_payment_type"
+    tc_value = settings["temp_credit_value"] or "Temp Credit"
+
+    customers = {d.get("customer") for d in invoices if d.get("customer")}
+    customers = [c for c in customers if _is_temp_credit_customer(c, tc_fieldname, tc_value)]
+    if not customers:
+        return
+
+    for customer, value in bulk_customer_outstanding(customers, settings).items():
+        running.setdefault(("customer", customer), value)
+
+    if settings["enable_salesman_limit"]:
+        users = {_resolve_salesman(frappe._dict(d)) for d in invoices}
+        for user, value in bulk_salesman_outstanding(users, settings).items():
+            running.setdefault(("salesman", user), value)
+
+
+def bulk_customer_outstanding(customers, settings):
+    """{customer: (unpaid invoice count, outstanding)} with grouped queries, same sources as _customer_outstanding."""
+    by_customer = {c: (0, 0.0) for c in customers}
+    if not customers:
+        return by_customer
+
+    if _uses_payment_ledger(settings):
+        by_customer.update(get_outstanding_by_party(customers))
+
+    for doctype in _invoice_doctypes(settings):
+        rows = frappe.get_all(
+            doctype,
+            filters=_unpaid_filters(doctype, {"customer": ["in", customers]}),
+            fields=["customer", "count(name) as invoice_count", "sum(outstanding_amount) as outstanding"],
+            group_by="customer",
+        )
+        for r in rows:
+            count, total = by_customer[r.customer]
+            by_customer[r.customer] = (count + int(r.invoice_count or 0), total + flt(r.outstanding))
+
+    return by_customer
+
+
+def bulk_salesman_outstanding(users, settings):
+    """{user: TC outstanding} with grouped queries, same sources as _salesman_tc_outstanding."""
+    users = set(users)
+    by_user = {u: 0.0 for u in users}
+    tc_customers = _get_tc_customers(settings["customer_tc_fieldname"], settings["temp_credit_value"])
+    if not users or not tc_customers:
+        return by_user
+
+    if _uses_payment_ledger(settings):
+        for user in users:
+            by_user[user] += sum(get_outstanding_by_invoice(tc_customers, salesman=user).values())
+    else:
+        rows = frappe.db.sql(
+            """
+            SELECT temp_credit_salesman, SUM(outstanding_amount)
+            FROM `tabSales Invoice`
+            WHERE
+                temp_credit_salesman IN %(users)s
+                AND temp_credit_customer = 1
+                AND docstatus = 1
+                AND is_return = 0
+                AND outstanding_amount > 0
+            GROUP BY temp_credit_salesman
+            """,
+            {"users": tuple(users)},
+        )
+        for user, outstanding in rows:
+            by_user[user] += flt(outstanding)
+
+    salesman = _salesman_expr("POS Invoice")
+    rows = frappe.db.sql(
+        f"""
+        SELECT {salesman} AS salesman, SUM(outstanding_amount)
+        FROM `tabPOS Invoice`
+        WHERE
+            customer IN %(customers)s
+            AND {salesman} IN %(users)s
+            AND docstatus = 1
+            AND is_return = 0
+            AND outstanding_amount > 0
+            AND IFNULL(consolidated_invoice, '') = ''
+        GROUP BY salesman
+        """,
+        {"customers": tuple(tc_customers), "users": tuple(users)},
+    )
+    for user, outstanding in rows:
+        by_user[user] += flt(outstanding)
+
+    return by_user
+
+
+# ---------------- Cache invalidation ----------------
+
+def invalidate_exposure(doc, method=None):
+    """
+    Invoice / Payment Entry / Journal Entry submit & cancel: bump the cached
+    exposure of the customers, warehouses and salesmen the document touches,
+    so warm cache of everyone else survives.
+    """
+    entities = set()
+
+    if doc.doctype in TEMP_CREDIT_DOCTYPES:
+        entities.add(("customer", doc.customer))
+        entities.add(("salesman", _resolve_salesman(doc)))
+        entities.update(("warehouse", wh) for wh in get_warehouse_shares(doc.get("items"), doc.get("set_warehouse")))
+
+        if doc.get("is_return") and doc.get("return_against"):
+            entities.update(_invoice_entities(doc.doctype, [doc.return_against]))
+
+        # merged POS receipts leave their salesmen / warehouses
+        if doc.get("is_consolidated"):
+            merged = frappe.get_all("POS Invoice", filters={"consolidated_invoice": doc.name}, pluck="name")
+            entities.update(_invoice_entities("POS Invoice", merged))
+    else:
+        refs = {}
+        for row in doc.get("references") or []:
+            if row.reference_doctype in TEMP_CREDIT_DOCTYPES and row.reference_name:
+                refs.setdefault(row.reference_doctype, set()).add(row.reference_name)
+
+        for row in doc.get("accounts") or []:
+            if row.reference_type in TEMP_CREDIT_DOCTYPES and row.reference_name:
+                refs.setdefault(row.reference_type, set()).add(row.reference_name)
+            if row.get("party_type") == "Customer":
+                entities.add(("customer", row.party))
+
+        # unallocated payments move the Payment Ledger balance of the party
+        if doc.get("party_type") == "Customer":
+            entities.add(("customer", doc.party))
+
+        for invoice_type, names in refs.items():
+            entities.update(_invoice_entities(invoice_type, list(names)))
+
+    bump_entity_exposure(entities)
+
+
+def invalidate_customer_exposure(doc, method=None):
+    """Customer on_update: only a Temp Credit membership change affects exposure (global)."""
+    settings = _get_settings()
+    if doc.has_value_changed(settings["customer_tc_fieldname"]):
+        bump_exposure_version()
+
+
+def _invoice_entities(invoice_type, names):
+    """(kind, key) of the customers, salesmen and stored warehouses of existing invoices."""
+    if not names:
+        return set()
+
+    fields = ["name", "customer", "owner"]
+    if invoice_type == "Sales Invoice":
+        fields.append("temp_credit_salesman")
+    elif frappe.db.has_column(invoice_type, SALESMAN_FIELD):
+        fields.append(SALESMAN_FIELD)
+
+    entities = set()
+    for inv in frappe.get_all(invoice_type, filters={"name": ["in", names]}, fields=fields):
+        entities.add(("customer", inv.customer))
+        entities.add(("salesman", inv.get("temp_credit_salesman") or _resolve_salesman(inv)))
+
+    warehouses = frappe.get_all(
+        "Temp Credit Warehouse Exposure",
+        filters={"invoice_type": invoice_type, "invoice": ["in", names]},
+        pluck="warehouse",
+        distinct=True,
+    )
+    entities.update(("warehouse", wh) for wh in warehouses)
+
+    return entities
+
+
+# ---------------- Warm-up ----------------
+
+@frappe.whitelist()
+def warm_up_exposure(customer, warehouse=None, user=None):
+    """
+    Called from the Sales Invoice form when a customer is picked.
+    Enqueues a short job that fills the exposure cache, so the following
+    validate / before_submit are served from cache.
+    """
+    customer = (customer or "").strip()
+    if not customer or not frappe.has_permission("Customer", "read", customer):
+        return
+
+    warehouse = (warehouse or "").strip() or None
+    user = (user or "").strip() or frappe.session.user
+
+    frappe.enqueue(
+        "temp_credit_control.services.temp_credit_validator.warm_up_exposure_job",
+        queue="short",
+        job_id=f"temp_credit_warm_up::{customer}::{warehouse or ''}::{user}",
+        deduplicate=True,
+        customer=customer,
+        warehouse=warehouse,
+        user=user,
+    )
+
+
+def warm_up_exposure_job(customer, warehouse=None, user=None):
+    settings = _get_settings()
+    if not settings["enabled"]:
+        return
+
+    tc_fieldname = settings["customer_tc_fieldname"] or "custom_payment_type"
+    tc_value = settings["temp_credit_value"] or "Temp Credit"
+
+    if not _is_temp_credit_customer(customer, tc_fieldname, tc_value):
+        return
+
+    get_cached_exposure("customer_policy", customer, lambda: _get_customer_policy(customer) or {})
+    get_cached_exposure("customer", customer, lambda: _customer_outstanding(customer))
+
+    if settings["enable_warehouse_limit"] and warehouse:
+        get_cached_exposure("warehouse", warehouse, lambda: _warehouse_tc_outstanding(warehouse))
+
+    if settings["enable_salesman_limit"] and user:
+        get_cached_exposure("salesman_policy", user, lambda: _get_salesman_policy(user) or {})
+        get_cached_exposure("salesman", user, lambda: _salesman_tc_outstanding(user, tc_fieldname, tc_value))
+
+
 # ---------------- Helpers ----------------
 
 def _get_settings():
-    s = frappe.get_single("Temp Credit Settings")
+    # Single is cached by frappe and cleared on save
+    s = frappe.get_cached_doc("Temp Credit Settings")
 
     return {
         "enabled": bool(flt(getattr(s, "enabled", 0))),
-        "default_customer_limit": flt(getattr(s, "default_customer_limit", 700)),
-        "default_max_unpaid_invoices": int(getattr(s, "default_max_unpaid_invoices", 3) or 3),
-        "default_warehouse_limit": flt(getattr(s, "default_warehouse_limit", 35000)),
+        **get_limit_settings(lambda fieldname, default: getattr(s, fieldname, default)),
         "show_popup_on_allow": bool(flt(getattr(s, "show_popup_on_allow", 1))),
         "enable_warehouse_limit": bool(flt(getattr(s, "enable_warehouse_limit", 1))),
         "enable_salesman_limit": bool(flt(getattr(s, "enable_salesman_limit", 0))),
-        "default_salesman_limit": flt(getattr(s, "default_salesman_limit", 0)),
         "customer_tc_fieldname": (getattr(s, "customer_tc_fieldname", "custom_payment_type") or "custom_payment_type").strip(),
         "temp_credit_value": (getattr(s, "temp_credit_value", "Temp Credit") or "Temp Credit").strip(),
+        "exposure_source": (getattr(s, "exposure_source", "Sales Invoice") or "Sales Invoice").strip(),
+    }
+
+
+def get_limit_settings(get):
+    """
+    Default limits as the validator applies them (0 unpaid invoices means 3).
+    get(fieldname, default): value source; also used for simulated settings.
+    """
+    return {
+        "default_customer_limit": flt(get("default_customer_limit", 700)),
+        "default_max_unpaid_invoices": int(get("default_max_unpaid_invoices", 3) or 3),
+        "default_warehouse_limit": flt(get("default_warehouse_limit", 35000)),
+        "default_salesman_limit": flt(get("default_salesman_limit", 0)),
     }
 
 
+def _uses_payment_ledger(settings):
+    return settings["exposure_source"] == "Payment Ledger Entry"
+
+
+def _invoice_doctypes(settings):
+    """
+    Invoice tables read directly for outstanding.
+    With the Payment Ledger Entry source only POS Invoices are left: they post
+    no ledger rows until consolidated into a Sales Invoice.
+    """
+    if _uses_payment_ledger(settings):
+        return ("POS Invoice",)
+    return TEMP_CREDIT_DOCTYPES
+
+
+def _is_temp_credit_customer(customer, tc_fieldname, tc_value):
+    payment_type = get_cached_exposure(
+        "tc_flag", customer, lambda: frappe.db.get_value("Customer", customer, tc_fieldname) or ""
+    )
+    return (payment_type or "").strip() == (tc_value or "").strip()
+
+
+def _get_tc_customers(tc_fieldname, tc_value):
+    return get_cached_exposure(
+        "tc_customers",
+        f"{tc_fieldname}:{tc_value}",
+        lambda: frappe.get_all("Customer", filters={tc_fieldname: tc_value}, pluck="name"),
+    )
+
+
 def _get_customer_policy(customer):
     customer = (customer or "").strip()
     if not customer:
@@ -215,117 +635,108 @@ def _get_salesman_policy(user):
     )
 
 
-def _customer_outstanding(customer):
-    invoices = frappe.get_all(
-        "Sales Invoice",
-        filters={
-            "customer": customer,
-            "docstatus": 1,
-            "is_return": 0,
-            "outstanding_amount": [">", 0],
-        },
-        fields=["outstanding_amount"],
-        limit_page_length=2000,
-    )
+def _unpaid_filters(doctype, extra=None):
+    """Submitted, non-return, unpaid. POS Invoices only until consolidated into a Sales Invoice."""
+    filters = {
+        "docstatus": 1,
+        "is_return": 0,
+        "outstanding_amount": [">", 0],
+    }
+    if doctype == "POS Invoice":
+        filters["consolidated_invoice"] = ["is", "not set"]
+    filters.update(extra or {})
+    return filters
+
 
+def _customer_outstanding(customer):
+    settings = _get_settings()
     invoice_count = 0
     total_outstanding = 0.0
 
-    for inv in invoices:
-        invoice_count += 1
-        total_outstanding += flt(inv.outstanding_amount)
+    if _uses_payment_ledger(settings):
+        invoice_count, total_outstanding = get_outstanding_by_party(customer).get(customer, (0, 0.0))
+
+    for doctype in _invoice_doctypes(settings):
+        invoices = frappe.get_all(
+            doctype,
+            filters=_unpaid_filters(doctype, {"customer": customer}),
+            fields=["outstanding_amount"],
+            limit_page_length=2000,
+        )
+
+        for inv in invoices:
+            invoice_count += 1
+            total_outstanding += flt(inv.outstanding_amount)
 
     return invoice_count, total_outstanding
 
 
-def _warehouse_tc_outstanding(warehouse, tc_fieldname, tc_value):
+def _warehouse_tc_outstanding(warehouse):
     """
-    Accurate warehouse TC outstanding:
-    - Counts submitted, non-return Sales Invoices with outstanding_amount > 0
-    - For Temp Credit customers only
-    - Includes invoices where warehouse is set on header (set_warehouse)
-    - Includes invoices where warehouse is set on items (Sales Invoice Item.warehouse)
-    - Supports invoices with multiple warehouses (counts only matching warehouse)
-    NOTE: Full outstanding is counted if invoice has any item in this warehouse.
+    Pooled TC outstanding of a warehouse.
+    Reads Temp Credit Warehouse Exposure, where every unpaid TC invoice
+    (Sales Invoice + unconsolidated POS Invoice) is apportioned by item amount
+    at submit and rescaled as payments change its outstanding.
+    Multi-warehouse invoices count only the share of this warehouse.
     """
-
-    # 1) Temp Credit customers
-    tc_customers = frappe.get_all(
-        "Customer",
-        filters={tc_fieldname: tc_value},
-        pluck="name",
-    )
-    if not tc_customers:
-        return 0.0
-
-    # 2) Base invoices: submitted unpaid
-    base_invoices = frappe.get_all(
-        "Sales Invoice",
-        filters={
-            "customer": ["in", tc_customers],
-            "docstatus": 1,
-            "is_return": 0,
-            "outstanding_amount": [">", 0],
-        },
-        fields=["name", "outstanding_amount", "set_warehouse"],
-        limit_page_length=3000,
+    total = frappe.db.sql(
+        """
+        SELECT SUM(outstanding_amount)
+        FROM `tabTemp Credit Warehouse Exposure`
+        WHERE warehouse = %s AND outstanding_amount > 0
+        """,
+        (warehouse or "").strip(),
     )
-    if not base_invoices:
-        return 0.0
-
-    inv_out = {d.name: flt(d.outstanding_amount) for d in base_invoices}
-
-    # 3) Header match
-    wh = (warehouse or "").strip()
-    header_match = {d.name for d in base_invoices if (d.set_warehouse or "").strip() == wh}
-
-    # 4) Item match (only items for the base invoices)
-    item_rows = frappe.get_all(
-        "Sales Invoice Item",
-        filters={
-            "parent": ["in", list(inv_out.keys())],
-            "warehouse": warehouse,
-        },
-        fields=["parent"],
-        limit_page_length=10000,
-    )
-    item_match = {r.parent for r in item_rows}
-
-    matched_invoices = header_match.union(item_match)
-
-    total = 0.0
-    for inv_name in matched_invoices:
-        total += flt(inv_out.get(inv_name))
-
-    return total
+    return flt(total[0][0]) if total else 0.0
 
 
 def _salesman_tc_outstanding(user, tc_fieldname, tc_value):
-    # Uses invoice owner as salesman (simple)
-    tc_customers = frappe.get_all(
-        "Customer",
-        filters={tc_fieldname: tc_value},
-        pluck="name",
-    )
-    if not tc_customers:
-        return 0.0
-
-    rows = frappe.get_all(
-        "Sales Invoice",
-        filters={
-            "customer": ["in", tc_customers],
-            "owner": user,
-            "docstatus": 1,
-            "is_return": 0,
-            "outstanding_amount": [">", 0],
-        },
-        fields=["outstanding_amount"],
-        limit_page_length=3000,
-    )
-
+    """
+    Salesman = stamped temp_credit_salesman (custom_salesman_user, else owner).
+    Sales Invoice: indexed filter on the stamped columns.
+    POS Invoice (not stamped): same rule in SQL + TC customer list.
+    """
+    settings = _get_settings()
     total = 0.0
-    for r in rows:
-        total += flt(r.outstanding_amount)
+
+    if _uses_payment_ledger(settings):
+        total += sum(get_outstanding_by_invoice(_get_tc_customers(tc_fieldname, tc_value), salesman=user).values())
+    else:
+        total += flt(
+            frappe.db.sql(
+                """
+                SELECT SUM(outstanding_amount)
+                FROM `tabSales Invoice`
+                WHERE
+                    temp_credit_salesman = %s
+                    AND temp_credit_customer = 1
+                    AND docstatus = 1
+                    AND is_return = 0
+                    AND outstanding_amount > 0
+                """,
+                user,
+            )[0][0]
+        )
+
+    tc_customers = _get_tc_customers(tc_fieldname, tc_value)
+    if tc_customers:
+        salesman = _salesman_expr("POS Invoice")
+        total += flt(
+            frappe.db.sql(
+                f"""
+                SELECT SUM(outstanding_amount)
+                FROM `tabPOS Invoice`
+                WHERE
+                    customer IN %(customers)s
+                    AND {salesman} = %(user)s
+                    AND docstatus = 1
+                    AND is_return = 0
+                    AND outstanding_amount > 0
+                    AND IFNULL(consolidated_invoice, '') = ''
+                """,
+                {"customers": tuple(tc_customers), "user": user},
+            )[0][0]
+        )
 
     return total
 
@@ -0,0 +1,230 @@
+import frappe
+from frappe.utils import flt, now
+
+from temp_credit_control.services.temp_credit_validator import (
+    TEMP_CREDIT_DOCTYPES,
+    _get_settings,
+    _is_temp_credit_customer,
+    _unpaid_filters,
+    get_warehouse_shares,
+)
+
+
+EXPOSURE_DOCTYPE = "Temp Credit Warehouse Exposure"
+
+
+# ---------------- doc_events ----------------
+
+def on_invoice_submit(doc, method=None):
+    # POS Invoices merged into this Sales Invoice leave the pool, the merged invoice enters it
+    if flt(doc.get("is_consolidated")):
+        frappe.db.sql(
+            f"""
+            DELETE e FROM `tab{EXPOSURE_DOCTYPE}` e
+            INNER JOIN `tabPOS Invoice` pi ON pi.name = e.invoice
+            WHERE e.invoice_type = 'POS Invoice' AND pi.consolidated_invoice = %s
+            """,
+            doc.name,
+        )
+
+    if flt(doc.get("is_return")):
+        if doc.get("return_against"):
+            refresh_invoices(doc.doctype, [doc.return_against])
+        return
+
+    if _is_tc_customer(doc.customer):
+        _write_rows(
+            doc.doctype,
+            [
+                {
+                    "name": doc.name,
+                    "customer": doc.customer,
+                    "outstanding_amount": doc.outstanding_amount,
+                    "shares": get_warehouse_shares(doc.get("items"), doc.get("set_warehouse")),
+                }
+            ],
+        )
+
+
+def on_invoice_cancel(doc, method=None):
+    if flt(doc.get("is_return")):
+        if doc.get("return_against"):
+            refresh_invoices(doc.doctype, [doc.return_against])
+        return
+
+    frappe.db.delete(EXPOSURE_DOCTYPE, {"invoice_type": doc.doctype, "invoice": doc.name})
+
+
+def on_payment_change(doc, method=None):
+    """Payment Entry / Journal Entry submit & cancel: rescale shares to the new outstanding."""
+    refs = {}
+
+    for row in doc.get("references") or []:
+        if row.reference_doctype in TEMP_CREDIT_DOCTYPES and row.reference_name:
+            refs.setdefault(row.reference_doctype, set()).add(row.reference_name)
+
+    for row in doc.get("accounts") or []:
+        if row.reference_type in TEMP_CREDIT_DOCTYPES and row.reference_name:
+            refs.setdefault(row.reference_type, set()).add(row.reference_name)
+
+    for invoice_type, names in refs.items():
+        refresh_invoices(invoice_type, list(names))
+
+
+def on_customer_update(doc, method=None):
+    settings = _get_settings()
+    if doc.has_value_changed(settings["customer_tc_fieldname"]):
+        rebuild_customer(doc.name)
+
+
+# ---------------- Maintenance ----------------
+
+def refresh_invoices(invoice_type, names):
+    """
+    Rescale rows to the current invoice outstanding (one UPDATE). Paid-off
+    invoices drop their rows; unpaid again (cancelled payment) ones get
+    them back, so the table only ever holds open exposure.
+    """
+    if not names or invoice_type not in TEMP_CREDIT_DOCTYPES:
+        return
+
+    params = {"invoice_type": invoice_type, "names": tuple(names)}
+
+    frappe.db.sql(
+        f"""
+        DELETE e FROM `tab{EXPOSURE_DOCTYPE}` e
+        INNER JOIN `tab{invoice_type}` inv ON inv.name = e.invoice
+        WHERE
+            e.invoice_type = %(invoice_type)s AND e.invoice IN %(names)s
+            AND IFNULL(inv.outstanding_amount, 0) <= 0
+        """,
+        params,
+    )
+    frappe.db.sql(
+        f"""
+        UPDATE `tab{EXPOSURE_DOCTYPE}` e
+        INNER JOIN `tab{invoice_type}` inv ON inv.name = e.invoice
+        SET e.outstanding_amount = e.share_ratio * inv.outstanding_amount
+        WHERE e.invoice_type = %(invoice_type)s AND e.invoice IN %(names)s
+        """,
+        params,
+    )
+
+    without_rows = frappe.db.sql_list(
+        f"""
+        SELECT DISTINCT invoice FROM `tab{EXPOSURE_DOCTYPE}`
+        WHERE invoice_type = %(invoice_type)s AND invoice IN %(names)s
+        """,
+        params,
+    )
+    without_rows = set(names) - set(without_rows)
+    if without_rows:
+        invoices = frappe.get_all(
+            invoice_type,
+            filters=_unpaid_filters(invoice_type, {"name": ["in", list(without_rows)]}),
+            fields=["name", "customer", "outstanding_amount", "set_warehouse"],
+            limit_page_length=0,
+        )
+        build_rows(invoice_type, [d for d in invoices if _is_tc_customer(d.customer)])
+
+
+def rebuild_customer(customer):
+    """Drop and (if still Temp Credit) re-apportion all unpaid invoices of a customer."""
+    frappe.db.delete(EXPOSURE_DOCTYPE, {"customer": customer})
+
+    if not _is_tc_customer(customer):
+        return
+
+    for invoice_type in TEMP_CREDIT_DOCTYPES:
+        invoices = frappe.get_all(
+            invoice_type,
+            filters=_unpaid_filters(invoice_type, {"customer": customer}),
+            fields=["name", "customer", "outstanding_amount", "set_warehouse"],
+            limit_page_length=0,
+        )
+        build_rows(invoice_type, invoices)
+
+
+def build_rows(invoice_type, invoices):
+    """invoices: header dicts (name, customer, outstanding_amount, set_warehouse)."""
+    if not invoices:
+        return
+
+    items_by_invoice = {}
+    item_rows = frappe.get_all(
+        f"{invoice_type} Item",
+        filters={"parent": ["in", [d.name for d in invoices]], "parenttype": invoice_type},
+        fields=["parent", "warehouse", "base_net_amount"],
+        limit_page_length=0,
+    )
+    for r in item_rows:
+        items_by_invoice.setdefault(r.parent, []).append(r)
+
+    _write_rows(
+        invoice_type,
+        [
+            {
+                "name": d.name,
+                "customer": d.customer,
+                "outstanding_amount": d.outstanding_amount,
+                "shares": get_warehouse_shares(items_by_invoice.get(d.name), d.set_warehouse),
+            }
+            for d in invoices
+        ],
+    )
+
+
+def _write_rows(invoice_type, invoices):
+    names = [d["name"] for d in invoices]
+    if not names:
+        return
+
+    frappe.db.delete(EXPOSURE_DOCTYPE, {"invoice_type": invoice_type, "invoice": ["in", names]})
+
+    timestamp = now()
+    user = frappe.session.user
+    values = []
+    for d in invoices:
+        # paid off / overpaid: no exposure, no rows
+        outstanding = flt(d["outstanding_amount"])
+        if outstanding <= 0:
+            continue
+        for warehouse, ratio in d["shares"].items():
+            values.append(
+                (
+                    frappe.generate_hash(length=10),
+                    timestamp,
+                    timestamp,
+                    user,
+                    user,
+                    invoice_type,
+                    d["name"],
+                    d["customer"],
+                    warehouse,
+                    ratio,
+                    ratio * outstanding,
+                )
+            )
+
+    frappe.db.bulk_insert(
+        EXPOSURE_DOCTYPE,
+        fields=[
+            "name",
+            "creation",
+            "modified",
+            "owner",
+            "modified_by",
+            "invoice_type",
+            "invoice",
+            "customer",
+            "warehouse",
+            "share_ratio",
+            "outstanding_amount",
+        ],
+        values=values,
+    )
+
+
+def _is_tc_customer(customer):
+    settings = _get_settings()
+    return _is_temp_credit_customer(customer, settings["customer_tc_fieldname"], settings["temp_credit_value"])
@@ -0,0 +1,146 @@
+import time
+
+import frappe
+from frappe.utils import add_days, flt, nowdate
+
+from temp_credit_control.services.temp_credit_cache import get_exposure_cache_keys, set_cached_exposure
+from temp_credit_control.services.temp_credit_validator import (
+    _get_settings,
+    _get_tc_customers,
+    _salesman_expr,
+    bulk_customer_outstanding,
+    bulk_salesman_outstanding,
+)
+
+
+WARM_UP_ACTIVE_DAYS = 30  # customers / salesmen invoiced within this many days are "active"
+WARM_UP_BATCH_SIZE = 1000  # keys per grouped query
+
+
+def enqueue_warm_up(*args, **kwargs):
+    """after_migrate: warm in the background, never slow down the migrate itself."""
+    frappe.enqueue(
+        "temp_credit_control.services.temp_credit_warmup.warm_up_caches",
+        queue="long",
+        job_id="temp_credit_warm_up_caches",
+        deduplicate=True,
+        enqueue_after_commit=True,
+    )
+
+
+@frappe.whitelist()
+def run_warm_up():
+    frappe.only_for("System Manager")
+    enqueue_warm_up()
+
+
+def warm_up_caches():
+    """
+    Pre-populate what the validator reads on the first saves after a deploy:
+    settings, TC membership, policies and customer / warehouse / salesman
+    exposure for everything active, with grouped queries in batches.
+    """
+    logger = frappe.logger("temp_credit")
+    started = time.monotonic()
+
+    settings = _get_settings()
+    if not settings["enabled"]:
+        return
+
+    tc_customers = set(_get_tc_customers(settings["customer_tc_fieldname"], settings["temp_credit_value"]))
+    _log_step(logger, "settings + TC customers", len(tc_customers), started)
+
+    since = add_days(nowdate(), -WARM_UP_ACTIVE_DAYS)
+    customers = [c for c in _active("customer", since) if c in tc_customers]
+
+    # cache keys are taken before each grouped query: an entity whose invoices
+    # change meanwhile gets a new version and simply misses (never a stale hit)
+    t = time.monotonic()
+    for batch in _batches(customers):
+        flag_keys = get_exposure_cache_keys("tc_flag", batch)
+        policy_keys = get_exposure_cache_keys("customer_policy", batch)
+        exposure_keys = get_exposure_cache_keys("customer", batch)
+
+        policies = {
+            p.customer: p
+            for p in frappe.get_all(
+                "Temp Credit Customer Policy",
+                filters={"customer": ["in", batch]},
+                fields=["customer", "enabled", "credit_limit_override", "max_unpaid_invoices_override", "is_blacklisted", "blacklist_reason"],
+            )
+        }
+        for customer, value in bulk_customer_outstanding(batch, settings).items():
+            set_cached_exposure(flag_keys[customer], settings["temp_credit_value"])
+            set_cached_exposure(exposure_keys[customer], value)
+            policy = policies.get(customer)
+            set_cached_exposure(policy_keys[customer], {k: v for k, v in policy.items() if k != "customer"} if policy else {})
+    _log_step(logger, "customers", len(customers), t)
+
+    if settings["enable_warehouse_limit"]:
+        t = time.monotonic()
+        warehouses = frappe.get_all("Warehouse", filters={"is_group": 0}, pluck="name")
+        exposure_keys = get_exposure_cache_keys("warehouse", warehouses)
+
+        outstanding = dict(
+            frappe.db.sql(
+                """
+                SELECT warehouse, SUM(outstanding_amount)
+                FROM `tabTemp Credit Warehouse Exposure`
+                WHERE outstanding_amount > 0
+                GROUP BY warehouse
+                """
+            )
+        )
+        for warehouse, cache_key in exposure_keys.items():
+            set_cached_exposure(cache_key, flt(outstanding.get(warehouse)))
+        _log_step(logger, "warehouses", len(warehouses), t)
+
+    if settings["enable_salesman_limit"]:
+        t = time.monotonic()
+        users = _active("salesman", since)
+        for batch in _batches(users):
+            policy_keys = get_exposure_cache_keys("salesman_policy", batch)
+            exposure_keys = get_exposure_cache_keys("salesman", batch)
+
+            policies = {
+                p.user: p
+                for p in frappe.get_all(
+                    "Temp Credit Salesman Policy",
+                    filters={"user": ["in", batch]},
+                    fields=["user", "enabled", "max_outstanding_limit", "is_blocked", "block_reason"],
+                )
+            }
+            for user, value in bulk_salesman_outstanding(batch, settings).items():
+                set_cached_exposure(exposure_keys[user], value)
+                policy = policies.get(user)
+                set_cached_exposure(policy_keys[user], {k: v for k, v in policy.items() if k != "user"} if policy else {})
+        _log_step(logger, "salesmen", len(users), t)
+
+    _log_step(logger, "total", len(customers), started)
+
+
+def _active(kind, since):
+    """Customers / stamped salesmen with unpaid invoices or invoices since `since`."""
+    column = "customer" if kind == "customer" else "temp_credit_salesman"
+    return frappe.db.sql_list(
+        f"""
+        SELECT DISTINCT {column}
+        FROM `tabSales Invoice`
+        WHERE docstatus = 1 AND (outstanding_amount > 0 OR posting_date >= %(since)s) AND IFNULL({column}, '') != ''
+        UNION
+        SELECT DISTINCT {"customer" if kind == "customer" else _salesman_expr("POS Invoice")}
+        FROM `tabPOS Invoice`
+        WHERE docstatus = 1 AND (outstanding_amount > 0 OR posting_date >= %(since)s)
+        """,
+        {"since": since},
+    )
+
+
+def _batches(values):
+    values = list(values)
+    for i in range(0, len(values), WARM_UP_BATCH_SIZE):
+        yield values[i : i + WARM_UP_BATCH_SIZE]
+
+
+def _log_step(logger, step, count, started):
+    logger.info(f"Temp Credit warm-up: {step} ({count}) in {(time.monotonic() - started) * 1000:.0f} ms")
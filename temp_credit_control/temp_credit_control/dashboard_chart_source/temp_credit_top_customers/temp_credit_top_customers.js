@@ -0,0 +1,6 @@
+frappe.provide('frappe.dashboards.chart_sources');
+
+frappe.dashboards.chart_sources['Temp Credit Top Customers'] = {
+  method: 'temp_credit_control.temp_credit_control.dashboard_chart_source.temp_credit_top_customers.temp_credit_top_customers.get',
+  filters: [],
+};
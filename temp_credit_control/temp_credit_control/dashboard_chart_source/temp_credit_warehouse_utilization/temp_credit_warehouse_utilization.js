@@ -0,0 +1,6 @@
+frappe.provide('frappe.dashboards.chart_sources');
+
+frappe.dashboards.chart_sources['Temp Credit Warehouse Utilization'] = {
+  method: 'temp_credit_control.temp_credit_control.dashboard_chart_source.temp_credit_warehouse_utilization.temp_credit_warehouse_utilization.get',
+  filters: [],
+};
@@ -0,0 +1,21 @@
+import frappe
+
+from temp_credit_control.services.temp_credit_dashboard import check_dashboard_permission, get_warehouse_utilization_chart
+from temp_credit_control.services.temp_credit_replica import replica_read_only
+
+
+@frappe.whitelist()
+@replica_read_only
+def get(
+    chart_name=None,
+    chart=None,
+    no_cache=None,
+    filters=None,
+    from_date=None,
+    to_date=None,
+    timespan=None,
+    time_interval=None,
+    heatmap_year=None,
+):
+    check_dashboard_permission()
+    return get_warehouse_utilization_chart()
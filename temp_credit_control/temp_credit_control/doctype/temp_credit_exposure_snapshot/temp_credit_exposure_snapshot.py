@@ -0,0 +1,20 @@
+# Copyright (c) 2026, Temp Credit Control and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class TempCreditExposureSnapshot(Document):
+	pass
+
+
+def on_doctype_update():
+	# one row per entity per day (upsert target) + range scan per entity
+	frappe.db.add_unique(
+		"Temp Credit Exposure Snapshot",
+		["entity_type", "entity", "snapshot_date"],
+		constraint_name="unique_entity_snapshot",
+	)
+	# totals per day for a whole entity type
+	frappe.db.add_index("Temp Credit Exposure Snapshot", ["entity_type", "snapshot_date"])
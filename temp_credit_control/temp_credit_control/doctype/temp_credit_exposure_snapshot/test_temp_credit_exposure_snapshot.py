@@ -0,0 +1,105 @@
+# Copyright (c) 2026, Temp Credit Control and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt, get_datetime
+
+from temp_credit_control.services.temp_credit_snapshot import SNAPSHOT_DOCTYPE, take_daily_snapshot
+from temp_credit_control.services.temp_credit_warehouse_exposure import _write_rows, refresh_invoices
+
+DAY_1 = "2001-01-01"
+DAY_2 = "2001-01-02"
+
+
+class TestTempCreditExposureSnapshot(FrappeTestCase):
+	def setUp(self):
+		frappe.db.set_single_value("Temp Credit Settings", "enabled", 1)
+		frappe.clear_document_cache("Temp Credit Settings", "Temp Credit Settings")
+
+		suffix = frappe.generate_hash(length=6)
+		self.customer = f"_TC-Snap-{suffix}"
+		self.warehouse = f"_TC Snap WH {suffix}"
+		self.salesman = f"tc-snap-{suffix}@example.com"
+		self.invoice = f"_TC-SNAP-{suffix}"
+
+		customer = frappe.get_doc({"doctype": "Customer", "name": self.customer, "customer_name": self.customer})
+		customer.creation = customer.modified = get_datetime()
+		customer.db_insert()
+
+		invoice = frappe.get_doc(
+			{
+				"doctype": "Sales Invoice",
+				"name": self.invoice,
+				"customer": self.customer,
+				"company": "_Test Company",
+				"posting_date": DAY_1,
+				"docstatus": 1,
+				"outstanding_amount": 1000,
+				"temp_credit_customer": 1,
+				"temp_credit_salesman": self.salesman,
+			}
+		)
+		invoice.creation = invoice.modified = get_datetime()
+		invoice.db_insert()
+
+		_write_rows(
+			"Sales Invoice",
+			[{"name": self.invoice, "customer": self.customer, "outstanding_amount": 1000, "shares": {self.warehouse: 1.0}}],
+		)
+
+	def tearDown(self):
+		frappe.clear_document_cache("Temp Credit Settings", "Temp Credit Settings")
+
+	def test_customer_warehouse_and_salesman_rows(self):
+		take_daily_snapshot(DAY_1)
+
+		for entity_type, entity in self._entities():
+			rows = self._rows(DAY_1, entity_type, entity)
+			self.assertEqual(len(rows), 1, entity_type)
+			self.assertEqual(flt(rows[0].exposure), 1000, entity_type)
+			self.assertEqual(rows[0].invoice_count, 1, entity_type)
+
+		settings = frappe.get_cached_doc("Temp Credit Settings")
+		warehouse_row = self._rows(DAY_1, "Warehouse", self.warehouse)[0]
+		self.assertEqual(flt(warehouse_row.credit_limit), flt(settings.default_warehouse_limit))
+
+	def test_rerun_same_day_is_idempotent(self):
+		take_daily_snapshot(DAY_1)
+		take_daily_snapshot(DAY_1)
+
+		for entity_type, entity in self._entities():
+			rows = self._rows(DAY_1, entity_type, entity)
+			self.assertEqual([flt(r.exposure) for r in rows], [1000], entity_type)
+
+	def test_paid_down_rerun_same_day_writes_zero(self):
+		take_daily_snapshot(DAY_1)
+		self._pay_in_full()
+		take_daily_snapshot(DAY_1)
+
+		for entity_type, entity in self._entities():
+			rows = self._rows(DAY_1, entity_type, entity)
+			self.assertEqual([flt(r.exposure) for r in rows], [0], entity_type)
+
+	def test_paid_down_next_day_writes_zero(self):
+		take_daily_snapshot(DAY_1)
+		self._pay_in_full()
+		take_daily_snapshot(DAY_2)
+
+		for entity_type, entity in self._entities():
+			self.assertEqual([flt(r.exposure) for r in self._rows(DAY_1, entity_type, entity)], [1000])
+			self.assertEqual([flt(r.exposure) for r in self._rows(DAY_2, entity_type, entity)], [0])
+
+	def _pay_in_full(self):
+		frappe.db.set_value("Sales Invoice", self.invoice, "outstanding_amount", 0, update_modified=False)
+		refresh_invoices("Sales Invoice", [self.invoice])
+
+	def _entities(self):
+		return [("Customer", self.customer), ("Warehouse", self.warehouse), ("Salesman", self.salesman)]
+
+	def _rows(self, snapshot_date, entity_type, entity):
+		return frappe.get_all(
+			SNAPSHOT_DOCTYPE,
+			filters={"snapshot_date": snapshot_date, "entity_type": entity_type, "entity": entity},
+			fields=["exposure", "credit_limit", "invoice_count"],
+		)
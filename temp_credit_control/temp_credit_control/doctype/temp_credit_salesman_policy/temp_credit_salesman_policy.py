@@ -1,9 +1,14 @@
 # Copyright (c) 2025, Temp Credit Control and contributors
 # For license information, please see license.txt
 
-# import frappe
 from frappe.model.document import Document
 
+from temp_credit_control.services.temp_credit_cache import bump_exposure_version
+
 
 class TempCreditSalesmanPolicy(Document):
-	pass
+	def on_update(self):
+		bump_exposure_version()
+
+	def on_trash(self):
+		bump_exposure_version()
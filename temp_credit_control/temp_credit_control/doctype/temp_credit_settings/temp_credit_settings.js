@@ -1,7 +1,7 @@
 frappe.ui.form.on('Temp Credit Settings', {
   refresh(frm) {
     frm.set_intro(
-      __('This module enforces Temp Credit limits on <b>Sales Invoice</b> at server-side (hooks).'),
+      __('This module enforces Temp Credit limits on <b>Sales Invoice</b> and <b>POS Invoice</b> at server-side (hooks).'),
       'blue'
     );
 
@@ -17,5 +17,49 @@ frappe.ui.form.on('Temp Credit Settings', {
       frm.set_value('customer_tc_fieldname', frm.doc.customer_tc_fieldname || 'custom_payment_type');
       frm.set_value('temp_credit_value', frm.doc.temp_credit_value || 'Temp Credit');
     }
+
+    if (frappe.user.has_role('System Manager')) {
+      frm.add_custom_button(__('Reconcile Exposure'), () => {
+        frappe.call({
+          method: 'temp_credit_control.services.temp_credit_reconcile.run_reconciliation',
+          callback: (r) => {
+            const run = r.message || {};
+            frappe.show_alert({
+              message: __('Reconciliation running in {0} chunks', [run.chunks || 0]),
+              indicator: 'blue',
+            });
+          },
+        });
+      });
+
+      frm.add_custom_button(__('Warm Up Caches'), () => {
+        frappe.call({
+          method: 'temp_credit_control.services.temp_credit_warmup.run_warm_up',
+          callback: () => {
+            frappe.show_alert({ message: __('Cache warm-up queued'), indicator: 'blue' });
+          },
+        });
+      });
+
+      frm.add_custom_button(__('Reconciliation Status'), () => {
+        frappe.call({
+          method: 'temp_credit_control.services.temp_credit_reconcile.get_reconciliation_status',
+          callback: (r) => {
+            const res = r.message || {};
+            const s = res.last_summary || {};
+            frappe.msgprint(
+              __('Chunks done: {0} / {1}', [res.chunks_done || 0, (res.run || {}).chunks || 0]) +
+                '<br>' +
+                __('Last run: {0} stamps fixed, {1} missing, {2} mismatched, {3} stale exposure invoices', [
+                  s.stamps_fixed || 0,
+                  s.exposure_missing || 0,
+                  s.exposure_mismatch || 0,
+                  s.exposure_stale || 0,
+                ])
+            );
+          },
+        });
+      });
+    }
   }
 });
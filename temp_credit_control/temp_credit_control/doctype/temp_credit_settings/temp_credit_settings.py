@@ -1,9 +1,16 @@
 # Copyright (c) 2025, Temp Credit Control and contributors
 # For license information, please see license.txt
 
-# import frappe
 from frappe.model.document import Document
 
+from temp_credit_control.services.temp_credit_cache import bump_exposure_version
+from temp_credit_control.services.temp_credit_stamping import enqueue_restamp
+
 
 class TempCreditSettings(Document):
-	pass
+	def on_update(self):
+		bump_exposure_version()
+
+		# stamped Sales Invoice.temp_credit_customer follows the TC classification
+		if self.has_value_changed("customer_tc_fieldname") or self.has_value_changed("temp_credit_value"):
+			enqueue_restamp()
@@ -0,0 +1,7 @@
+// Copyright (c) 2026, Temp Credit Control and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Temp Credit Warehouse Exposure", {
+// 	refresh(frm) {
+// 	},
+// });
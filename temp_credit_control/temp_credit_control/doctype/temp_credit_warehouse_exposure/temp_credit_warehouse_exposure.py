@@ -0,0 +1,14 @@
+# Copyright (c) 2026, Temp Credit Control and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class TempCreditWarehouseExposure(Document):
+	pass
+
+
+def on_doctype_update():
+	# warehouse pool = SUM(outstanding_amount) WHERE warehouse = ...
+	frappe.db.add_index("Temp Credit Warehouse Exposure", ["warehouse", "outstanding_amount"])
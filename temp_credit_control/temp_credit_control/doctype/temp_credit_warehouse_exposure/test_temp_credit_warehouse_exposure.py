@@ -0,0 +1,143 @@
+# Copyright (c) 2026, Temp Credit Control and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt, now, nowdate
+
+from temp_credit_control.services.temp_credit_validator import get_warehouse_shares
+from temp_credit_control.services.temp_credit_warehouse_exposure import (
+	EXPOSURE_DOCTYPE,
+	_write_rows,
+	on_payment_change,
+)
+
+
+class TestWarehouseShares(FrappeTestCase):
+	def test_header_warehouse_for_lines_without_one(self):
+		self.assertEqual(get_warehouse_shares([{"base_net_amount": 100}], "WH-A"), {"WH-A": 1.0})
+
+	def test_item_warehouse_wins_over_header(self):
+		items = [{"warehouse": "WH-B", "base_net_amount": 100}, {"warehouse": "WH-B", "base_net_amount": 50}]
+		self.assertEqual(get_warehouse_shares(items, "WH-A"), {"WH-B": 1.0})
+
+	def test_mixed_item_and_header_warehouses(self):
+		items = [{"warehouse": "WH-B", "base_net_amount": 300}, {"base_net_amount": 100}]
+		self.assertEqual(get_warehouse_shares(items, "WH-A"), {"WH-A": 0.25, "WH-B": 0.75})
+
+	def test_lines_without_warehouse_are_left_out(self):
+		items = [{"warehouse": "WH-A", "base_net_amount": 100}, {"base_net_amount": 300}]
+		self.assertEqual(get_warehouse_shares(items), {"WH-A": 1.0})
+
+	def test_no_warehouse_at_all(self):
+		self.assertEqual(get_warehouse_shares([{"base_net_amount": 100}]), {})
+		self.assertEqual(get_warehouse_shares([]), {})
+
+	def test_no_items_uses_header(self):
+		self.assertEqual(get_warehouse_shares(None, "WH-A"), {"WH-A": 1.0})
+
+	def test_zero_totals_split_evenly(self):
+		items = [{"warehouse": "WH-A", "base_net_amount": 0}, {"warehouse": "WH-B", "base_net_amount": 0}]
+		self.assertEqual(get_warehouse_shares(items), {"WH-A": 0.5, "WH-B": 0.5})
+
+	def test_returns_count_by_absolute_amount(self):
+		items = [{"warehouse": "WH-A", "base_net_amount": -100}, {"warehouse": "WH-B", "base_net_amount": -300}]
+		self.assertEqual(get_warehouse_shares(items), {"WH-A": 0.25, "WH-B": 0.75})
+
+
+class TestTempCreditWarehouseExposure(FrappeTestCase):
+	def setUp(self):
+		self.invoice = f"_TC-EXP-{frappe.generate_hash(length=8)}"
+		doc = frappe.get_doc(
+			{
+				"doctype": "Sales Invoice",
+				"name": self.invoice,
+				"customer": "_Test Temp Credit Customer",
+				"company": "_Test Company",
+				"posting_date": nowdate(),
+				"docstatus": 1,
+				"outstanding_amount": 1000,
+			}
+		)
+		doc.creation = doc.modified = now()
+		doc.db_insert()
+
+		# item lines the 0.25 / 0.75 shares below come from
+		for idx, (warehouse, amount) in enumerate([("WH-A", 250), ("WH-B", 750)], start=1):
+			item = frappe.get_doc(
+				{
+					"doctype": "Sales Invoice Item",
+					"parent": self.invoice,
+					"parenttype": "Sales Invoice",
+					"parentfield": "items",
+					"idx": idx,
+					"warehouse": warehouse,
+					"base_net_amount": amount,
+				}
+			)
+			item.db_insert()
+
+		_write_rows(
+			"Sales Invoice",
+			[
+				{
+					"name": self.invoice,
+					"customer": "_Test Temp Credit Customer",
+					"outstanding_amount": 1000,
+					"shares": {"WH-A": 0.25, "WH-B": 0.75},
+				}
+			],
+		)
+
+	def test_rows_apportion_outstanding(self):
+		self.assertEqual(self._exposure(), {"WH-A": 250, "WH-B": 750})
+
+	def test_payment_rescales_rows(self):
+		self._pay(outstanding=400)
+		self.assertEqual(self._exposure(), {"WH-A": 100, "WH-B": 300})
+
+	def test_payment_through_journal_entry_rescales_rows(self):
+		frappe.db.set_value("Sales Invoice", self.invoice, "outstanding_amount", 200, update_modified=False)
+		on_payment_change(
+			frappe._dict(accounts=[frappe._dict(reference_type="Sales Invoice", reference_name=self.invoice)])
+		)
+		self.assertEqual(self._exposure(), {"WH-A": 50, "WH-B": 150})
+
+	def test_full_payment_deletes_rows(self):
+		self._pay(outstanding=0)
+		self.assertEqual(self._exposure(), {})
+
+	def test_overpayment_deletes_rows(self):
+		self._pay(outstanding=-50)
+		self.assertEqual(self._exposure(), {})
+
+	def test_paid_invoice_writes_no_rows(self):
+		_write_rows(
+			"Sales Invoice",
+			[{"name": self.invoice, "customer": "_Test Temp Credit Customer", "outstanding_amount": 0, "shares": {"WH-A": 1.0}}],
+		)
+		self.assertEqual(self._exposure(), {})
+
+	def test_cancelled_payment_restores_rows(self):
+		self._pay(outstanding=0)
+		with patch(
+			"temp_credit_control.services.temp_credit_warehouse_exposure._is_tc_customer", return_value=True
+		):
+			self._pay(outstanding=1000)
+		self.assertEqual(self._exposure(), {"WH-A": 250, "WH-B": 750})
+
+	def _pay(self, outstanding):
+		frappe.db.set_value("Sales Invoice", self.invoice, "outstanding_amount", outstanding, update_modified=False)
+		on_payment_change(
+			frappe._dict(references=[frappe._dict(reference_doctype="Sales Invoice", reference_name=self.invoice)])
+		)
+
+	def _exposure(self):
+		rows = frappe.get_all(
+			EXPOSURE_DOCTYPE,
+			filters={"invoice_type": "Sales Invoice", "invoice": self.invoice},
+			fields=["warehouse", "outstanding_amount"],
+		)
+		return {r.warehouse: flt(r.outstanding_amount, 2) for r in rows}
@@ -0,0 +1,93 @@
+const SIMULATE_METHOD = 'temp_credit_control.services.temp_credit_simulator.simulate_limits';
+const SIMULATED_FIELDS = [
+  ['default_customer_limit', __('Customer Limit'), 'Currency'],
+  ['default_max_unpaid_invoices', __('Max Unpaid Invoices'), 'Int'],
+  ['default_warehouse_limit', __('Warehouse Limit'), 'Currency'],
+  ['default_salesman_limit', __('Salesman Limit'), 'Currency'],
+];
+
+frappe.pages['temp-credit-policy-simulator'].on_page_load = function (wrapper) {
+  const page = frappe.ui.make_app_page({
+    parent: wrapper,
+    title: __('Temp Credit Policy Simulator'),
+    single_column: true,
+  });
+
+  const $body = $(`
+    <div class="tc-simulator">
+      <p class="text-muted">${__(
+        'Candidate default limits, one per line as comma separated values in the order of the fields below. The current settings are always simulated first.'
+      )}</p>
+      <div class="tc-fields"></div>
+      <div class="tc-results" style="margin-top: 15px"></div>
+    </div>
+  `).appendTo(page.body);
+
+  const candidates = frappe.ui.form.make_control({
+    parent: $body.find('.tc-fields'),
+    df: {
+      fieldtype: 'Small Text',
+      fieldname: 'candidates',
+      label: SIMULATED_FIELDS.map((f) => f[1]).join(', '),
+    },
+    render_input: true,
+  });
+
+  page.set_primary_action(__('Simulate'), () => {
+    const rows = (candidates.get_value() || '')
+      .split('\n')
+      .map((line) => line.trim())
+      .filter(Boolean)
+      .map((line) => {
+        const values = line.split(',').map((v) => v.trim());
+        const candidate = {};
+        SIMULATED_FIELDS.forEach(([fieldname], i) => {
+          if (values[i]) candidate[fieldname] = flt(values[i]);
+        });
+        return candidate;
+      });
+
+    frappe.call({
+      method: SIMULATE_METHOD,
+      args: { candidates: [{}, ...rows] },
+      freeze: true,
+      callback: (r) => render_results($body.find('.tc-results'), r.message || {}),
+    });
+  });
+};
+
+function render_results($target, res) {
+  const pop = res.population || {};
+  const kinds = [
+    ['customers', __('Customers'), pop.customers],
+    ['warehouses', __('Warehouses'), pop.warehouses, !res.enable_warehouse_limit],
+    ['salesmen', __('Salesmen'), pop.salesmen, !res.enable_salesman_limit],
+  ];
+
+  const header = SIMULATED_FIELDS.map((f) => `<th>${f[1]}</th>`).join('') +
+    kinds.map(([, label, total, disabled]) =>
+      `<th>${label} ${__('over limit')} (${total || 0})${disabled ? ` <span class="text-muted">${__('disabled')}</span>` : ''}</th>`
+    ).join('');
+
+  const body = (res.results || []).map((result, idx) => {
+    const settings = SIMULATED_FIELDS.map(([fieldname, , fieldtype]) =>
+      `<td>${format_value(result.settings[fieldname], { fieldtype })}</td>`
+    ).join('');
+    const counts = kinds.map(([kind]) => {
+      const r = result[kind] || {};
+      const names = (r.entities || []).map((e) =>
+        `${frappe.utils.escape_html(e.entity)}: ${format_currency(e.outstanding)} / ${format_currency(e.limit)}`
+      ).join('<br>');
+      return `<td><b>${r.count || 0}</b> (${format_currency(r.exposure || 0)})
+        ${names ? `<details><summary>${__('Show')}</summary>${names}</details>` : ''}</td>`;
+    }).join('');
+    return `<tr${idx === 0 ? ' class="text-muted"' : ''}>${settings}${counts}</tr>`;
+  }).join('');
+
+  $target.html(`
+    <table class="table table-bordered">
+      <thead><tr>${header}</tr></thead>
+      <tbody>${body}</tbody>
+    </table>
+  `);
+}
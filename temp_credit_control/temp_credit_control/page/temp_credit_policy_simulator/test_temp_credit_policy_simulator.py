@@ -0,0 +1,141 @@
+# Copyright (c) 2026, Temp Credit Control and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from temp_credit_control.services import temp_credit_validator as validator
+from temp_credit_control.services.temp_credit_simulator import _evaluate, _to_arrays
+from temp_credit_control.services.temp_credit_validator import apply_temp_credit_rules, get_limit_settings
+
+# saved settings: 0 unpaid invoices is read as 3 by the validator
+RAW_SETTINGS = {
+	"default_customer_limit": 700,
+	"default_max_unpaid_invoices": 0,
+	"default_warehouse_limit": 35000,
+	"default_salesman_limit": 5000,
+}
+
+# customer: (unpaid invoices, outstanding, credit_limit_override, max_unpaid_invoices_override)
+CUSTOMERS = {
+	"TC-Within": (3, 500, 0, 0),
+	"TC-Count": (4, 100, 0, 0),
+	"TC-Amount": (1, 800, 0, 0),
+	"TC-Override-Ok": (1, 800, 1000, 0),
+	"TC-Invoices-Ok": (5, 100, 0, 5),
+	"TC-Invoices-Over": (2, 100, 0, 1),
+}
+
+WAREHOUSES = {"WH-Over": 36000, "WH-Ok": 1000}
+
+# salesman: (outstanding, enabled policy limit or None)
+SALESMEN = {
+	"sm-default-over@example.com": (6000, None),
+	"sm-policy-ok@example.com": (6000, 10000),
+	"sm-no-limit@example.com": (99999, 0),
+	"sm-default-ok@example.com": (100, None),
+}
+
+
+class TestTempCreditPolicySimulator(FrappeTestCase):
+	def setUp(self):
+		self.settings = {
+			"enabled": True,
+			"show_popup_on_allow": False,
+			"enable_warehouse_limit": True,
+			"enable_salesman_limit": True,
+			"customer_tc_fieldname": "custom_payment_type",
+			"temp_credit_value": "Temp Credit",
+			"exposure_source": "Sales Invoice",
+			**get_limit_settings(lambda fieldname, default: RAW_SETTINGS.get(fieldname, default)),
+		}
+
+	def test_simulation_matches_validator_for_current_settings(self):
+		over = _evaluate(_to_arrays(self._columns()), self.settings)
+
+		self.assertEqual(self._names(over["customers"]), self._blocked_customers())
+		self.assertEqual(self._names(over["warehouses"]), self._blocked_warehouses())
+		self.assertEqual(self._names(over["salesmen"]), self._blocked_salesmen())
+
+	def test_zero_max_unpaid_invoices_means_default(self):
+		self.assertEqual(self.settings["default_max_unpaid_invoices"], 3)
+		over = _evaluate(_to_arrays(self._columns()), self.settings)
+		self.assertNotIn("TC-Within", self._names(over["customers"]))
+
+	# ---------------- Validator side ----------------
+
+	def _blocked_customers(self):
+		return {c for c in CUSTOMERS if self._blocks(self._doc(c))}
+
+	def _blocked_warehouses(self):
+		return {wh for wh in WAREHOUSES if self._blocks(self._doc("TC-Clean", warehouse=wh))}
+
+	def _blocked_salesmen(self):
+		return {u for u in SALESMEN if self._blocks(self._doc("TC-Clean", salesman=u))}
+
+	def _doc(self, customer, warehouse=None, salesman=None):
+		# submitted: checked against current exposure only, like the simulator
+		return frappe._dict(
+			doctype="Sales Invoice",
+			docstatus=1,
+			customer=customer,
+			owner=salesman or "sm-default-ok@example.com",
+			custom_salesman_user=salesman,
+			outstanding_amount=1,
+			items=[{"warehouse": warehouse or "WH-Ok", "base_net_amount": 1}],
+		)
+
+	def _blocks(self, doc):
+		def cached(kind, key, generator):
+			if kind == "customer_policy":
+				_count, _outstanding, credit, invoices = CUSTOMERS.get(key, (0, 0, 0, 0))
+				return {"enabled": 1, "credit_limit_override": credit, "max_unpaid_invoices_override": invoices}
+			if kind == "salesman_policy":
+				limit = SALESMEN.get(key, (0, None))[1]
+				return {} if limit is None else {"enabled": 1, "max_outstanding_limit": limit}
+
+		def exposure(kind, key, generator):
+			if kind == "customer":
+				count, outstanding = CUSTOMERS.get(key, (0, 0))[:2]
+				return count, outstanding
+			if kind == "warehouse":
+				return WAREHOUSES.get(key, 0)
+			return SALESMEN.get(key, (0, None))[0]
+
+		with patch.object(validator, "_get_settings", return_value=self.settings), patch.object(
+			validator, "_is_temp_credit_customer", return_value=True
+		), patch.object(validator, "get_cached_exposure", side_effect=cached), patch.object(
+			validator, "_get_exposure", side_effect=exposure
+		):
+			try:
+				apply_temp_credit_rules(doc)
+			except frappe.ValidationError:
+				return True
+		return False
+
+	# ---------------- Simulator side ----------------
+
+	def _columns(self):
+		return {
+			"customers": {
+				"entity": list(CUSTOMERS),
+				"count": [v[0] for v in CUSTOMERS.values()],
+				"outstanding": [v[1] for v in CUSTOMERS.values()],
+				"credit_override": [v[2] for v in CUSTOMERS.values()],
+				"invoices_override": [v[3] for v in CUSTOMERS.values()],
+				"checked": [True] * len(CUSTOMERS),
+			},
+			"warehouses": {"entity": list(WAREHOUSES), "outstanding": list(WAREHOUSES.values())},
+			"salesmen": {
+				"entity": list(SALESMEN),
+				"outstanding": [v[0] for v in SALESMEN.values()],
+				"has_policy": [v[1] is not None for v in SALESMEN.values()],
+				"policy_limit": [v[1] or 0 for v in SALESMEN.values()],
+				"checked": [True] * len(SALESMEN),
+			},
+		}
+
+	def _names(self, result):
+		return {e["entity"] for e in result["entities"]}
@@ -0,0 +1,71 @@
+frappe.query_reports['Temp Credit Aging'] = {
+  filters: [
+    {
+      fieldname: 'company',
+      label: __('Company'),
+      fieldtype: 'Link',
+      options: 'Company',
+      reqd: 1,
+      default: frappe.defaults.get_user_default('Company'),
+    },
+    {
+      fieldname: 'group_by',
+      label: __('Group By'),
+      fieldtype: 'Select',
+      options: 'Customer\nSalesman',
+      default: 'Customer',
+      reqd: 1,
+    },
+    {
+      fieldname: 'ageing_based_on',
+      label: __('Ageing Based On'),
+      fieldtype: 'Select',
+      options: 'Posting Date\nDue Date',
+      default: 'Posting Date',
+      reqd: 1,
+    },
+    {
+      fieldname: 'credit_type',
+      label: __('Credit Type'),
+      fieldtype: 'Select',
+      // blank = All, "Temp Credit", "Credit"
+      options: '\nTemp Credit\nCredit',
+      default: 'Temp Credit',
+    },
+    {
+      fieldname: 'salesman_user',
+      label: __('Salesman (User)'),
+      fieldtype: 'Link',
+      options: 'User',
+      reqd: 0,
+    },
+    {
+      fieldname: 'customer',
+      label: __('Customer'),
+      fieldtype: 'Link',
+      options: 'Customer',
+      reqd: 0,
+    },
+  ],
+
+  formatter: function (value, row, column, data, default_formatter) {
+    value = default_formatter(value, row, column, data);
+    if (!data) return value;
+
+    // Oldest bucket red
+    if (column.fieldname === 'range_90_plus' && flt(data.range_90_plus) > 0) {
+      value = `<span style="color:#d9534f; font-weight:700">${value}</span>`;
+    }
+
+    if (column.fieldname === 'party_name' && data.party_name) {
+      value = `<b>${frappe.utils.escape_html(data.party_name)}</b>`;
+    }
+
+    return value;
+  },
+};
+
+function flt(v) {
+  const n = parseFloat(v);
+  return isNaN(n) ? 0 : n;
+}
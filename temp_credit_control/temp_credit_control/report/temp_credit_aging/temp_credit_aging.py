@@ -0,0 +1,165 @@
+import frappe
+from frappe.utils import flt, nowdate
+
+from temp_credit_control.services.temp_credit_cache import get_cached_report
+from temp_credit_control.services.temp_credit_replica import replica_read_only
+
+
+# (fieldname, label, lower day bound, upper day bound or None)
+AGING_BUCKETS = (
+    ("range_0_30", "0-30", 0, 30),
+    ("range_31_60", "31-60", 31, 60),
+    ("range_61_90", "61-90", 61, 90),
+    ("range_90_plus", "90+", 91, None),
+)
+
+
+@replica_read_only
+def execute(filters=None):
+    filters = filters or {}
+    return get_cached_report("Temp Credit Aging", filters, lambda: _execute(filters))
+
+
+def _execute(filters):
+    columns = get_columns(filters)
+    data = get_data(filters)
+
+    chart = get_chart(data)
+    summary = get_report_summary(data)
+
+    return columns, data, None, chart, summary
+
+
+def get_columns(filters):
+    if (filters.get("group_by") or "Customer") == "Salesman":
+        party = [
+            {"label": "Salesman Name", "fieldname": "party_name", "fieldtype": "Data", "width": 220},
+            {"label": "Salesman (User)", "fieldname": "party", "fieldtype": "Link", "options": "User", "width": 200},
+        ]
+    else:
+        party = [
+            {"label": "Customer", "fieldname": "party", "fieldtype": "Link", "options": "Customer", "width": 170},
+            {"label": "Customer Name", "fieldname": "party_name", "fieldtype": "Data", "width": 220},
+        ]
+
+    return party + [
+        {"label": "Unpaid Invoices", "fieldname": "unpaid_invoices", "fieldtype": "Int", "width": 120},
+        {"label": "Outstanding (SAR)", "fieldname": "outstanding", "fieldtype": "Currency", "width": 150},
+    ] + [
+        {"label": f"{label} (SAR)", "fieldname": fieldname, "fieldtype": "Currency", "width": 130}
+        for fieldname, label, _lo, _hi in AGING_BUCKETS
+    ]
+
+
+def get_data(filters):
+    """
+    One scan over unpaid invoices: every bucket is a conditional SUM over the
+    invoice age, grouped by customer or salesman (stamped temp_credit_salesman).
+    """
+    company = (filters.get("company") or "").strip()
+    if not company:
+        return []
+
+    group_by = (filters.get("group_by") or "Customer").strip()
+    based_on = (filters.get("ageing_based_on") or "Posting Date").strip()
+    credit_type = (filters.get("credit_type") or "").strip()
+    salesman_user = (filters.get("salesman_user") or "").strip()
+    customer = (filters.get("customer") or "").strip()
+
+    params = {"company": company, "today": nowdate()}
+    cond = ["si.docstatus = 1", "IFNULL(si.is_return,0) = 0", "IFNULL(si.outstanding_amount,0) > 0", "si.company = %(company)s"]
+
+    if credit_type == "Temp Credit":
+        cond.append("si.temp_credit_customer = 1")
+    elif credit_type == "Credit":
+        cond.append("si.temp_credit_customer = 0")
+
+    if salesman_user:
+        cond.append("si.temp_credit_salesman = %(salesman_user)s")
+        params["salesman_user"] = salesman_user
+
+    if customer:
+        cond.append("si.customer = %(customer)s")
+        params["customer"] = customer
+
+    if group_by == "Salesman":
+        party_col = "si.temp_credit_salesman"
+        name_col = "MAX(u.full_name)"
+        name_join = "LEFT JOIN `tabUser` u ON u.name = si.temp_credit_salesman"
+    else:
+        party_col = "si.customer"
+        name_col = "MAX(c.customer_name)"
+        name_join = "LEFT JOIN `tabCustomer` c ON c.name = si.customer"
+
+    date_col = "IFNULL(si.due_date, si.posting_date)" if based_on == "Due Date" else "si.posting_date"
+    age = f"DATEDIFF(%(today)s, {date_col})"
+
+    bucket_cols = []
+    for fieldname, _label, lo, hi in AGING_BUCKETS:
+        # not yet due (negative age) counts as 0-30
+        lower = f"{age} >= {lo}" if lo else "1 = 1"
+        upper = f" AND {age} <= {hi}" if hi is not None else ""
+        bucket_cols.append(f"SUM(CASE WHEN {lower}{upper} THEN si.outstanding_amount ELSE 0 END) AS {fieldname}")
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT
+            {party_col} AS party,
+            {name_col} AS party_name,
+            COUNT(si.name) AS unpaid_invoices,
+            SUM(si.outstanding_amount) AS outstanding,
+            {", ".join(bucket_cols)}
+        FROM `tabSales Invoice` si
+        {name_join}
+        WHERE {" AND ".join(cond)}
+        GROUP BY {party_col}
+        ORDER BY outstanding DESC
+        """,
+        params,
+        as_dict=True,
+    )
+
+    out = []
+    for r in rows:
+        party = (r.party or "").strip()
+        row = {
+            "party": party,
+            "party_name": (r.party_name or "").strip() or party or "Not Set",
+            "unpaid_invoices": int(r.unpaid_invoices or 0),
+            "outstanding": flt(r.outstanding),
+        }
+        for fieldname, _label, _lo, _hi in AGING_BUCKETS:
+            row[fieldname] = flt(r.get(fieldname))
+        out.append(row)
+
+    return out
+
+
+def get_chart(data):
+    if not data:
+        return None
+
+    return {
+        "data": {
+            "labels": [label for _f, label, _lo, _hi in AGING_BUCKETS],
+            "datasets": [
+                {
+                    "name": "Outstanding (SAR)",
+                    "values": [round(sum(flt(d[f]) for d in data), 2) for f, _label, _lo, _hi in AGING_BUCKETS],
+                }
+            ],
+        },
+        "type": "bar",
+        "height": 280,
+    }
+
+
+def get_report_summary(data):
+    if not data:
+        return []
+
+    indicators = ("Green", "Blue", "Orange", "Red")
+    return [
+        {"label": f"{label} Days", "value": round(sum(flt(d[fieldname]) for d in data), 2), "indicator": indicator}
+        for (fieldname, label, _lo, _hi), indicator in zip(AGING_BUCKETS, indicators)
+    ]
@@ -0,0 +1,43 @@
+frappe.query_reports['Temp Credit Exposure Trend'] = {
+  filters: [
+    {
+      fieldname: 'entity_type',
+      label: __('Entity Type'),
+      fieldtype: 'Select',
+      options: 'Customer\nWarehouse\nSalesman',
+      default: 'Customer',
+      reqd: 1,
+    },
+    {
+      fieldname: 'entity',
+      label: __('Entity'),
+      fieldtype: 'Data',
+      reqd: 0,
+    },
+    {
+      fieldname: 'from_date',
+      label: __('From Date'),
+      fieldtype: 'Date',
+      default: frappe.datetime.add_months(frappe.datetime.get_today(), -3),
+      reqd: 1,
+    },
+    {
+      fieldname: 'to_date',
+      label: __('To Date'),
+      fieldtype: 'Date',
+      default: frappe.datetime.get_today(),
+      reqd: 1,
+    },
+  ],
+
+  formatter: function (value, row, column, data, default_formatter) {
+    value = default_formatter(value, row, column, data);
+    if (!data) return value;
+
+    if (column.fieldname === 'over_limit' && cint(data.over_limit) > 0) {
+      value = `<span style="color:#d9534f; font-weight:700">${value}</span>`;
+    }
+
+    return value;
+  },
+};
@@ -0,0 +1,93 @@
+import frappe
+from frappe.utils import flt, getdate
+
+from temp_credit_control.services.temp_credit_replica import replica_read_only
+from temp_credit_control.services.temp_credit_snapshot import SNAPSHOT_DOCTYPE
+
+
+@replica_read_only
+def execute(filters=None):
+    filters = filters or {}
+
+    columns = get_columns()
+    data = get_data(filters)
+    chart = get_chart(data)
+
+    return columns, data, None, chart
+
+
+def get_columns():
+    return [
+        {"label": "Date", "fieldname": "snapshot_date", "fieldtype": "Date", "width": 110},
+        {"label": "Entities", "fieldname": "entities", "fieldtype": "Int", "width": 100},
+        {"label": "Exposure (SAR)", "fieldname": "exposure", "fieldtype": "Currency", "width": 160},
+        {"label": "Limit (SAR)", "fieldname": "credit_limit", "fieldtype": "Currency", "width": 160},
+        {"label": "Utilization", "fieldname": "utilization", "fieldtype": "Percent", "width": 110},
+        {"label": "Unpaid Invoices", "fieldname": "invoice_count", "fieldtype": "Int", "width": 130},
+        {"label": "Over Limit", "fieldname": "over_limit", "fieldtype": "Int", "width": 100},
+    ]
+
+
+def get_data(filters):
+    """
+    One row per snapshot date: a single entity, or the totals of the whole
+    entity type. Reads only the snapshot table (indexed range scan).
+    """
+    entity_type = (filters.get("entity_type") or "Customer").strip()
+    entity = (filters.get("entity") or "").strip()
+
+    params = {
+        "entity_type": entity_type,
+        "from_date": getdate(filters.get("from_date")),
+        "to_date": getdate(filters.get("to_date")),
+    }
+    entity_cond = ""
+    if entity:
+        entity_cond = "AND entity = %(entity)s"
+        params["entity"] = entity
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT
+            snapshot_date,
+            COUNT(*) AS entities,
+            SUM(exposure) AS exposure,
+            SUM(credit_limit) AS credit_limit,
+            SUM(invoice_count) AS invoice_count,
+            SUM(credit_limit > 0 AND exposure > credit_limit) AS over_limit
+        FROM `tab{SNAPSHOT_DOCTYPE}`
+        WHERE
+            entity_type = %(entity_type)s
+            AND snapshot_date BETWEEN %(from_date)s AND %(to_date)s
+            {entity_cond}
+        GROUP BY snapshot_date
+        ORDER BY snapshot_date
+        """,
+        params,
+        as_dict=True,
+    )
+
+    for r in rows:
+        r.exposure = flt(r.exposure)
+        r.credit_limit = flt(r.credit_limit)
+        r.utilization = r.exposure * 100 / r.credit_limit if r.credit_limit > 0 else 0
+        r.over_limit = int(r.over_limit or 0)
+
+    return rows
+
+
+def get_chart(data):
+    if not data:
+        return None
+
+    return {
+        "data": {
+            "labels": [str(d.snapshot_date) for d in data],
+            "datasets": [
+                {"name": "Exposure (SAR)", "values": [round(d.exposure, 2) for d in data]},
+                {"name": "Limit (SAR)", "values": [round(d.credit_limit, 2) for d in data]},
+            ],
+        },
+        "type": "line",
+        "height": 280,
+    }
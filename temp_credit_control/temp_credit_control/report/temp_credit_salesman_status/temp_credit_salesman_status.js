@@ -42,9 +42,19 @@ frappe.query_reports['Temp Credit Salesman Status'] = {
       options: 'Salesman Wise\nTop 10 Customers',
       default: 'Salesman Wise',
       reqd: 1,
+      // both charts come with the report: switch locally, no re-run
+      on_change: () => switch_chart_mode(frappe.query_report, 'chart_mode'),
     },
   ],
 
+  onload: function (report) {
+    report.$report.on('click', '.tc-expand', (e) => {
+      e.preventDefault();
+      e.stopPropagation();
+      toggle_node(report, $(e.currentTarget).attr('data-node'));
+    });
+  },
+
   formatter: function (value, row, column, data, default_formatter) {
     value = default_formatter(value, row, column, data);
     if (!data) return value;
@@ -62,13 +72,75 @@ frappe.query_reports['Temp Credit Salesman Status'] = {
     }
 
     if (column.fieldname === 'salesman_name' && data.salesman_name) {
-      value = `<b>${frappe.utils.escape_html(data.salesman_name)}</b>`;
+      // Tree: salesman -> customers -> invoices, children fetched on expand
+      const label = frappe.utils.escape_html(data.salesman_name);
+      const indent = `padding-left:${(data.indent || 0) * 16}px`;
+
+      if (data.node_type === 'Invoice') {
+        value = `<span style="${indent}">${label}</span>`;
+      } else {
+        const icon = data._expanded ? '▾' : '▸';
+        const text = data.node_type === 'Customer' ? label : `<b>${label}</b>`;
+        value = `<span style="${indent}"><a class="tc-expand" data-node="${frappe.utils.escape_html(data.node_id || '')}">${icon}</a> ${text}</span>`;
+      }
     }
 
     return value;
   },
 };
 
+const REPORT_METHOD =
+  'temp_credit_control.temp_credit_control.report.temp_credit_salesman_status.temp_credit_salesman_status';
+
+function toggle_node(report, node_id) {
+  const rows = report.data || [];
+  const idx = rows.findIndex((r) => r.node_id === node_id);
+  if (idx < 0) return;
+
+  const node = rows[idx];
+  if (node._expanded) {
+    let end = idx + 1;
+    while (end < rows.length && (rows[end].indent || 0) > (node.indent || 0)) end++;
+    rows.splice(idx + 1, end - idx - 1);
+    node._expanded = false;
+    report.datatable.refresh(rows);
+    return;
+  }
+
+  const args = { filters: report.get_filter_values() };
+  let method;
+  if (node.node_type === 'Salesman') {
+    method = 'get_salesman_customers';
+    args.salesman_user = node.salesman_user;
+  } else if (node.node_type === 'Customer') {
+    method = 'get_customer_invoices';
+    args.salesman_user = node.node_salesman;
+    args.customer = node.node_customer;
+  } else {
+    return;
+  }
+
+  frappe.call({
+    method: `${REPORT_METHOD}.${method}`,
+    args: args,
+    callback: (r) => {
+      rows.splice(idx + 1, 0, ...(r.message || []));
+      node._expanded = true;
+      report.datatable.refresh(rows);
+    },
+  });
+}
+
+function switch_chart_mode(report, fieldname) {
+  const chart = report.raw_data && report.raw_data.chart;
+  const data = chart && chart.modes && chart.modes[report.get_filter_value(fieldname)];
+  if (!data) {
+    report.refresh();
+    return;
+  }
+  report.render_chart(Object.assign({}, chart, { data: data }), chart.height);
+}
+
 function flt(v) {
   const n = parseFloat(v);
   return isNaN(n) ? 0 : n;
@@ -1,18 +1,27 @@
 import frappe
 from frappe.utils import flt, add_days, nowdate, getdate
 
+from temp_credit_control.services.temp_credit_cache import get_cached_report
+from temp_credit_control.services.temp_credit_replica import replica_read_only
 
-SALESMAN_FIELD = "custom_salesman_user"  # 👈 add this custom field on Sales Invoice
 
+TREE_INVOICE_LIMIT = 500  # invoices shown under one expanded customer
 
+
+@replica_read_only
 def execute(filters=None):
     filters = filters or {}
+    return get_cached_report("Temp Credit Salesman Status", filters, lambda: _execute(filters))
+
+
+def _execute(filters):
     settings = _get_settings()
 
     columns = get_columns()
     data = get_data(filters, settings)
 
-    chart = get_chart(data)
+    top_customers = get_top_customers(filters, settings, [d["salesman_user"] for d in data])
+    chart = get_chart(data, top_customers, filters)
     summary = get_report_summary(data)
 
     return columns, data, None, chart, summary
@@ -20,7 +29,7 @@ def execute(filters=None):
 
 def get_columns():
     return [
-        {"label": "Salesman Name", "fieldname": "salesman_name", "fieldtype": "Data", "width": 220},
+        {"label": "Salesman / Customer / Invoice", "fieldname": "salesman_name", "fieldtype": "Data", "width": 260},
         {"label": "Salesman (User)", "fieldname": "salesman_user", "fieldtype": "Link", "options": "User", "width": 200},
         {"label": "Salesman Limit (SAR)", "fieldname": "salesman_limit", "fieldtype": "Currency", "width": 160},
         {"label": "Used Temp Credit (SAR)", "fieldname": "used_credit", "fieldtype": "Currency", "width": 170},
@@ -35,72 +44,27 @@ def get_columns():
 
 def get_data(filters, settings):
     company = (filters.get("company") or "").strip()
-    duration = (filters.get("duration") or "Last 30 Days").strip()
-    salesman_user_filter = (filters.get("salesman_user") or "").strip()
     show_only_over_limit = flt(filters.get("show_only_over_limit") or 0) == 1
     show_blocked_only = flt(filters.get("show_blocked_only") or 0) == 1
 
     if not company:
         return []
 
-    tc_field = settings["customer_tc_fieldname"]
-    tc_value = settings["temp_credit_value"]
-
-    temp_customers = frappe.db.sql_list(
-        f"""
-        SELECT name
-        FROM `tabCustomer`
-        WHERE IFNULL(`{tc_field}`, '') = %s
-        """,
-        (tc_value,),
-    )
-
-    if not temp_customers:
-        return []
-
     salesman_policy_map = _get_salesman_policies()
     default_limit = flt(settings.get("default_salesman_limit") or 0)
 
-    date_limit = get_date_limit(duration)
-    date_cond = ""
-    params = {"company": company, "temp_customers": tuple(temp_customers)}
-
-    if date_limit:
-        params["date_limit"] = date_limit
-        date_cond = "AND si.posting_date >= %(date_limit)s"
-
-    # ✅ detect if custom field exists on Sales Invoice table
-    has_custom_salesman = frappe.db.has_column("Sales Invoice", SALESMAN_FIELD)
-
-    # build salesman expression
-    # If custom_salesman_user exists -> use it, else fallback to owner
-    if has_custom_salesman:
-        salesman_expr = f"IFNULL(NULLIF(si.`{SALESMAN_FIELD}`,''), si.owner)"
-    else:
-        salesman_expr = "si.owner"
-
-    salesman_cond = ""
-    if salesman_user_filter:
-        params["salesman_user"] = salesman_user_filter
-        salesman_cond = f"AND {salesman_expr} = %(salesman_user)s"
+    where_sql, params = _get_conditions(filters)
 
     rows = frappe.db.sql(
         f"""
         SELECT
-            {salesman_expr} AS salesman_user,
+            si.temp_credit_salesman AS salesman_user,
             COUNT(si.name) AS unpaid_invoices,
             SUM(si.outstanding_amount) AS used_credit,
             COUNT(DISTINCT si.customer) AS temp_customers
         FROM `tabSales Invoice` si
-        WHERE
-            si.docstatus = 1
-            AND IFNULL(si.is_return, 0) = 0
-            AND IFNULL(si.outstanding_amount, 0) > 0
-            AND si.company = %(company)s
-            AND si.customer IN %(temp_customers)s
-            {date_cond}
-            {salesman_cond}
-        GROUP BY {salesman_expr}
+        WHERE {where_sql}
+        GROUP BY si.temp_credit_salesman
         """,
         params,
         as_dict=True,
@@ -143,6 +107,10 @@ def get_data(filters, settings):
 
         out.append(
             {
+                # tree node: customers / invoices are loaded on expand
+                "node_type": "Salesman",
+                "node_id": user,
+                "indent": 0,
                 "salesman_user": user,
                 "salesman_name": name_map.get(user) or user,
                 "salesman_limit": salesman_limit,
@@ -160,16 +128,160 @@ def get_data(filters, settings):
     return out
 
 
-def get_chart(data):
+# ---------------- Tree drill-down (lazy) ----------------
+
+@frappe.whitelist()
+@replica_read_only
+def get_salesman_customers(filters, salesman_user):
+    """Level 1: Temp Credit customers of one salesman (one indexed GROUP BY)."""
+    filters = _check_node_request(filters)
+    if not (filters.get("company") or "").strip():
+        return []
+
+    where_sql, params = _get_conditions(filters)
+    where_sql = _node_salesman_cond(where_sql, params, salesman_user)
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT
+            si.customer,
+            MAX(c.customer_name) AS customer_name,
+            COUNT(si.name) AS unpaid_invoices,
+            SUM(si.outstanding_amount) AS used_credit
+        FROM `tabSales Invoice` si
+        LEFT JOIN `tabCustomer` c ON c.name = si.customer
+        WHERE {where_sql}
+        GROUP BY si.customer
+        ORDER BY used_credit DESC
+        """,
+        params,
+        as_dict=True,
+    )
+
+    return [
+        {
+            "node_type": "Customer",
+            "node_id": f"{salesman_user}::{r.customer}",
+            "node_salesman": salesman_user,
+            "node_customer": r.customer,
+            "indent": 1,
+            "salesman_name": r.customer_name or r.customer,
+            "used_credit": flt(r.used_credit),
+            "unpaid_invoices": int(r.unpaid_invoices or 0),
+        }
+        for r in rows
+    ]
+
+
+@frappe.whitelist()
+@replica_read_only
+def get_customer_invoices(filters, salesman_user, customer):
+    """Level 2: unpaid invoices of one customer under one salesman."""
+    filters = _check_node_request(filters)
+    if not (filters.get("company") or "").strip():
+        return []
+
+    where_sql, params = _get_conditions(filters)
+    where_sql = _node_salesman_cond(where_sql, params, salesman_user)
+    params.update({"customer": customer, "limit": TREE_INVOICE_LIMIT})
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT si.name, si.posting_date, si.outstanding_amount
+        FROM `tabSales Invoice` si
+        WHERE {where_sql} AND si.customer = %(customer)s
+        ORDER BY si.posting_date DESC, si.name DESC
+        LIMIT %(limit)s
+        """,
+        params,
+        as_dict=True,
+    )
+
+    return [
+        {
+            "node_type": "Invoice",
+            "node_id": f"{salesman_user}::{customer}::{r.name}",
+            "indent": 2,
+            "salesman_name": f"{r.name} ({r.posting_date})",
+            "used_credit": flt(r.outstanding_amount),
+        }
+        for r in rows
+    ]
+
+
+def _check_node_request(filters):
+    if not frappe.get_doc("Report", "Temp Credit Salesman Status").is_permitted():
+        frappe.throw("Not permitted", frappe.PermissionError)
+    return frappe._dict(frappe.parse_json(filters) or {})
+
+
+def _node_salesman_cond(where_sql, params, salesman_user):
+    salesman_user = (salesman_user or "").strip()
+    if salesman_user:
+        params["node_salesman"] = salesman_user
+        return f"{where_sql} AND si.temp_credit_salesman = %(node_salesman)s"
+    # "Not Set" row of the report
+    return f"{where_sql} AND IFNULL(si.temp_credit_salesman, '') = ''"
+
+
+def get_top_customers(filters, settings, salesmen):
+    """Top 10 Temp Credit customers (used vs effective limit) of the displayed salesmen."""
+    if not salesmen:
+        return []
+
+    where_sql, params = _get_conditions(filters)
+    params.update({"salesmen": tuple(salesmen), "default_customer_limit": settings["default_customer_limit"]})
+
+    return frappe.db.sql(
+        f"""
+        SELECT
+            t.customer,
+            t.used_credit,
+            IF(IFNULL(pol.credit_limit_override, 0) > 0, pol.credit_limit_override, %(default_customer_limit)s) AS credit_limit
+        FROM (
+            SELECT si.customer, SUM(si.outstanding_amount) AS used_credit
+            FROM `tabSales Invoice` si
+            WHERE {where_sql} AND si.temp_credit_salesman IN %(salesmen)s
+            GROUP BY si.customer
+            ORDER BY used_credit DESC
+            LIMIT 10
+        ) t
+        LEFT JOIN `tabTemp Credit Customer Policy` pol
+            ON pol.customer = t.customer AND IFNULL(pol.enabled, 1) = 1
+        ORDER BY t.used_credit DESC
+        """,
+        params,
+        as_dict=True,
+    )
+
+
+def get_chart(data, top_customers=None, filters=None):
+    """
+    Chart for `chart_mode`; `modes` carries the data of every mode so the JS
+    can switch charts without re-running the report.
+    """
     if not data:
         return None
 
     top = data[:10]
-    labels = [d["salesman_name"] for d in top]
-    values = [round(flt(d["used_credit"]), 2) for d in top]
+    charts = {
+        "Salesman Wise": {
+            "labels": [d["salesman_name"] for d in top],
+            "datasets": [{"name": "Used Temp Credit (SAR)", "values": [round(flt(d["used_credit"]), 2) for d in top]}],
+        },
+        "Top 10 Customers": {
+            "labels": [c.customer for c in top_customers or []],
+            "datasets": [
+                {"name": "Used Temp Credit (SAR)", "values": [round(flt(c.used_credit), 2) for c in top_customers or []]},
+                {"name": "Customer Limit (SAR)", "values": [round(flt(c.credit_limit), 2) for c in top_customers or []]},
+            ],
+        },
+    }
 
+    chart_mode = ((filters or {}).get("chart_mode") or "Salesman Wise").strip()
     return {
-        "data": {"labels": labels, "datasets": [{"name": "Used Temp Credit (SAR)", "values": values}]},
+        "data": charts.get(chart_mode) or charts["Salesman Wise"],
+        "modes": charts,
         "type": "bar",
         "height": 280,
     }
@@ -201,10 +313,36 @@ def get_date_limit(duration):
     return None
 
 
+def _get_conditions(filters):
+    """Unpaid Temp Credit invoices by company / duration / salesman (stamped columns)."""
+    params = {"company": (filters.get("company") or "").strip()}
+    cond = [
+        "si.docstatus = 1",
+        "IFNULL(si.is_return, 0) = 0",
+        "IFNULL(si.outstanding_amount, 0) > 0",
+        "si.company = %(company)s",
+        "si.temp_credit_customer = 1",
+    ]
+
+    date_limit = get_date_limit((filters.get("duration") or "Last 30 Days").strip())
+    if date_limit:
+        params["date_limit"] = date_limit
+        cond.append("si.posting_date >= %(date_limit)s")
+
+    # TC flag + resolved salesman (custom_salesman_user, else owner) are stamped on the invoice
+    salesman_user = (filters.get("salesman_user") or "").strip()
+    if salesman_user:
+        params["salesman_user"] = salesman_user
+        cond.append("si.temp_credit_salesman = %(salesman_user)s")
+
+    return " AND ".join(cond), params
+
+
 def _get_settings():
     s = frappe.get_single("Temp Credit Settings")
     return {
         "default_salesman_limit": flt(getattr(s, "default_salesman_limit", 0)),
+        "default_customer_limit": flt(getattr(s, "default_customer_limit", 0)),
         "customer_tc_fieldname": (getattr(s, "customer_tc_fieldname", "custom_payment_type") or "custom_payment_type").strip(),
         "temp_credit_value": (getattr(s, "temp_credit_value", "Temp Credit") or "Temp Credit").strip(),
     }
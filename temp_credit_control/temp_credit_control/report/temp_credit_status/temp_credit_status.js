@@ -60,6 +60,8 @@ frappe.query_reports['Temp Credit Status'] = {
       options: 'Salesman Wise\nCustomer Wise',
       default: 'Salesman Wise',
       reqd: 1,
+      // both charts come with the report: switch locally, no re-run
+      on_change: () => switch_chart_mode(frappe.query_report, 'summary_mode'),
     },
     {
       fieldname: 'show_only_over_limit',
@@ -67,8 +69,42 @@ frappe.query_reports['Temp Credit Status'] = {
       fieldtype: 'Check',
       default: 0,
     },
+    {
+      fieldname: 'summary_only',
+      label: __('Summary Only (Chart & Cards)'),
+      fieldtype: 'Check',
+      default: 0,
+    },
   ],
 
+  onload: function (report) {
+    // Rows come in keyset pages; totals / cards / chart already cover the full set
+    report.page.add_inner_button(__('Load More'), () => load_more_invoices(report));
+    report.page.add_inner_button(__('Refresh Changes'), () => refresh_changes(report));
+
+    // All rows, streamed from the server (the standard export materializes everything)
+    report.page.add_inner_button(__('CSV'), () => export_invoices(report, 'CSV'), __('Export All'));
+    report.page.add_inner_button(__('Excel'), () => export_invoices(report, 'XLSX'), __('Export All'));
+  },
+
+  get_datatable_options: function (options) {
+    // Compact payload: customer / salesman attributes come once, in column lookups
+    const lookups = {};
+    (options.columns || []).forEach((col) => {
+      if (col.lookup) lookups[col.fieldname] = col.lookup;
+    });
+    expand_rows(options.data || [], lookups.customer, lookups.salesman_user);
+    return options;
+  },
+
+  after_datatable_render: function () {
+    // full run: the delta cursor comes with the columns again
+    frappe.query_report.__tc_cursor = null;
+
+    // Large companies: result is built in background and stored in chunks
+    sync_prepared_result(frappe.query_report);
+  },
+
   formatter: function (value, row, column, data, default_formatter) {
     value = default_formatter(value, row, column, data);
     if (!data) return value;
@@ -116,7 +152,178 @@ frappe.query_reports['Temp Credit Status'] = {
   },
 };
 
+function switch_chart_mode(report, fieldname) {
+  const chart = report.raw_data && report.raw_data.chart;
+  const data = chart && chart.modes && chart.modes[report.get_filter_value(fieldname)];
+  if (!data) {
+    report.refresh();
+    return;
+  }
+  report.render_chart(Object.assign({}, chart, { data: data }), chart.height);
+}
+
 function flt(v) {
   const n = parseFloat(v);
   return isNaN(n) ? 0 : n;
 }
+
+function expand_rows(rows, customers, salesmen) {
+  if (!customers) return rows;
+
+  rows.forEach((row) => {
+    Object.assign(row, customers[row.customer] || {});
+    row.salesman_name = (salesmen || {})[row.salesman_user] || row.salesman_user;
+  });
+  return rows;
+}
+
+const REPORT_METHOD = 'temp_credit_control.temp_credit_control.report.temp_credit_status.temp_credit_status';
+
+function sync_prepared_result(report) {
+  frappe.call({
+    method: `${REPORT_METHOD}.get_prepared_status`,
+    args: { filters: report.get_filter_values() },
+    callback: (r) => {
+      const meta = r.message || {};
+      report.__tc_prepared = !!meta.status;
+
+      if (meta.status === 'Completed') {
+        if (report.__tc_prepared_key !== `${meta.key}:${meta.created}`) {
+          report.__tc_prepared_key = `${meta.key}:${meta.created}`;
+          stream_prepared_chunks(report, meta.key, 1, meta.chunks);
+        }
+      } else if (meta.status === 'Queued' || meta.status === 'Running') {
+        listen_prepared_progress(report, meta.key);
+      }
+    },
+  });
+}
+
+function stream_prepared_chunks(report, key, idx, chunks) {
+  // chunk 0 came with the report response
+  if (idx >= chunks) return;
+
+  frappe.call({
+    method: `${REPORT_METHOD}.get_prepared_chunk`,
+    args: { key: key, idx: idx },
+    callback: (r) => {
+      const page = r.message || [];
+      if (page.length) {
+        report.data = (report.data || []).concat(page);
+        report.datatable.appendRows(page);
+      }
+      stream_prepared_chunks(report, key, idx + 1, chunks);
+    },
+  });
+}
+
+function listen_prepared_progress(report, key) {
+  if (report.__tc_prepared_listener) return;
+
+  report.__tc_prepared_listener = (data) => {
+    if (!data || data.key !== key) return;
+
+    frappe.show_progress(__('Preparing Temp Credit Status'), data.progress, 100);
+    if (data.status === 'Completed' || data.status === 'Failed') {
+      frappe.realtime.off('temp_credit_prepared_report', report.__tc_prepared_listener);
+      report.__tc_prepared_listener = null;
+      frappe.hide_progress();
+
+      if (data.status === 'Completed') {
+        report.refresh();
+      } else {
+        frappe.msgprint(__('Preparing the report failed. Please check the Error Log.'));
+      }
+    }
+  };
+  frappe.realtime.on('temp_credit_prepared_report', report.__tc_prepared_listener);
+}
+
+function export_invoices(report, file_format) {
+  open_url_post(`/api/method/${REPORT_METHOD}.export_invoices`, {
+    filters: JSON.stringify(report.get_filter_values()),
+    file_format: file_format,
+    csrf_token: frappe.csrf_token,
+  });
+}
+
+function refresh_changes(report) {
+  const col = (report.columns || []).find((c) => c.fieldname === 'sales_invoice');
+  const cursor = report.__tc_cursor || (col && col.change_cursor);
+  if (!cursor || report.__tc_prepared) {
+    report.refresh();
+    return;
+  }
+
+  frappe.call({
+    method: `${REPORT_METHOD}.get_status_changes`,
+    args: { filters: report.get_filter_values(), cursor: cursor },
+    callback: (r) => {
+      const res = r.message || {};
+      if (res.full_refresh) {
+        report.refresh();
+        return;
+      }
+
+      report.__tc_cursor = res.cursor;
+      if (!(res.customers || []).length) {
+        frappe.show_alert({ message: __('No changes'), indicator: 'green' });
+        return;
+      }
+
+      // Replace every row of a changed customer; stay within the loaded window
+      const changed = new Set(res.customers);
+      const rows = report.data || [];
+      const last = rows[rows.length - 1];
+
+      let fresh = expand_rows(res.rows || [], res.lookup, res.salesmen);
+      if (last) fresh = fresh.filter((row) => compare_row_key(row, last) >= 0);
+
+      const merged = rows.filter((row) => !changed.has(row.customer)).concat(fresh);
+      merged.sort((a, b) => compare_row_key(b, a));
+
+      report.data = merged;
+      report.datatable.refresh(merged);
+      frappe.show_alert({ message: __('{0} customers updated', [changed.size]), indicator: 'blue' });
+    },
+  });
+}
+
+function compare_row_key(a, b) {
+  // keyset order of the report: posting_date, modified, name
+  return (
+    String(a.posting_date || '').localeCompare(String(b.posting_date || '')) ||
+    String(a.invoice_modified || '').localeCompare(String(b.invoice_modified || '')) ||
+    String(a.sales_invoice || '').localeCompare(String(b.sales_invoice || ''))
+  );
+}
+
+function load_more_invoices(report) {
+  const rows = report.data || [];
+  if (!rows.length) return;
+
+  if (report.__tc_prepared) {
+    frappe.show_alert({ message: __('Prepared result: all invoices are streamed automatically'), indicator: 'blue' });
+    return;
+  }
+
+  const last = rows[rows.length - 1];
+  frappe.call({
+    method: `${REPORT_METHOD}.get_invoice_page`,
+    args: {
+      filters: report.get_filter_values(),
+      cursor: { posting_date: last.posting_date, modified: last.invoice_modified, name: last.sales_invoice },
+    },
+    freeze: true,
+    callback: (r) => {
+      const res = r.message || {};
+      const page = expand_rows(res.rows || [], res.customers, res.salesmen);
+      if (!page.length) {
+        frappe.show_alert({ message: __('All invoices loaded'), indicator: 'green' });
+        return;
+      }
+      report.data = rows.concat(page);
+      report.datatable.appendRows(page);
+    },
+  });
+}
@@ -1,21 +1,437 @@
-import frappe
-from frappe.utils import flt, add_days, nowdate, getdate
-
+import csv
+import os
+import tempfile
 
+import frappe
+from frappe.utils import cint, flt, add_days, add_to_date, nowdate, getdate, get_datetime, now_datetime
+
+from temp_credit_control.services.temp_credit_cache import get_cached_report, get_exposure_version
+from temp_credit_control.services.temp_credit_prepared import (
+    enqueue_prepared,
+    get_chunk,
+    get_prepared_key,
+    get_prepared_meta,
+    publish_progress,
+    store_chunk,
+)
+from temp_credit_control.services.temp_credit_replica import get_max_replica_lag, replica_read_only
+
+
+PAGE_LENGTH = 500  # invoice rows per keyset page
+PREPARED_ROW_THRESHOLD = 200000  # estimated unpaid invoices above which the report runs in background
+PREPARED_CHUNK_SIZE = 5000  # invoice rows per stored (compressed) chunk
+EXPORT_BLOCK_SIZE = 64 * 1024  # bytes per streamed response block
+SUMMARY_TOP_N = 10  # bars in the salesman / customer chart
+DELTA_MAX_CUSTOMERS = 500  # changed customers above which a delta refresh falls back to a full one
+DELTA_COMMIT_WINDOW = 60  # seconds a transaction may commit after stamping `modified`
+
+# Filters that decide the per-customer totals (cache key of the shared totals)
+TOTALS_FILTERS = (
+    "company",
+    "duration",
+    "customer_group",
+    "territory",
+    "salesman_user",
+    "customer",
+    "credit_type",
+    "show_only_over_limit",
+)
+
+# Sent once per customer in the compact payload instead of on every invoice row
+CUSTOMER_FIELDS = (
+    "customer_name",
+    "customer_group",
+    "territory",
+    "credit_type",
+    "credit_limit",
+    "customer_used_credit",
+    "remaining_credit",
+)
+
+
+@replica_read_only
 def execute(filters=None):
     filters = filters or {}
 
+    # Very large result: compute in a background job and stream the stored result
+    if (
+        not cint(filters.get("summary_only"))
+        and not frappe.flags.in_temp_credit_prepared
+        and estimate_row_count(filters) > PREPARED_ROW_THRESHOLD
+    ):
+        result = _prepared_response(filters)
+    else:
+        result = get_cached_report("Temp Credit Status", filters, lambda: _execute(filters))
+
+    # Report view expands compact rows client-side; exports get full rows
+    if frappe.form_dict.get("cmd") == "frappe.desk.query_report.run":
+        return _compact_result(result)
+    return result
+
+
+def _execute(filters):
     settings = _get_settings()
 
     columns = get_columns()
-    data, customer_summary = get_data(filters, settings)
+    # first read of the run: same snapshot as the rows below
+    columns[0]["change_cursor"] = get_change_cursor()
+
+    # Dashboards: chart + cards from grouped SQL, no invoice rows
+    if cint(filters.get("summary_only")):
+        chart, report_summary = get_summary_only(filters, settings)
+        return columns, [], None, chart, report_summary
 
-    chart = get_chart(customer_summary, data, filters)
+    data = get_data(filters, settings)
+    customer_summary, salesman_used = get_summary_data(filters, settings)
+
+    chart = get_chart(customer_summary, salesman_used, filters)
     report_summary = get_report_summary(customer_summary)
 
     return columns, data, None, chart, report_summary
 
 
+@frappe.whitelist()
+@replica_read_only
+def get_invoice_page(filters, cursor=None):
+    """
+    Next keyset page of invoice rows ("Load More" in the report).
+    cursor: {"posting_date", "modified", "name"} of the last row already shown.
+    """
+    _check_report_permission()
+
+    filters = frappe._dict(frappe.parse_json(filters) or {})
+    cursor = frappe.parse_json(cursor) if cursor else None
+
+    rows = get_cached_report(
+        "Temp Credit Status:page",
+        {**filters, "cursor": cursor},
+        lambda: get_data(filters, _get_settings(), cursor=cursor),
+    )
+
+    rows, customers, salesmen = compact_rows(rows)
+    return {"rows": rows, "customers": customers, "salesmen": salesmen}
+
+
+# ---------------- Delta refresh ----------------
+
+@frappe.whitelist()
+@replica_read_only
+def get_status_changes(filters, cursor):
+    """
+    Invoice rows (compact) of every customer whose invoices, policy or master
+    changed after `cursor`, as returned with the report / last delta.
+    A settings / policy change (deletes included: they bump the exposure
+    version) or too many changed customers asks for a full refresh.
+    Customers may be returned twice (cursor overlap); replacing their rows is idempotent.
+    """
+    _check_report_permission()
+
+    filters = frappe._dict(frappe.parse_json(filters) or {})
+    if not (filters.get("company") or "").strip() or not cursor:
+        return {"full_refresh": 1}
+
+    cursor, _, version = cursor.partition("|")
+    if version != get_exposure_version():
+        return {"full_refresh": 1}
+
+    # before the changed rows are read, in the same snapshot
+    new_cursor = get_change_cursor()
+    cursor = get_datetime(cursor)
+
+    settings_modified = frappe.db.get_value("Temp Credit Settings", None, "modified")
+    if settings_modified and get_datetime(settings_modified) > cursor:
+        return {"full_refresh": 1}
+
+    # all three are range scans on the standard `modified` index
+    customers = frappe.db.sql_list(
+        """
+        SELECT customer FROM `tabSales Invoice` WHERE modified > %(cursor)s AND company = %(company)s
+        UNION
+        SELECT customer FROM `tabTemp Credit Customer Policy` WHERE modified > %(cursor)s
+        UNION
+        SELECT name FROM `tabCustomer` WHERE modified > %(cursor)s
+        LIMIT %(limit)s
+        """,
+        {"cursor": cursor, "company": filters.company.strip(), "limit": DELTA_MAX_CUSTOMERS + 1},
+    )
+    customers = [c for c in customers if c]
+    if len(customers) > DELTA_MAX_CUSTOMERS:
+        return {"full_refresh": 1}
+
+    rows = []
+    if customers:
+        sql, params = _get_invoice_query(filters, _get_settings(), customers=customers)
+        rows = [_invoice_row(inv) for inv in frappe.db.sql(sql, params, as_dict=True)]
+
+    rows, lookup, salesmen = compact_rows(rows)
+    return {"cursor": new_cursor, "customers": customers, "rows": rows, "lookup": lookup, "salesmen": salesmen}
+
+
+def get_change_cursor():
+    """
+    "<timestamp>|<exposure version>" for the next delta.
+    The timestamp is the newest `modified` of the delta sources (database data,
+    not the app clock). While that change is recent it is stepped back by the
+    commit window + replica lag: a row stamped earlier may still commit or
+    reach the replica, and must stay above the cursor.
+    """
+    latest = frappe.db.sql(
+        """
+        SELECT GREATEST(
+            IFNULL((SELECT MAX(modified) FROM `tabSales Invoice`), '2000-01-01'),
+            IFNULL((SELECT MAX(modified) FROM `tabTemp Credit Customer Policy`), '2000-01-01'),
+            IFNULL((SELECT MAX(modified) FROM `tabCustomer`), '2000-01-01')
+        )
+        """
+    )[0][0]
+    latest = get_datetime(latest)
+
+    overlap = DELTA_COMMIT_WINDOW + get_max_replica_lag()
+    if (now_datetime() - latest).total_seconds() < overlap:
+        latest = add_to_date(latest, seconds=-overlap)
+
+    return f"{latest}|{get_exposure_version()}"
+
+
+# ---------------- Compact payload ----------------
+
+def compact_rows(rows):
+    """
+    Dictionary encoding of invoice rows:
+      rows      -> invoice fields + customer / salesman_user keys only
+      customers -> {customer: CUSTOMER_FIELDS}, once per customer
+      salesmen  -> {salesman_user: salesman_name}
+    """
+    customers = {}
+    salesmen = {}
+    out = []
+
+    for row in rows:
+        if row["customer"] not in customers:
+            customers[row["customer"]] = {f: row[f] for f in CUSTOMER_FIELDS}
+        salesmen[row["salesman_user"]] = row["salesman_name"]
+
+        out.append({k: v for k, v in row.items() if k not in CUSTOMER_FIELDS and k != "salesman_name"})
+
+    return out, customers, salesmen
+
+
+def _compact_result(result):
+    """Lookups ride on the key columns (`customer`, `salesman_user`) as `lookup`."""
+    columns, data, *rest = result
+    if not data:
+        return result
+
+    rows, customers, salesmen = compact_rows(data)
+    lookups = {"customer": customers, "salesman_user": salesmen}
+    columns = [dict(c, lookup=lookups[c["fieldname"]]) if c["fieldname"] in lookups else c for c in columns]
+
+    return (columns, rows, *rest)
+
+
+# ---------------- Prepared (background) mode ----------------
+
+def estimate_row_count(filters):
+    """Optimizer estimate (EXPLAIN) of unpaid invoices matching the filters; no scan."""
+    if not (filters.get("company") or "").strip():
+        return 0
+
+    joins, where_sql, params = _get_conditions(filters)
+    plan = frappe.db.sql(
+        f"EXPLAIN SELECT si.name FROM `tabSales Invoice` si {joins} WHERE {where_sql}",
+        params,
+        as_dict=True,
+    )
+    return cint(plan[0].get("rows")) if plan else 0
+
+
+def _prepared_response(filters):
+    meta = enqueue_prepared(
+        "Temp Credit Status",
+        filters,
+        "temp_credit_control.temp_credit_control.report.temp_credit_status.temp_credit_status.build_prepared_result",
+    )
+    columns = get_columns()
+
+    if meta["status"] != "Completed":
+        message = (
+            f"Large result: the report is being prepared in the background ({cint(meta.get('progress'))}%). "
+            "It will load automatically when ready."
+        )
+        return columns, [], message, None, None
+
+    message = f"Prepared result as of {meta['created']} ({cint(meta.get('rows'))} invoices)."
+    return columns, get_chunk(meta["key"], 0), message, meta.get("chart"), meta.get("report_summary")
+
+
+def build_prepared_result(key, filters):
+    """Background job: summary + ALL invoice rows, stored as compressed chunks."""
+    filters = frappe._dict(filters)
+    meta = get_prepared_meta(key) or {"key": key, "created": now_datetime(), "user": None}
+    frappe.flags.in_temp_credit_prepared = True
+
+    try:
+        _build_prepared_chunks(key, filters, meta)
+    except Exception:
+        frappe.log_error(title="Temp Credit Status: prepared report failed")
+        publish_progress(meta, cint(meta.get("progress")), "Failed")
+
+
+@replica_read_only
+def _build_prepared_chunks(key, filters, meta):
+    # reads only (progress / chunks go to redis), so it can run on the replica
+    publish_progress(meta, 0, "Running")
+
+    settings = _get_settings()
+    customer_summary, salesman_used = get_summary_data(filters, settings)
+    expected = max(estimate_row_count(filters), 1)
+
+    chunks = 0
+    rows = 0
+    cursor = None
+    while True:
+        page = get_data(filters, settings, cursor=cursor, page_length=PREPARED_CHUNK_SIZE)
+        if not page:
+            break
+
+        store_chunk(key, chunks, page)
+        chunks += 1
+        rows += len(page)
+        publish_progress(meta, min(99, int(rows * 100 / expected)))
+
+        if len(page) < PREPARED_CHUNK_SIZE:
+            break
+
+        last = page[-1]
+        cursor = {"posting_date": last["posting_date"], "modified": last["invoice_modified"], "name": last["sales_invoice"]}
+
+    meta.update(
+        {
+            "chunks": chunks,
+            "rows": rows,
+            "created": now_datetime(),
+            "chart": get_chart(customer_summary, salesman_used, filters),
+            "report_summary": get_report_summary(customer_summary),
+        }
+    )
+    publish_progress(meta, 100, "Completed")
+
+
+@frappe.whitelist()
+def get_prepared_status(filters):
+    _check_report_permission()
+    filters = frappe._dict(frappe.parse_json(filters) or {})
+    meta = get_prepared_meta(get_prepared_key("Temp Credit Status", filters)) or {}
+    return {k: meta.get(k) for k in ("key", "status", "progress", "chunks", "rows", "created")}
+
+
+@frappe.whitelist()
+def get_prepared_chunk(key, idx):
+    _check_report_permission()
+    if not (key or "").startswith(get_prepared_key("Temp Credit Status", {}).rsplit(":", 1)[0] + ":"):
+        frappe.throw("Invalid prepared report key")
+    return get_chunk(key, cint(idx))
+
+
+# ---------------- Streaming export ----------------
+
+@frappe.whitelist()
+@replica_read_only
+def export_invoices(filters, file_format="CSV"):
+    """
+    All invoice rows of the report (no paging) as CSV / XLSX.
+    Rows come from an unbuffered (server-side) cursor and are written to a
+    temp file as they arrive, then the file is streamed back in blocks, so
+    memory stays flat regardless of row count.
+    """
+    _check_report_permission()
+
+    filters = frappe._dict(frappe.parse_json(filters) or {})
+    if not (filters.get("company") or "").strip():
+        frappe.throw("Company is required")
+
+    file_format = "XLSX" if (file_format or "").strip().upper() == "XLSX" else "CSV"
+    columns = get_columns()
+    header = [c["label"] for c in columns]
+    rows = _iter_export_rows(filters, _get_settings(), [c["fieldname"] for c in columns])
+
+    fd, path = tempfile.mkstemp(suffix=f".{file_format.lower()}")
+    os.close(fd)
+    try:
+        if file_format == "XLSX":
+            _write_xlsx(path, header, rows)
+        else:
+            _write_csv(path, header, rows)
+    except Exception:
+        os.remove(path)
+        raise
+
+    return _file_response(path, f"Temp Credit Status.{file_format.lower()}")
+
+
+def _iter_export_rows(filters, settings, fieldnames):
+    sql, params = _get_invoice_query(filters, settings)
+    totals = None if _needs_customer_scope(filters) else _get_customer_totals(filters, settings)
+
+    # Rows are consumed by the writer inside the `with`, one at a time
+    with frappe.db.unbuffered_cursor():
+        for inv in frappe.db.sql(sql, params, as_dict=True, as_iterator=True):
+            if totals is not None:
+                _fill_customer_totals(inv, totals)
+            row = _invoice_row(inv)
+            yield [row[f] for f in fieldnames]
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _write_xlsx(path, header, rows):
+    from openpyxl import Workbook
+
+    # write_only: rows go straight to the sheet XML, nothing is kept per cell
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Temp Credit Status")
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def _file_response(path, filename):
+    from werkzeug.wrappers import Response
+
+    content_type = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        if filename.endswith(".xlsx")
+        else "text/csv; charset=utf-8"
+    )
+
+    def stream():
+        try:
+            with open(path, "rb") as f:
+                while True:
+                    block = f.read(EXPORT_BLOCK_SIZE)
+                    if not block:
+                        break
+                    yield block
+        finally:
+            os.remove(path)
+
+    response = Response(stream(), content_type=content_type, direct_passthrough=True)
+    response.headers["Content-Length"] = str(os.path.getsize(path))
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _check_report_permission():
+    if not frappe.get_doc("Report", "Temp Credit Status").is_permitted():
+        frappe.throw("Not permitted", frappe.PermissionError)
+
+
 def get_columns():
     """Invoice-wise unpaid invoices with customer-level limits & totals."""
     return [
@@ -105,160 +521,112 @@ def get_columns():
     ]
 
 
-def get_data(filters, settings):
-    company = (filters.get("company") or "").strip()
-    duration = (filters.get("duration") or "Last 30 Days").strip()
-    customer_group = (filters.get("customer_group") or "").strip()
-    credit_type_filter = (filters.get("credit_type") or "").strip()  # '', 'Temp Credit', 'Credit'
-    salesman_user_filter = (filters.get("salesman_user") or "").strip()
-    customer_filter = (filters.get("customer") or "").strip()
-    territory_filter = (filters.get("territory") or "").strip()
-    show_only_over_limit = int(filters.get("show_only_over_limit") or 0)
-
-    if not company:
-        return [], {}
-
-    # 1) Pull ALL unpaid invoices (invoice-wise)
-    invoices = _get_unpaid_invoices(
-        company=company,
-        duration=duration,
-        customer_group=customer_group,
-        salesman_user=salesman_user_filter,
-        customer=customer_filter,
-        territory=territory_filter,
-    )
-    if not invoices:
-        return [], {}
-
-    customers_list = list({d["customer"] for d in invoices if d.get("customer")})
-    if not customers_list:
-        return [], {}
-
-    # 2) Customer master data
-    customers_map = _get_customers_map(customers_list)
-
-    # 3) Standard credit limits (for normal credit customers)
-    credit_limits = _get_standard_credit_limits(company, customer_group)
-
-    # 4) Temp credit flags & policies
-    temp_flags = _get_temp_customer_flags(customers_list, settings)
-    temp_policies = _get_policies_for_customers(customers_list)
+def get_data(filters, settings, cursor=None, page_length=PAGE_LENGTH):
+    """
+    One keyset page of invoice rows, ordered by (posting_date, modified, name) DESC.
+    Customer totals, credit type and effective limit come from the shared
+    (cached) per-customer totals, so a page is an index range read; the
+    totals are only joined in SQL when the credit-type / over-limit filters
+    need them to select rows.
+    """
+    if not (filters.get("company") or "").strip():
+        return []
 
-    # 5) Customer outstanding totals (customer-wise) from the invoice list itself
-    #    (this avoids extra SQL and matches the exact invoice set / filters)
-    customer_outstanding = {}
-    for inv in invoices:
-        cust = inv["customer"]
-        customer_outstanding[cust] = flt(customer_outstanding.get(cust) or 0) + flt(inv.get("outstanding_amount") or 0)
+    return [_invoice_row(inv) for inv in _get_invoice_page(filters, settings, cursor, page_length)]
 
-    # 6) Build rows (invoice-wise), but show customer limit/used/remaining repeated
-    out = []
-    customer_summary = {}  # for chart + summary (distinct customers)
 
-    for inv in invoices:
-        cust = inv["customer"]
-        cdoc = customers_map.get(cust)
-        if not cdoc:
-            continue
+def _invoice_row(inv):
+    salesman_user = (inv.get("salesman_user") or "").strip()
+    salesman_name = (inv.get("salesman_name") or "").strip() or salesman_user
 
-        is_temp = 1 if temp_flags.get(cust) else 0
-        credit_type = "Temp Credit" if is_temp else "Credit"
+    return {
+        "sales_invoice": inv["name"],
+        "posting_date": inv.get("posting_date"),
+        "invoice_modified": inv.get("modified"),
+        "invoice_outstanding": flt(inv.get("outstanding_amount") or 0),
+        "customer": inv.customer,
+        "customer_name": inv.customer_name,
+        "customer_group": inv.customer_group,
+        "territory": inv.territory,
+        "credit_type": "Temp Credit" if inv.is_temp else "Credit",
+        "salesman_user": salesman_user,
+        "salesman_name": salesman_name,
+        "credit_limit": flt(inv.credit_limit),
+        "customer_used_credit": flt(inv.used_credit),
+        "remaining_credit": flt(inv.credit_limit) - flt(inv.used_credit),
+    }
 
-        # Credit type filter
-        if credit_type_filter == "Temp Credit" and not is_temp:
-            continue
-        if credit_type_filter == "Credit" and is_temp:
-            continue
 
-        # Credit limit
-        if is_temp:
-            pol = temp_policies.get(cust) or {}
-            credit_limit = _effective_flt(pol.get("credit_limit_override"), settings["default_customer_limit"])
-        else:
-            credit_limit = flt(credit_limits.get(cust) or 0)
+def get_summary_data(filters, settings):
+    """
+    Full filtered set, grouped in SQL by (customer, salesman).
+    Returns (customer_summary, used credit per salesman) for charts + cards.
+    """
+    if not (filters.get("company") or "").strip():
+        return {}, {}
 
-        # For "Credit" filter we also require positive credit limit
-        if credit_type_filter == "Credit" and credit_limit <= 0:
-            continue
+    customer_summary = {}
+    salesman_used = {}
 
-        cust_used = flt(customer_outstanding.get(cust) or 0)
-        remaining = credit_limit - cust_used
+    for t in _get_cached_group_totals(filters, settings):
+        s_key = (t.salesman_name or t.salesman_user or "Not Set").strip()
+        salesman_used[s_key] = flt(salesman_used.get(s_key) or 0) + flt(t.outstanding)
 
-        # Over-limit filter
-        if show_only_over_limit and credit_limit > 0 and cust_used <= credit_limit:
+        # Customer is attributed to the salesman of its latest invoice
+        c = customer_summary.get(t.customer)
+        if c and c["last_posting"] >= t.last_posting:
             continue
-        if show_only_over_limit and credit_limit <= 0:
-            # If credit limit not defined, don't show in over-limit mode
-            continue
-
-        salesman_user = (inv.get("owner") or "").strip()
-        salesman_name = (inv.get("salesman_name") or "").strip() or salesman_user
-
-        out.append(
-            {
-                "sales_invoice": inv["name"],
-                "posting_date": inv.get("posting_date"),
-                "invoice_outstanding": flt(inv.get("outstanding_amount") or 0),
-                "customer": cust,
-                "customer_name": cdoc.get("customer_name"),
-                "customer_group": cdoc.get("customer_group"),
-                "territory": cdoc.get("territory"),
-                "credit_type": credit_type,
-                "salesman_user": salesman_user,
-                "salesman_name": salesman_name,
-                "credit_limit": credit_limit,
-                "customer_used_credit": cust_used,
-                "remaining_credit": remaining,
-            }
-        )
 
-        # Summary store by customer (distinct)
-        if cust not in customer_summary:
-            customer_summary[cust] = {
-                "customer": cust,
-                "customer_name": cdoc.get("customer_name"),
-                "salesman_user": salesman_user,
-                "salesman_name": salesman_name,
-                "credit_limit": flt(credit_limit),
-                "used_credit": flt(cust_used),
-            }
-
-    # Sort by posting date desc, then invoice
-    out.sort(key=lambda x: (x.get("posting_date") or "", x.get("sales_invoice") or ""), reverse=True)
+        salesman_user = (t.salesman_user or "").strip()
+        customer_summary[t.customer] = {
+            "customer": t.customer,
+            "customer_name": t.customer_name,
+            "salesman_user": salesman_user,
+            "salesman_name": (t.salesman_name or "").strip() or salesman_user,
+            "credit_limit": flt(t.credit_limit),
+            "used_credit": flt(t.used_credit),
+            "last_posting": t.last_posting,
+        }
 
-    return out, customer_summary
+    return customer_summary, salesman_used
 
 
 # ---------------- Charts & Summary ----------------
 
-def get_chart(customer_summary, invoice_rows, filters=None):
+def get_chart(customer_summary, salesman_used, filters=None):
     """
     Manual Summary Mode:
       - "Salesman Wise": top 10 salesmen by TOTAL invoice outstanding (within filters)
       - "Customer Wise": top 10 customers by USED credit (customer outstanding)
+    Both are returned (`modes`), the JS switches between them without a re-run.
     """
-    if not invoice_rows:
+    if not customer_summary:
         return None
 
-    filters = filters or {}
-    summary_mode = (filters.get("summary_mode") or "Salesman Wise").strip()
+    return _with_modes(
+        {
+            "Salesman Wise": _chart_salesman_wise(salesman_used, customer_summary),
+            "Customer Wise": _chart_top_customers(customer_summary),
+        },
+        filters,
+    )
 
-    if summary_mode == "Customer Wise":
-        return _chart_top_customers(customer_summary)
 
-    return _chart_salesman_wise(invoice_rows, customer_summary)
+def _with_modes(charts, filters):
+    """Chart of the selected summary_mode, carrying the data of every mode."""
+    summary_mode = ((filters or {}).get("summary_mode") or "Salesman Wise").strip()
+    chart = charts.get(summary_mode) or charts["Salesman Wise"]
+    if not chart:
+        return None
 
+    return dict(chart, modes={mode: c["data"] for mode, c in charts.items() if c})
 
-def _chart_salesman_wise(invoice_rows, customer_summary):
-    # Used = sum of invoice outstanding per salesman
-    used_by_salesman = {}
+
+def _chart_salesman_wise(used_by_salesman, customer_summary):
+    # Used = sum of invoice outstanding per salesman (grouped in SQL)
     # Limit = sum of DISTINCT customer credit limits per salesman (avoid invoice duplication)
     custs_by_salesman = {}
 
-    for r in invoice_rows:
-        s_key = (r.get("salesman_name") or r.get("salesman_user") or "Not Set").strip()
-        used_by_salesman[s_key] = flt(used_by_salesman.get(s_key) or 0) + flt(r.get("invoice_outstanding") or 0)
-
     for cust, csum in (customer_summary or {}).items():
         s_key = (csum.get("salesman_name") or csum.get("salesman_user") or "Not Set").strip()
         if s_key not in custs_by_salesman:
@@ -283,22 +651,11 @@ def _chart_salesman_wise(invoice_rows, customer_summary):
         )
 
     rows.sort(key=lambda x: flt(x["used"]), reverse=True)
-    top = rows[:10]
+    top = rows[:SUMMARY_TOP_N]
     if not top:
         return None
 
-    return {
-        "data": {
-            "labels": [r["salesman"] for r in top],
-            "datasets": [
-                {"name": "Used Credit (SAR)", "values": [round(flt(r["used"]), 2) for r in top]},
-                {"name": "Credit Limit (SAR)", "values": [round(flt(r["limit"]), 2) for r in top]},
-            ],
-        },
-        "type": "bar",
-        "height": 300,
-        "colors": None,
-    }
+    return _bar_chart([r["salesman"] for r in top], [r["used"] for r in top], [r["limit"] for r in top])
 
 
 def _chart_top_customers(customer_summary):
@@ -307,16 +664,24 @@ def _chart_top_customers(customer_summary):
         return None
 
     rows.sort(key=lambda d: flt(d.get("used_credit")), reverse=True)
-    top = rows[:10]
+    top = rows[:SUMMARY_TOP_N]
     if not top:
         return None
 
+    return _bar_chart(
+        [d.get("customer") for d in top],
+        [d.get("used_credit") for d in top],
+        [d.get("credit_limit") for d in top],
+    )
+
+
+def _bar_chart(labels, used, limits):
     return {
         "data": {
-            "labels": [d.get("customer") for d in top],
+            "labels": labels,
             "datasets": [
-                {"name": "Used Credit (SAR)", "values": [round(flt(d.get("used_credit")), 2) for d in top]},
-                {"name": "Credit Limit (SAR)", "values": [round(flt(d.get("credit_limit")), 2) for d in top]},
+                {"name": "Used Credit (SAR)", "values": [round(flt(v), 2) for v in used]},
+                {"name": "Credit Limit (SAR)", "values": [round(flt(v), 2) for v in limits]},
             ],
         },
         "type": "bar",
@@ -331,22 +696,122 @@ def get_report_summary(customer_summary):
     """
     total_used = 0.0
     total_limit = 0.0
-    total_remaining = 0.0
 
     for _, r in (customer_summary or {}).items():
-        used = flt(r.get("used_credit"))
-        limit_ = flt(r.get("credit_limit"))
-        total_used += used
-        total_limit += limit_
-        total_remaining += (limit_ - used)
+        total_used += flt(r.get("used_credit"))
+        total_limit += flt(r.get("credit_limit"))
+
+    return _summary_cards(total_used, total_limit)
+
 
+def _summary_cards(total_used, total_limit):
     return [
         {"label": "Total Used Credit", "value": round(total_used, 2), "indicator": "Orange"},
         {"label": "Total Credit Limit", "value": round(total_limit, 2), "indicator": "Blue"},
-        {"label": "Total Remaining Limit", "value": round(total_remaining, 2), "indicator": "Green"},
+        {"label": "Total Remaining Limit", "value": round(total_limit - total_used, 2), "indicator": "Green"},
     ]
 
 
+# ---------------- Summary-only mode ----------------
+
+def get_summary_only(filters, settings):
+    """
+    (chart, report_summary) straight from SQL: totals over the customer scope
+    and the top-N customers / salesmen via GROUP BY ... ORDER BY ... LIMIT.
+    Same figures as the full mode, without materializing invoice or customer rows.
+    """
+    if not (filters.get("company") or "").strip():
+        return None, []
+
+    joins, where_sql, params = _get_conditions(filters)
+    scope_sql = _get_customer_scope(joins, where_sql, filters, settings, params)
+    params["top_n"] = SUMMARY_TOP_N
+
+    totals = frappe.db.sql(
+        f"""
+        SELECT COUNT(*) AS customers, SUM(cs.used_credit) AS used_credit, SUM(cs.credit_limit) AS credit_limit
+        FROM ({scope_sql}) cs
+        """,
+        params,
+        as_dict=True,
+    )[0]
+    if not totals.customers:
+        return None, _summary_cards(0.0, 0.0)
+
+    report_summary = _summary_cards(flt(totals.used_credit), flt(totals.credit_limit))
+
+    top_customers = frappe.db.sql(
+        f"""
+        SELECT cs.customer, cs.used_credit, cs.credit_limit
+        FROM ({scope_sql}) cs
+        ORDER BY cs.used_credit DESC
+        LIMIT %(top_n)s
+        """,
+        params,
+        as_dict=True,
+    )
+
+    top = frappe.db.sql(
+        f"""
+        SELECT
+            IFNULL(si.temp_credit_salesman, '') AS salesman_user,
+            MAX(su.full_name) AS salesman_name,
+            SUM(si.outstanding_amount) AS used
+        FROM `tabSales Invoice` si
+        {joins}
+        INNER JOIN ({scope_sql}) cs ON cs.customer = si.customer
+        LEFT JOIN `tabUser` su ON su.name = si.temp_credit_salesman
+        WHERE {where_sql}
+        GROUP BY IFNULL(si.temp_credit_salesman, '')
+        ORDER BY used DESC
+        LIMIT %(top_n)s
+        """,
+        params,
+        as_dict=True,
+    )
+
+    # Limit = credit limits of customers whose latest invoice is the salesman's (as in full mode)
+    params["top_users"] = tuple(t.salesman_user for t in top) or ("",)
+    limits = dict(
+        frappe.db.sql(
+            f"""
+            SELECT l.salesman_user, SUM(cs.credit_limit)
+            FROM (
+                SELECT
+                    si.customer,
+                    SUBSTRING_INDEX(
+                        GROUP_CONCAT(IFNULL(si.temp_credit_salesman, '') ORDER BY si.posting_date DESC SEPARATOR ','),
+                        ',',
+                        1
+                    ) AS salesman_user
+                FROM `tabSales Invoice` si
+                {joins}
+                WHERE {where_sql}
+                GROUP BY si.customer
+            ) l
+            INNER JOIN ({scope_sql}) cs ON cs.customer = l.customer
+            WHERE l.salesman_user IN %(top_users)s
+            GROUP BY l.salesman_user
+            """,
+            params,
+        )
+    )
+
+    charts = {
+        "Salesman Wise": _bar_chart(
+            [(t.salesman_name or "").strip() or t.salesman_user or "Not Set" for t in top],
+            [t.used for t in top],
+            [limits.get(t.salesman_user) for t in top],
+        ),
+        "Customer Wise": _bar_chart(
+            [t.customer for t in top_customers],
+            [t.used_credit for t in top_customers],
+            [t.credit_limit for t in top_customers],
+        ),
+    }
+    return _with_modes(charts, filters), report_summary
+
+
 # ---------------- Duration helper ----------------
 
 def get_date_limit(duration):
@@ -366,31 +831,35 @@ def get_date_limit(duration):
 
 # ---------------- SQL Helpers ----------------
 
-def _get_unpaid_invoices(company, duration, customer_group=None, salesman_user=None, customer=None, territory=None):
+def _get_conditions(filters):
     """
-    Returns ALL unpaid invoices (invoice-wise) with basic info + salesman name.
+    Shared FROM/WHERE for unpaid invoices.
     Filters:
       - company (required)
       - posting_date by duration
       - customer_group, territory via Customer join
-      - salesman_user (invoice owner)
+      - salesman_user (stamped temp_credit_salesman: custom_salesman_user, else owner)
       - customer exact
     """
+    duration = (filters.get("duration") or "Last 30 Days").strip()
+    customer_group = (filters.get("customer_group") or "").strip()
+    salesman_user = (filters.get("salesman_user") or "").strip()
+    customer = (filters.get("customer") or "").strip()
+    territory = (filters.get("territory") or "").strip()
+
     date_limit = get_date_limit(duration)
 
-    params = {"company": company}
+    params = {"company": (filters.get("company") or "").strip()}
     cond = ["si.docstatus = 1", "IFNULL(si.is_return,0) = 0", "IFNULL(si.outstanding_amount,0) > 0", "si.company = %(company)s"]
 
-    joins = "LEFT JOIN `tabUser` u ON u.name = si.owner"
-    cjoin = ""
-    ccond = []
+    joins = ""
 
     if date_limit:
         cond.append("si.posting_date >= %(date_limit)s")
         params["date_limit"] = date_limit
 
     if salesman_user:
-        cond.append("si.owner = %(salesman_user)s")
+        cond.append("si.temp_credit_salesman = %(salesman_user)s")
         params["salesman_user"] = salesman_user
 
     if customer:
@@ -399,83 +868,212 @@ def _get_unpaid_invoices(company, duration, customer_group=None, salesman_user=N
 
     # Only join Customer table if needed
     if customer_group or territory:
-        cjoin = "LEFT JOIN `tabCustomer` c ON c.name = si.customer"
+        joins = "LEFT JOIN `tabCustomer` c ON c.name = si.customer"
         if customer_group:
-            ccond.append("c.customer_group = %(customer_group)s")
+            cond.append("c.customer_group = %(customer_group)s")
             params["customer_group"] = customer_group
         if territory:
-            ccond.append("c.territory = %(territory)s")
+            cond.append("c.territory = %(territory)s")
             params["territory"] = territory
 
-    where_sql = " AND ".join(cond)
-    if ccond:
-        where_sql += " AND " + " AND ".join(ccond)
+    return joins, " AND ".join(cond), params
+
+
+def _get_customer_scope(joins, where_sql, filters, settings, params):
+    """
+    Derived table `cs`: one row per customer of the filtered invoice set with
+      used_credit  = SUM(outstanding) over the full filtered set
+      is_temp      = stamped Temp Credit flag
+      credit_limit = TC: policy override if > 0, else settings default
+                     Credit: MAX(Customer Credit Limit) for the company
+    and the credit-type / over-limit filters applied as a WHERE on it.
+    """
+    credit_type_filter = (filters.get("credit_type") or "").strip()  # '', 'Temp Credit', 'Credit'
+    show_only_over_limit = int(filters.get("show_only_over_limit") or 0)
+
+    params["default_customer_limit"] = flt(settings["default_customer_limit"])
+
+    scope_cond = ["1 = 1"]
+    if credit_type_filter == "Temp Credit":
+        scope_cond.append("cs.is_temp = 1")
+    elif credit_type_filter == "Credit":
+        # For "Credit" filter we also require positive credit limit
+        scope_cond.append("cs.is_temp = 0 AND cs.credit_limit > 0")
+
+    if show_only_over_limit:
+        # If credit limit not defined, don't show in over-limit mode
+        scope_cond.append("cs.credit_limit > 0 AND cs.used_credit > cs.credit_limit")
+
+    return f"""
+        SELECT cs.*
+        FROM (
+            SELECT
+                t.customer,
+                t.used_credit,
+                t.is_temp,
+                CASE
+                    WHEN t.is_temp = 1 THEN
+                        IF(IFNULL(pol.credit_limit_override, 0) > 0, pol.credit_limit_override, %(default_customer_limit)s)
+                    ELSE IFNULL(
+                        (
+                            SELECT MAX(ccl.credit_limit)
+                            FROM `tabCustomer Credit Limit` ccl
+                            WHERE
+                                ccl.parent = t.customer
+                                AND ccl.parenttype = 'Customer'
+                                AND (IFNULL(ccl.company, '') = '' OR ccl.company = %(company)s)
+                        ),
+                        0
+                    )
+                END AS credit_limit
+            FROM (
+                SELECT
+                    si.customer,
+                    SUM(si.outstanding_amount) AS used_credit,
+                    MAX(si.temp_credit_customer) AS is_temp
+                FROM `tabSales Invoice` si
+                {joins}
+                WHERE {where_sql}
+                GROUP BY si.customer
+            ) t
+            LEFT JOIN `tabTemp Credit Customer Policy` pol
+                ON pol.customer = t.customer AND IFNULL(pol.enabled, 1) = 1
+        ) cs
+        WHERE {" AND ".join(scope_cond)}
+    """
+
+
+def _get_group_totals(filters, settings):
+    """Outstanding per (customer, salesman), only for customers in scope."""
+    joins, where_sql, params = _get_conditions(filters)
+    scope_sql = _get_customer_scope(joins, where_sql, filters, settings, params)
 
-    rows = frappe.db.sql(
+    return frappe.db.sql(
         f"""
         SELECT
-            si.name,
             si.customer,
-            si.posting_date,
-            si.outstanding_amount,
-            si.owner,
-            u.full_name AS salesman_name
+            MAX(cm.customer_name) AS customer_name,
+            si.temp_credit_salesman AS salesman_user,
+            MAX(su.full_name) AS salesman_name,
+            SUM(si.outstanding_amount) AS outstanding,
+            MAX(si.posting_date) AS last_posting,
+            MAX(cs.is_temp) AS is_temp,
+            MAX(cs.used_credit) AS used_credit,
+            MAX(cs.credit_limit) AS credit_limit
         FROM `tabSales Invoice` si
         {joins}
-        {cjoin}
+        INNER JOIN ({scope_sql}) cs ON cs.customer = si.customer
+        INNER JOIN `tabCustomer` cm ON cm.name = si.customer
+        LEFT JOIN `tabUser` su ON su.name = si.temp_credit_salesman
         WHERE {where_sql}
-        ORDER BY si.posting_date DESC, si.modified DESC
+        GROUP BY si.customer, si.temp_credit_salesman
         """,
         params,
         as_dict=True,
     )
 
-    return rows or []
 
+def _get_cached_group_totals(filters, settings):
+    """_get_group_totals, computed once per filter set and data version (summary, pages, export)."""
+    key = {k: filters.get(k) for k in TOTALS_FILTERS}
+    return get_cached_report("Temp Credit Status:totals", key, lambda: _get_group_totals(filters, settings))
 
-def _get_customers_map(customer_names):
-    if not customer_names:
-        return {}
 
-    rows = frappe.get_all(
-        "Customer",
-        filters={"name": ["in", customer_names]},
-        fields=["name", "customer_name", "customer_group", "territory"],
-        limit_page_length=100000,
-    )
+def _get_customer_totals(filters, settings):
+    """{customer: {is_temp, used_credit, credit_limit}} of the customers in scope."""
+    return {
+        t.customer: {"is_temp": t.is_temp, "used_credit": t.used_credit, "credit_limit": t.credit_limit}
+        for t in _get_cached_group_totals(filters, settings)
+    }
 
-    return {r["name"]: r for r in rows}
 
+def _fill_customer_totals(inv, totals):
+    inv.update(totals.get(inv.customer) or {"is_temp": inv.is_temp, "used_credit": 0, "credit_limit": 0})
 
-def _get_standard_credit_limits(company, customer_group=None):
-    where_extra = ""
-    params = {"company": company}
 
-    if customer_group:
-        where_extra = "AND c.customer_group = %(customer_group)s"
-        params["customer_group"] = customer_group
+def _needs_customer_scope(filters):
+    """Credit-type / over-limit filters select invoices by customer totals: join them in SQL."""
+    return bool((filters.get("credit_type") or "").strip() or cint(filters.get("show_only_over_limit")))
 
-    rows = frappe.db.sql(
-        f"""
-        SELECT
-            ccl.parent AS customer,
-            MAX(ccl.credit_limit) AS credit_limit
-        FROM `tabCustomer Credit Limit` ccl
-        INNER JOIN `tabCustomer` c ON c.name = ccl.parent
-        WHERE
-            (IFNULL(ccl.company, '') = '' OR ccl.company = %(company)s)
-            {where_extra}
-        GROUP BY ccl.parent
-        """,
-        params,
-        as_dict=True,
-    )
 
-    limits = {}
-    for r in rows:
-        limits[r.customer] = flt(r.credit_limit)
+def _get_invoice_page(filters, settings, cursor=None, page_length=PAGE_LENGTH):
+    """
+    One page of unpaid invoices in scope, keyset-paginated on
+    (posting_date, modified, name) DESC. No OFFSET: the cursor condition seeks
+    straight to the next page on the (company, posting_date, modified) index.
+    """
+    sql, params = _get_invoice_query(filters, settings, cursor)
+    params["page_length"] = int(page_length)
+
+    rows = frappe.db.sql(f"{sql} LIMIT %(page_length)s", params, as_dict=True)
+
+    if not _needs_customer_scope(filters):
+        totals = _get_customer_totals(filters, settings)
+        for inv in rows:
+            _fill_customer_totals(inv, totals)
 
-    return limits
+    return rows
+
+
+def _get_invoice_query(filters, settings, cursor=None, customers=None):
+    """
+    (sql, params) for unpaid invoices in scope, ordered for keyset paging; no LIMIT.
+    customers: restrict to these customers (delta refresh); their totals stay exact.
+    Without customers or a scope filter, no per-customer GROUP BY is joined:
+    is_temp / used_credit / credit_limit are filled from _get_customer_totals.
+    """
+    joins, where_sql, params = _get_conditions(filters)
+    if customers:
+        where_sql += " AND si.customer IN %(delta_customers)s"
+        params["delta_customers"] = tuple(customers)
+
+    if customers or _needs_customer_scope(filters):
+        scope_sql = _get_customer_scope(joins, where_sql, filters, settings, params)
+        scope_cols = "cs.is_temp, cs.used_credit, cs.credit_limit"
+        scope_join = f"INNER JOIN ({scope_sql}) cs ON cs.customer = si.customer"
+    else:
+        scope_cols = "si.temp_credit_customer AS is_temp"
+        scope_join = ""
+
+    cond = ""
+    if cursor:
+        cond = """
+            AND (
+                si.posting_date < %(c_date)s
+                OR (si.posting_date = %(c_date)s AND si.modified < %(c_modified)s)
+                OR (si.posting_date = %(c_date)s AND si.modified = %(c_modified)s AND si.name < %(c_name)s)
+            )
+        """
+        params.update(
+            {
+                "c_date": cursor.get("posting_date"),
+                "c_modified": cursor.get("modified"),
+                "c_name": cursor.get("name"),
+            }
+        )
+
+    sql = f"""
+        SELECT
+            si.name,
+            si.customer,
+            si.posting_date,
+            si.modified,
+            si.outstanding_amount,
+            si.temp_credit_salesman AS salesman_user,
+            su.full_name AS salesman_name,
+            cm.customer_name,
+            cm.customer_group,
+            cm.territory,
+            {scope_cols}
+        FROM `tabSales Invoice` si
+        {joins}
+        {scope_join}
+        INNER JOIN `tabCustomer` cm ON cm.name = si.customer
+        LEFT JOIN `tabUser` su ON su.name = si.temp_credit_salesman
+        WHERE {where_sql} {cond}
+        ORDER BY si.posting_date DESC, si.modified DESC, si.name DESC
+    """
+    return sql, params
 
 
 # ---------------- Temp Credit Helpers ----------------
@@ -500,52 +1098,6 @@ def _get_settings():
     }
 
 
-def _get_temp_customer_flags(customer_names, settings):
-    flags = {}
-    if not customer_names:
-        return flags
-
-    tc_field = settings["customer_tc_fieldname"]
-    tc_value = settings["temp_credit_value"]
-
-    rows = frappe.get_all(
-        "Customer",
-        filters={"name": ["in", customer_names], tc_field: tc_value},
-        fields=["name"],
-        limit_page_length=100000,
-    )
-
-    for r in rows:
-        flags[r.name] = 1
-
-    return flags
-
-
-def _get_policies_for_customers(customer_names):
-    policies = {}
-    if not customer_names:
-        return policies
-
-    rows = frappe.get_all(
-        "Temp Credit Customer Policy",
-        filters={"customer": ["in", customer_names]},
-        fields=["customer", "enabled", "credit_limit_override"],
-        limit_page_length=100000,
-    )
-
-    for r in rows:
-        if flt(r.get("enabled", 1)) == 0:
-            continue
-        policies[r.customer] = r
-
-    return policies
-
-
-def _effective_flt(override_value, default_value):
-    ov = flt(override_value)
-    return ov if ov > 0 else flt(default_value)
-
-
 
 
 
@@ -0,0 +1,126 @@
+# Copyright (c) 2026, Temp Credit Control and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_to_date, flt, get_datetime
+
+from temp_credit_control.temp_credit_control.report.temp_credit_status.temp_credit_status import (
+	_get_settings,
+	get_change_cursor,
+	get_data,
+	get_status_changes,
+)
+
+# (posting_date, modified): several invoices share both, so only `name` orders them
+INVOICE_KEYS = [
+	("2026-01-15", "2026-01-15 10:00:00"),
+	("2026-01-15", "2026-01-15 10:00:00"),
+	("2026-01-15", "2026-01-15 10:00:00"),
+	("2026-01-15", "2026-01-15 10:00:00"),
+	("2026-01-15", "2026-01-15 10:00:00"),
+	("2026-01-15", "2026-01-15 09:00:00"),
+	("2026-01-15", "2026-01-15 09:00:00"),
+	("2026-01-14", "2026-01-15 10:00:00"),
+	("2026-01-14", "2026-01-15 10:00:00"),
+]
+
+
+class TestTempCreditStatus(FrappeTestCase):
+	def setUp(self):
+		# unique company: no cached report / totals from other runs
+		self.company = f"_Test TC Company {frappe.generate_hash(length=6)}"
+		self.customers = [f"_TC-Keyset-{frappe.generate_hash(length=6)}" for _ in range(2)]
+		for customer in self.customers:
+			doc = frappe.get_doc({"doctype": "Customer", "name": customer, "customer_name": customer})
+			doc.creation = doc.modified = get_datetime()
+			doc.db_insert()
+
+		self.invoices = []
+		for idx, (posting_date, modified) in enumerate(INVOICE_KEYS):
+			doc = frappe.get_doc(
+				{
+					"doctype": "Sales Invoice",
+					"name": f"_TC-KEYSET-{frappe.generate_hash(length=8)}",
+					"customer": self.customers[idx % 2],
+					"company": self.company,
+					"posting_date": posting_date,
+					"docstatus": 1,
+					"outstanding_amount": 100,
+					"temp_credit_customer": 1,
+				}
+			)
+			doc.creation = get_datetime(modified)
+			doc.modified = get_datetime(modified)
+			doc.db_insert()
+			self.invoices.append(doc)
+
+		self.expected = [
+			d.name
+			for d in sorted(
+				self.invoices,
+				key=lambda d: (str(d.posting_date), get_datetime(d.modified), d.name),
+				reverse=True,
+			)
+		]
+
+	def test_keyset_pages_neither_skip_nor_repeat(self):
+		for page_length in (1, 2, 3, 4):
+			self.assertEqual(self._page_through({}, page_length), self.expected)
+
+	def test_keyset_pages_with_customer_scope(self):
+		self.assertEqual(self._page_through({"credit_type": "Temp Credit"}, 2), self.expected)
+
+	def test_pages_carry_customer_totals(self):
+		rows = self._page_through({}, 2, rows=True)
+		for row in rows:
+			self.assertEqual(flt(row["customer_used_credit"]), 100 * sum(1 for d in self.invoices if d.customer == row["customer"]))
+
+	def test_delta_returns_invoice_modified_between_calls(self):
+		filters = {"company": self.company, "duration": "All"}
+		first = get_status_changes(filters, get_change_cursor())
+		self.assertNotIn("full_refresh", first)
+
+		changed = self.invoices[0]
+		frappe.db.set_value("Sales Invoice", changed.name, "outstanding_amount", 50)
+
+		second = get_status_changes(filters, first["cursor"])
+		self.assertIn(changed.customer, second["customers"])
+
+	def test_delta_returns_late_commit_stamped_before_cursor(self):
+		filters = {"company": self.company, "duration": "All"}
+		first = get_status_changes(filters, get_change_cursor())
+
+		# stamped before the newest change the first call saw, committed after it
+		cursor_ts = get_datetime(first["cursor"].partition("|")[0])
+		late = self.invoices[1]
+		frappe.db.set_value(
+			"Sales Invoice", late.name, "modified", add_to_date(cursor_ts, seconds=1), update_modified=False
+		)
+
+		second = get_status_changes(filters, first["cursor"])
+		self.assertIn(late.customer, second["customers"])
+
+	def test_policy_change_asks_for_full_refresh(self):
+		filters = {"company": self.company, "duration": "All"}
+		cursor = get_change_cursor()
+		frappe.get_doc({"doctype": "Temp Credit Customer Policy", "customer": self.customers[0]}).insert()
+		frappe.delete_doc("Temp Credit Customer Policy", self.customers[0])
+
+		self.assertEqual(get_status_changes(filters, cursor), {"full_refresh": 1})
+
+	def _page_through(self, extra_filters, page_length, rows=False):
+		filters = frappe._dict({"company": self.company, "duration": "All", **extra_filters})
+		settings = _get_settings()
+
+		seen = []
+		cursor = None
+		while True:
+			page = get_data(filters, settings, cursor=cursor, page_length=page_length)
+			seen += page
+			if len(page) < page_length:
+				break
+			last = page[-1]
+			cursor = {"posting_date": last["posting_date"], "modified": last["invoice_modified"], "name": last["sales_invoice"]}
+
+		return seen if rows else [r["sales_invoice"] for r in seen]
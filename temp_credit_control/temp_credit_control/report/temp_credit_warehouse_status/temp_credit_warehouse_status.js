@@ -0,0 +1,40 @@
+frappe.query_reports['Temp Credit Warehouse Status'] = {
+  filters: [
+    {
+      fieldname: 'company',
+      label: __('Company'),
+      fieldtype: 'Link',
+      options: 'Company',
+      default: frappe.defaults.get_user_default('Company'),
+    },
+    {
+      fieldname: 'warehouse',
+      label: __('Warehouse'),
+      fieldtype: 'Link',
+      options: 'Warehouse',
+      get_query: () => ({ filters: { is_group: 0 } }),
+    },
+    {
+      fieldname: 'only_with_exposure',
+      label: __('Only With Exposure'),
+      fieldtype: 'Check',
+      default: 1,
+    },
+  ],
+
+  formatter: function (value, row, column, data, default_formatter) {
+    value = default_formatter(value, row, column, data);
+    if (!data) return value;
+
+    // limit_status comes from the server, which owns the near-limit ratio
+    if (column.fieldname === 'utilization' || column.fieldname === 'headroom') {
+      if (data.limit_status === 'Over') {
+        value = `<span style="color:#d9534f; font-weight:700">${value}</span>`;
+      } else if (data.limit_status === 'Near') {
+        value = `<span style="color:#f0ad4e; font-weight:700">${value}</span>`;
+      }
+    }
+
+    return value;
+  },
+};
@@ -0,0 +1,149 @@
+import frappe
+from frappe.utils import cint, flt
+
+from temp_credit_control.services.temp_credit_cache import get_cached_report
+from temp_credit_control.services.temp_credit_dashboard import WAREHOUSE_NEAR_LIMIT_RATIO
+from temp_credit_control.services.temp_credit_replica import replica_read_only
+from temp_credit_control.services.temp_credit_validator import _get_settings
+
+
+CHART_TOP_N = 10
+
+
+@replica_read_only
+def execute(filters=None):
+    filters = filters or {}
+    return get_cached_report("Temp Credit Warehouse Status", filters, lambda: _execute(filters))
+
+
+def _execute(filters):
+    settings = _get_settings()
+
+    columns = get_columns()
+    data = get_data(filters, settings)
+
+    chart = get_chart(data)
+    summary = get_report_summary(data, settings)
+
+    return columns, data, None, chart, summary
+
+
+def get_columns():
+    return [
+        {"label": "Warehouse", "fieldname": "warehouse", "fieldtype": "Link", "options": "Warehouse", "width": 220},
+        {"label": "Company", "fieldname": "company", "fieldtype": "Link", "options": "Company", "width": 160},
+        {"label": "Unpaid Invoices", "fieldname": "unpaid_invoices", "fieldtype": "Int", "width": 120},
+        {"label": "Customers", "fieldname": "customers", "fieldtype": "Int", "width": 100},
+        {"label": "Outstanding (SAR)", "fieldname": "outstanding", "fieldtype": "Currency", "width": 150},
+        {"label": "Limit (SAR)", "fieldname": "warehouse_limit", "fieldtype": "Currency", "width": 130},
+        {"label": "Headroom (SAR)", "fieldname": "headroom", "fieldtype": "Currency", "width": 140},
+        {"label": "Utilization %", "fieldname": "utilization", "fieldtype": "Percent", "width": 120},
+    ]
+
+
+def get_data(filters, settings):
+    """
+    One GROUP BY over Temp Credit Warehouse Exposure for every warehouse.
+    That table already holds each unpaid TC invoice apportioned to its
+    header or item warehouses, so the pooled figures match the validator's.
+    """
+    company = (filters.get("company") or "").strip()
+    warehouse = (filters.get("warehouse") or "").strip()
+
+    params = {}
+    cond = ["w.is_group = 0", "(IFNULL(w.disabled, 0) = 0 OR e.name IS NOT NULL)"]
+
+    if company:
+        cond.append("w.company = %(company)s")
+        params["company"] = company
+
+    if warehouse:
+        cond.append("w.name = %(warehouse)s")
+        params["warehouse"] = warehouse
+
+    having = "HAVING outstanding > 0" if cint(filters.get("only_with_exposure")) else ""
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT
+            w.name AS warehouse,
+            w.company AS company,
+            COUNT(DISTINCT e.invoice_type, e.invoice) AS unpaid_invoices,
+            COUNT(DISTINCT e.customer) AS customers,
+            IFNULL(SUM(e.outstanding_amount), 0) AS outstanding
+        FROM `tabWarehouse` w
+        LEFT JOIN `tabTemp Credit Warehouse Exposure` e
+            ON e.warehouse = w.name AND e.outstanding_amount > 0
+        WHERE {" AND ".join(cond)}
+        GROUP BY w.name, w.company
+        {having}
+        ORDER BY outstanding DESC, w.name ASC
+        """,
+        params,
+        as_dict=True,
+    )
+
+    limit = settings["default_warehouse_limit"]
+
+    out = []
+    for r in rows:
+        outstanding = flt(r.outstanding)
+        utilization = round(outstanding * 100 / limit, 2) if limit > 0 else 0
+        out.append(
+            {
+                "warehouse": r.warehouse,
+                "company": r.company,
+                "unpaid_invoices": int(r.unpaid_invoices or 0),
+                "customers": int(r.customers or 0),
+                "outstanding": outstanding,
+                "warehouse_limit": limit,
+                "headroom": limit - outstanding,
+                "utilization": utilization,
+                # not a column: the formatter colours by it, so the threshold lives only here
+                "limit_status": _limit_status(utilization),
+            }
+        )
+
+    return out
+
+
+def _limit_status(utilization):
+    if utilization > 100:
+        return "Over"
+    if utilization >= WAREHOUSE_NEAR_LIMIT_RATIO * 100:
+        return "Near"
+    return ""
+
+
+def get_chart(data):
+    """Warehouses closest to (or over) their limit."""
+    top = sorted((d for d in data if d["outstanding"] > 0), key=lambda d: d["utilization"], reverse=True)[:CHART_TOP_N]
+    if not top:
+        return None
+
+    return {
+        "data": {
+            "labels": [d["warehouse"] for d in top],
+            "datasets": [
+                {"name": "Outstanding (SAR)", "values": [round(d["outstanding"], 2) for d in top]},
+                {"name": "Limit (SAR)", "values": [round(d["warehouse_limit"], 2) for d in top]},
+            ],
+        },
+        "type": "bar",
+        "height": 280,
+    }
+
+
+def get_report_summary(data, settings):
+    if not data:
+        return []
+
+    over = sum(1 for d in data if d["limit_status"] == "Over")
+    near = sum(1 for d in data if d["limit_status"] == "Near")
+
+    return [
+        {"label": "Total Outstanding", "value": round(sum(d["outstanding"] for d in data), 2), "indicator": "Blue"},
+        {"label": "Warehouse Limit", "value": settings["default_warehouse_limit"], "indicator": "Blue" if settings["enable_warehouse_limit"] else "Grey"},
+        {"label": "Near Limit", "value": near, "indicator": "Orange"},
+        {"label": "Over Limit", "value": over, "indicator": "Red"},
+    ]